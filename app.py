@@ -1,8 +1,13 @@
+import time
+_import_start = time.perf_counter()
+
 from flask import Flask, jsonify
 from flask_cors import CORS
 from routes import api
+from utils import http_cache, memory_profile, serialization
 import os
 from dotenv import load_dotenv
+from startup import record_stage, timed_stage, warm_up
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,14 +24,27 @@ def create_app():
     CORS(app, resources={
         r"/*": {
             "origins": ["*"],  # Allow all origins for demo purposes
+            # Catalog updates and deletes are admin operations, not made from browsers
             "methods": ["GET", "POST", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "X-Deadline-Ms",
+                              os.environ.get('LLM_CLIENT_HEADER') or "X-Client-Id",
+                              os.environ.get('TENANT_HEADER') or "X-Tenant-Id"],
+            "expose_headers": ["ETag", "Retry-After"]
         }
     })
     
+    # orjson encoding, MessagePack negotiation and MessagePack request bodies
+    serialization.init_app(app)
+    
     # Register blueprints
     app.register_blueprint(api)
     
+    # ETag revalidation, response compression and static asset caching
+    http_cache.init_app(app)
+    
+    # Per-endpoint allocation tracking (MEMORY_PROFILING)
+    memory_profile.init_app(app)
+    
     # Error handlers
     @app.errorhandler(413)
     def too_large(e):
@@ -52,7 +70,10 @@ def create_app():
     return app
 
 # Create app instance for Gunicorn
-app = create_app()
+with timed_stage('create_app'):
+    app = create_app()
+
+record_stage('app_import', time.perf_counter() - _import_start)
 
 if __name__ == '__main__':
     app = create_app()
@@ -69,6 +90,7 @@ if __name__ == '__main__':
         print(f"Error: Missing required files: {', '.join(missing_files)}")
         exit(1)
     
+    warm_up()
     print("SkillSnap API Server Starting...")
     
     # Get port from environment variable (Heroku) or use default
@@ -0,0 +1,679 @@
+"""
+Offline batch LLM job matching with checkpointing.
+
+Scores a directory of resumes (PDF, .txt or .md files) or a JSONL file of
+{"id": ..., "resume_text": ...} records against the job catalog and writes
+one JSONL result per resume:
+
+    python -m batch_scoring --input resumes/ --output scores.jsonl
+    python -m batch_scoring --input resumes.jsonl --output scores.jsonl --mode batch
+
+Two modes are available:
+
+- online: concurrent requests through the regular provider API, paced by
+  requests-per-minute and tokens-per-minute limits
+- batch: requests submitted to the provider's batch API (or the local
+  stand-in with --backend local) and collected when the batches end
+
+Progress is kept in a SQLite checkpoint next to the output file. Rerunning
+the same command after a crash or interruption skips resumes already written
+to the output, collects batches submitted before the interruption and
+continues with the rest.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from job_catalog import JobCatalog, JobCatalogError
+from ml_utils import (
+    TECH_KEYWORDS,
+    ResumeProfile,
+    catalog_snapshot,
+    extract_text_from_pdf,
+    find_job_candidates,
+    get_resume_profile
+)
+from services.llm_batch import LOCAL_BATCH_DIR, BatchBackend, BatchRequest, LocalBatchBackend, get_batch_backend
+from services.llm_handler import llm_handler
+from services.llm_preflight import (
+    PromptTooLargeError,
+    QuotaExceededError,
+    client_context,
+    token_ledger
+)
+from services.llm_results import local_job_matches
+from services.llm_services import JOB_MATCHING_TEMPERATURE, LLMJobMatchingService
+from tenant_catalogs import tenant_catalogs
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Same candidate count as the /api/llm_job_match endpoint
+MAX_JOBS = int(os.getenv('LLM_MAX_JOBS', '20'))
+
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+BATCH_RPM = int(os.getenv('BATCH_RPM', '500'))
+BATCH_TPM = int(os.getenv('BATCH_TPM', '200000'))
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', '500'))
+BATCH_MAX_OPEN = int(os.getenv('BATCH_MAX_OPEN', '4'))
+BATCH_POLL_INTERVAL = float(os.getenv('BATCH_POLL_INTERVAL', '60'))
+BATCH_MAX_ATTEMPTS = int(os.getenv('BATCH_MAX_ATTEMPTS', '3'))
+# Token ledger client that batch runs are charged to
+BATCH_CLIENT = os.getenv('BATCH_CLIENT', 'batch')
+
+RESUME_EXTENSIONS = ('.pdf', '.txt', '.md')
+PROGRESS_INTERVAL = 30.0
+
+# Summary recorded with the results of the local batch stand-in (--backend local)
+LOCAL_BACKEND_SUMMARY = 'Keyword-based match from the local batch stand-in; no LLM analysis was run.'
+
+class Item(NamedTuple):
+    seq: int
+    item_id: str
+    source: str
+    attempts: int
+
+class Prepared(NamedTuple):
+    """A resume's job matching request, ready to send."""
+    prompt: str
+    budget: int
+    profile: ResumeProfile
+    jobs: List[Dict[str, Any]]
+    catalog_version: int
+
+class ResumeSource:
+    """Resumes in a directory or a JSONL file, addressed by a stable id."""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise ValueError(f"Input not found: {path}")
+        self.path = path
+        self.is_jsonl = os.path.isfile(path)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Yield (item id, source) pairs; the source locates the resume for text()."""
+        if not self.is_jsonl:
+            for root, _, files in os.walk(self.path):
+                for name in sorted(files):
+                    if name.lower().endswith(RESUME_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        yield os.path.relpath(path, self.path), path
+            return
+
+        with open(self.path, 'rb') as f:
+            offset, line_number = 0, 0
+            for line in f:
+                line_number += 1
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.get('id', f"line-{line_number}")), f"{self.path}#{offset}"
+                offset += len(line)
+
+    def text(self, source: str) -> str:
+        if self.is_jsonl:
+            path, offset = source.rsplit('#', 1)
+            with open(path, 'rb') as f:
+                f.seek(int(offset))
+                return json.loads(f.readline())['resume_text']
+        if source.lower().endswith('.pdf'):
+            return extract_text_from_pdf(source)
+        with open(source, 'r', encoding='utf-8') as f:
+            return f.read()
+
+class Checkpoint:
+    """SQLite record of each resume's progress and the batches in flight."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS items (
+                seq INTEGER PRIMARY KEY,
+                item_id TEXT UNIQUE NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                batch_id TEXT,
+                ledger_entry INTEGER,
+                catalog_version INTEGER,
+                job_ids TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_status ON items(status, seq);
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id TEXT PRIMARY KEY,
+                backend TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'running',
+                submitted_at REAL NOT NULL,
+                requests INTEGER NOT NULL
+            );
+        """)
+
+    def check_settings(self, settings: Dict[str, Any]) -> None:
+        """Record the run's settings, refusing to resume a checkpoint made with different ones."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        if row is None:
+            self.conn.execute("INSERT INTO meta(key, value) VALUES ('settings', ?)", (json.dumps(settings),))
+        elif json.loads(row[0]) != settings:
+            raise ValueError(
+                f"Checkpoint was created with settings {row[0]}; use the same options or a new checkpoint"
+            )
+
+    def add_items(self, items: Iterator[Tuple[str, str]]) -> int:
+        with self.conn:
+            self.conn.execute("BEGIN")
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO items(item_id, source) VALUES (?, ?)", items)
+            return self.conn.total_changes - before
+
+    def mark_written(self, item_ids: Set[str]) -> None:
+        """Mark items found in the output as done, in case the run stopped before recording them."""
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "UPDATE items SET status = 'done' WHERE item_id = ? AND status != 'done'",
+                ((item_id,) for item_id in item_ids)
+            )
+
+    def retry_failed(self) -> int:
+        return self.conn.execute(
+            "UPDATE items SET status = 'pending', attempts = 0, error = NULL WHERE status = 'failed'"
+        ).rowcount
+
+    def pending(self, limit: Optional[int] = None) -> List[Item]:
+        query = "SELECT seq, item_id, source, attempts FROM items WHERE status = 'pending' ORDER BY seq"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return [Item(*row) for row in self.conn.execute(query)]
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+
+    def finish(self, seq: int, status: str, error: Optional[str] = None) -> None:
+        self.conn.execute(
+            "UPDATE items SET status = ?, error = ?, attempts = attempts + 1, batch_id = NULL WHERE seq = ?",
+            (status, error, seq)
+        )
+
+    def record_batch(self, batch_id: str, backend: str, requests: List[Tuple[int, Optional[int], int, List[int]]]) -> None:
+        """Record a submitted batch and its (seq, ledger entry, catalog version, job ids) requests."""
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "INSERT INTO batches(batch_id, backend, submitted_at, requests) VALUES (?, ?, ?, ?)",
+                (batch_id, backend, time.time(), len(requests))
+            )
+            self.conn.executemany(
+                "UPDATE items SET status = 'submitted', batch_id = ?, ledger_entry = ?, "
+                "catalog_version = ?, job_ids = ? WHERE seq = ?",
+                ((batch_id, entry, version, json.dumps(job_ids), seq) for seq, entry, version, job_ids in requests)
+            )
+
+    def open_batches(self) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT batch_id FROM batches WHERE status = 'running' ORDER BY submitted_at"
+        )]
+
+    def batch_items(self, batch_id: str) -> Dict[int, Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT seq, item_id, source, attempts, ledger_entry, catalog_version, job_ids "
+            "FROM items WHERE batch_id = ? AND status = 'submitted'",
+            (batch_id,)
+        )
+        return {
+            row[0]: {
+                'item': Item(*row[:4]),
+                'ledger_entry': row[4],
+                'catalog_version': row[5],
+                'job_ids': json.loads(row[6])
+            }
+            for row in rows
+        }
+
+    def close_batch(self, batch_id: str, status: str) -> None:
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("UPDATE batches SET status = ? WHERE batch_id = ?", (status, batch_id))
+            # Requests without a result go back to the queue
+            self.conn.execute(
+                "UPDATE items SET status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END, "
+                "attempts = attempts + 1, batch_id = NULL, error = 'no result in batch ' || ? "
+                "WHERE batch_id = ? AND status = 'submitted'",
+                (BATCH_MAX_ATTEMPTS, batch_id, batch_id)
+            )
+
+class ResultWriter:
+    """Append-only JSONL output, tolerant of a line cut off by a crash."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.written: Set[str] = set()
+        if os.path.exists(path):
+            self._recover()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _recover(self) -> None:
+        good = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    self.written.add(json.loads(line)['id'])
+                except (ValueError, KeyError):
+                    break
+                good += len(line)
+        if good < os.path.getsize(self.path):
+            logger.warning(f"Discarding a partial line at the end of {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        self.written.add(record['id'])
+
+    def close(self) -> None:
+        self.file.close()
+
+class RateLimiter:
+    """Token buckets pacing requests per minute and tokens per minute across threads."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.limits = (float(rpm), float(tpm))
+        self.levels = [float(rpm), float(tpm)]
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        for i, limit in enumerate(self.limits):
+            self.levels[i] = min(limit, self.levels[i] + elapsed * limit / 60.0)
+
+    def acquire(self, tokens: int) -> None:
+        """Wait until a request of this many tokens fits both limits, then take it."""
+        wanted = (1.0, min(float(tokens), self.limits[1]))
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                waits = [
+                    (amount - level) * 60.0 / limit
+                    for amount, level, limit in zip(wanted, self.levels, self.limits)
+                    if level < amount
+                ]
+                if not waits:
+                    self.levels[0] -= wanted[0]
+                    self.levels[1] -= wanted[1]
+                    return
+            time.sleep(max(waits))
+
+    def adjust(self, tokens: int) -> None:
+        """Return (or take) the difference between the estimated and actual tokens of a request."""
+        with self.lock:
+            self.levels[1] = min(self.limits[1], self.levels[1] + tokens)
+
+def keyword_scores(profile: ResumeProfile, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score jobs by the share of their keywords found in the resume, best first."""
+    scores = []
+    for job in jobs:
+        job_desc_lower = job['description'].lower()
+        job_keywords = [kw for kw in TECH_KEYWORDS if kw in job_desc_lower]
+        matched = [kw for kw in job_keywords if kw in profile.matched_keywords]
+        scores.append({
+            'job_id': job['id'],
+            'title': job['title'],
+            'score': len(matched) / len(job_keywords) * 100 if job_keywords else 0,
+            'matched_keywords': matched
+        })
+    scores.sort(key=lambda job: job['score'], reverse=True)
+    return scores
+
+class BatchScorer:
+    """Scores every resume of a source once, resuming from the checkpoint."""
+
+    def __init__(self, source: ResumeSource, checkpoint: Checkpoint, writer: ResultWriter,
+                 args: argparse.Namespace, catalog: JobCatalog):
+        self.source = source
+        self.checkpoint = checkpoint
+        self.writer = writer
+        self.args = args
+        self.catalog = catalog
+        self.new_jobs: Optional[List[Dict[str, Any]]] = None
+        if args.since_version is not None:
+            changes = catalog.changes_since(args.since_version)
+            if changes is None:
+                raise ValueError(f"The catalog change log no longer reaches back to version {args.since_version}")
+            self.new_jobs = catalog.get_jobs(changes['upserted'])
+            logger.info(f"Scoring against {len(self.new_jobs)} jobs added or updated since version {args.since_version}")
+
+        self.started = time.monotonic()
+        self.completed = 0
+        self.tokens = 0
+        self.last_progress = self.started
+
+    def prepare(self, item: Item) -> Prepared:
+        profile = get_resume_profile(self.source.text(item.source))
+        with catalog_snapshot(self.args.retrieval, self.catalog) as catalog_version:
+            if self.new_jobs is not None:
+                by_id = {job['id']: job for job in self.new_jobs}
+                jobs = [by_id[job['job_id']] for job in keyword_scores(profile, self.new_jobs)[:MAX_JOBS]]
+            else:
+                jobs = find_job_candidates(profile, limit=MAX_JOBS, retrieval=self.args.retrieval,
+                                           catalog=self.catalog)
+        prompt, budget, jobs = LLMJobMatchingService.build_request(
+            profile, jobs, self.args.detail, self.catalog.snapshot_key(catalog_version)
+        )
+        return Prepared(prompt, budget, profile, jobs, catalog_version)
+
+    def record(self, item: Item, catalog_version: int, job_ids: List[int], result: Dict[str, Any],
+               usage: Dict[str, Any]) -> None:
+        self.writer.write({
+            'id': item.item_id,
+            'source': item.source,
+            'task': 'job_matching',
+            'tenant': self.args.tenant,
+            'catalog_version': catalog_version,
+            'job_ids': job_ids,
+            'result': result,
+            'usage': {key: value for key, value in usage.items() if value is not None},
+            'mode': self.args.mode,
+            'completed_at': datetime.now(timezone.utc).isoformat()
+        })
+        self.checkpoint.finish(item.seq, 'done')
+        self.completed += 1
+        self.tokens += (usage.get('input_tokens') or 0) + (usage.get('output_tokens') or 0)
+
+    def fail(self, item: Item, error: Exception) -> None:
+        logger.error(f"Failed to score {item.item_id}: {error}")
+        self.checkpoint.finish(item.seq, 'failed', str(error))
+
+    def report_progress(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self.last_progress < PROGRESS_INTERVAL:
+            return
+        self.last_progress = now
+        counts = self.checkpoint.counts()
+        remaining = counts.get('pending', 0) + counts.get('submitted', 0)
+        hours = (now - self.started) / 3600.0
+        rate = self.completed / hours if hours > 0 else 0.0
+        message = (
+            f"{counts.get('done', 0)} done, {counts.get('failed', 0)} failed, {remaining} remaining; "
+            f"{rate:.0f} resumes/hour"
+        )
+        if rate > 0 and remaining:
+            message += f", ETA {remaining / rate:.2f}h"
+        if self.args.mode == 'online' and self.completed:
+            # Throughput the rate limits allow at the average request size so far
+            per_resume = self.tokens / self.completed
+            ceiling = min(self.args.rpm, self.args.tpm / per_resume if per_resume else self.args.rpm) * 60
+            message += f" (rate limits sustain ~{ceiling:.0f}/hour at {per_resume:.0f} tokens/resume)"
+        logger.info(message)
+
+    # Online mode
+
+    def _call(self, item: Item, limiter: RateLimiter) -> Tuple[Prepared, Dict[str, Any], Dict[str, Any]]:
+        """Score one resume, retrying transient failures; runs on a worker thread."""
+        prepared = self.prepare(item)
+        # Paced by the tokens of the model the request is routed to
+        _, plan = llm_handler.route(prepared.prompt, 'job_matching', prepared.budget)
+        estimate = plan['input_tokens'] + plan['max_tokens']
+        attempt = item.attempts
+        while True:
+            limiter.acquire(estimate)
+            usage: Dict[str, Any] = {}
+            try:
+                response = asyncio.run(llm_handler.generate_response(
+                    prepared.prompt,
+                    max_tokens=prepared.budget,
+                    temperature=JOB_MATCHING_TEMPERATURE,
+                    usage=usage,
+                    task='job_matching'
+                ))
+                actual = (usage.get('input_tokens') or 0) + (usage.get('output_tokens') or 0)
+                if actual:
+                    limiter.adjust(estimate - actual)
+                return prepared, LLMJobMatchingService.parse_response(response), usage
+            except QuotaExceededError as e:
+                limiter.adjust(estimate)
+                logger.warning(f"Token quota reached, waiting {e.retry_after}s")
+                time.sleep(e.retry_after)
+            except PromptTooLargeError:
+                raise
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.args.max_attempts:
+                    raise
+                delay = min(2 ** attempt, 60)
+                logger.warning(f"Scoring {item.item_id} failed ({e}); retrying in {delay}s")
+                time.sleep(delay)
+
+    def run_online(self) -> None:
+        limiter = RateLimiter(self.args.rpm, self.args.tpm)
+        queue = iter(self.checkpoint.pending())
+        inflight = {}
+        with ThreadPoolExecutor(max_workers=self.args.concurrency, thread_name_prefix='batch-score') as executor:
+            while True:
+                # Keep a bounded window of work in flight
+                while len(inflight) < self.args.concurrency * 2:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    context = contextvars.copy_context()
+                    inflight[executor.submit(context.run, self._call, item, limiter)] = item
+                if not inflight:
+                    break
+                done, _ = wait(inflight, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = inflight.pop(future)
+                    try:
+                        prepared, result, usage = future.result()
+                    except Exception as e:
+                        self.fail(item, e)
+                        continue
+                    self.record(item, prepared.catalog_version, [job['id'] for job in prepared.jobs], result, usage)
+                self.report_progress()
+
+    # Batch mode
+
+    def _local_backend(self) -> LocalBatchBackend:
+        """Local stand-in answering with keyword matches of the jobs in each request."""
+        self.local_requests: Dict[str, Prepared] = {}
+
+        def respond(request: BatchRequest) -> str:
+            prepared = self.local_requests.pop(request.custom_id)
+            matches = keyword_scores(prepared.profile, prepared.jobs)[:5]
+            return json.dumps(local_job_matches(matches, LOCAL_BACKEND_SUMMARY))
+
+        return LocalBatchBackend(respond, self.args.local_batch_dir)
+
+    def submit_batch(self, backend: BatchBackend) -> bool:
+        """Prepare and submit the next pending resumes; returns False when none could be submitted."""
+        requests, records = [], []
+        reserved = []
+        local = isinstance(backend, LocalBatchBackend)
+        for item in self.checkpoint.pending(self.args.batch_size):
+            try:
+                prepared = self.prepare(item)
+            except Exception as e:
+                self.fail(item, e)
+                continue
+
+            entry, model, budget = None, None, prepared.budget
+            if not local:
+                try:
+                    # The same model tier the task gets online
+                    model, plan = llm_handler.route(prepared.prompt, 'job_matching', prepared.budget, backend.name)
+                    budget = plan['max_tokens']
+                    entry = token_ledger.reserve(
+                        BATCH_CLIENT, backend.name, model, 'job_matching', plan['input_tokens'], budget
+                    )
+                except PromptTooLargeError as e:
+                    self.fail(item, e)
+                    continue
+                except QuotaExceededError as e:
+                    logger.warning(f"Token quota reached; holding the remaining resumes for {e.retry_after}s")
+                    break
+                reserved.append(entry)
+
+            custom_id = f"r{item.seq}"
+            if local:
+                self.local_requests[custom_id] = prepared
+            requests.append(BatchRequest(custom_id, prepared.prompt, budget, JOB_MATCHING_TEMPERATURE, model))
+            records.append((item.seq, entry, prepared.catalog_version, [job['id'] for job in prepared.jobs]))
+
+        if not requests:
+            return False
+        try:
+            batch_id = backend.submit(requests)
+        except Exception:
+            for entry in reserved:
+                token_ledger.settle(entry, None, succeeded=False)
+            raise
+        self.checkpoint.record_batch(batch_id, backend.name, records)
+        logger.info(f"Submitted batch {batch_id} with {len(requests)} resumes")
+        return True
+
+    def collect_batch(self, backend: BatchBackend, batch_id: str) -> bool:
+        """Write the results of a batch if it has ended; returns whether it is closed."""
+        status = backend.status(batch_id)
+        if status == 'running':
+            return False
+
+        if status == 'ended':
+            pending = self.checkpoint.batch_items(batch_id)
+            for result in backend.results(batch_id):
+                entry = pending.pop(int(result.custom_id[1:]), None)
+                if entry is None:
+                    continue
+                item = entry['item']
+                try:
+                    if result.error:
+                        raise RuntimeError(result.error)
+                    parsed = LLMJobMatchingService.parse_response(result.text)
+                except Exception as e:
+                    if entry['ledger_entry'] is not None:
+                        token_ledger.settle(entry['ledger_entry'], None, succeeded=False)
+                    self.fail(item, e)
+                    continue
+                if entry['ledger_entry'] is not None:
+                    token_ledger.settle(entry['ledger_entry'], result.usage, succeeded=True)
+                self.record(item, entry['catalog_version'], entry['job_ids'], parsed, result.usage)
+        else:
+            logger.error(f"Batch {batch_id} failed; requeueing its resumes")
+
+        self.checkpoint.close_batch(batch_id, status)
+        return True
+
+    def run_batch(self) -> None:
+        if self.args.backend == 'local':
+            backend = self._local_backend()
+        else:
+            backend = get_batch_backend(self.args.backend)
+        while True:
+            open_batches = [
+                batch_id for batch_id in self.checkpoint.open_batches()
+                if not self.collect_batch(backend, batch_id)
+            ]
+
+            submitted = False
+            while len(open_batches) < self.args.max_open_batches and self.submit_batch(backend):
+                open_batches = self.checkpoint.open_batches()
+                submitted = True
+
+            self.report_progress()
+            if not open_batches:
+                if not self.checkpoint.pending(1):
+                    break
+                if not submitted:
+                    # Held back by the token quota
+                    time.sleep(self.args.poll_interval)
+                continue
+            time.sleep(self.args.poll_interval)
+
+    def run(self) -> Dict[str, int]:
+        if self.new_jobs == []:
+            logger.info(f"No jobs were added or updated since version {self.args.since_version}")
+            return self.checkpoint.counts()
+        if self.args.mode == 'online':
+            self.run_online()
+        else:
+            self.run_batch()
+        self.report_progress(force=True)
+        return self.checkpoint.counts()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Score resumes against the job catalog with an LLM.')
+    parser.add_argument('--input', required=True, help='Directory of resumes or a JSONL file of {id, resume_text}')
+    parser.add_argument('--output', required=True, help='JSONL file the results are appended to')
+    parser.add_argument('--checkpoint', help='Checkpoint database (default: <output>.checkpoint.db)')
+    parser.add_argument('--mode', choices=('online', 'batch'), default='online')
+    parser.add_argument('--backend', choices=('auto', 'openai', 'anthropic', 'local'), default='auto',
+                        help='Batch API used in batch mode')
+    parser.add_argument('--detail', choices=('full', 'compact'), default='full')
+    parser.add_argument('--retrieval', choices=('keyword', 'semantic'), default=None)
+    parser.add_argument('--tenant', default=None, help='Tenant whose job catalog is scored against (default catalog if omitted)')
+    parser.add_argument('--since-version', type=int, default=None,
+                        help='Only score against jobs added or updated after this catalog version')
+    parser.add_argument('--concurrency', type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument('--rpm', type=int, default=BATCH_RPM, help='Requests per minute in online mode')
+    parser.add_argument('--tpm', type=int, default=BATCH_TPM, help='Tokens per minute in online mode')
+    parser.add_argument('--max-attempts', type=int, default=BATCH_MAX_ATTEMPTS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--max-open-batches', type=int, default=BATCH_MAX_OPEN)
+    parser.add_argument('--poll-interval', type=float, default=BATCH_POLL_INTERVAL)
+    parser.add_argument('--local-batch-dir', default=LOCAL_BATCH_DIR)
+    parser.add_argument('--retry-failed', action='store_true', help='Score resumes that failed in earlier runs again')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    args = parse_args(argv)
+
+    try:
+        source = ResumeSource(args.input)
+        catalog = tenant_catalogs.get(args.tenant)
+        checkpoint = Checkpoint(args.checkpoint or f"{args.output}.checkpoint.db")
+        checkpoint.check_settings({
+            'input': os.path.abspath(args.input),
+            'mode': args.mode,
+            'backend': args.backend,
+            'detail': args.detail,
+            'retrieval': args.retrieval,
+            'since_version': args.since_version,
+            # Only recorded when set, so checkpoints from before tenants resume
+            **({'tenant': args.tenant} if args.tenant else {})
+        })
+    except (ValueError, JobCatalogError) as e:
+        logger.error(str(e))
+        return 2
+    added = checkpoint.add_items(source.items())
+    writer = ResultWriter(args.output)
+    checkpoint.mark_written(writer.written)
+    if args.retry_failed:
+        logger.info(f"Retrying {checkpoint.retry_failed()} failed resumes")
+    logger.info(f"{added} new resumes; {checkpoint.counts()}")
+
+    try:
+        with client_context(BATCH_CLIENT):
+            counts = BatchScorer(source, checkpoint, writer, args, catalog).run()
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    finally:
+        writer.close()
+    return 1 if counts.get('failed') else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""
+Synthetic resume and job description generator for SkillSnap benchmarks.
+
+Documents are built from role families whose skills follow a Zipf-like
+popularity distribution, with log-normal lengths, so keyword overlap and
+document sizes resemble a real job board. Generation is deterministic for a
+given seed and streams, so catalogs of a million jobs never sit in memory.
+
+Usage:
+    python benchmarks/corpus.py --jobs 1000 --out jobs.json   # for /api/jobs/import
+    python benchmarks/corpus.py --resumes 5 --out resumes.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_catalog import JobCatalog  # noqa: E402
+from ml_utils import SKILLS_DB, TECH_KEYWORDS  # noqa: E402
+
+DEFAULT_SEED = 42
+IMPORT_BATCH_SIZE = 5000
+
+# Skills are ranked by popularity; lower ranks are drawn far more often
+SKILL_VOCABULARY = list(dict.fromkeys(TECH_KEYWORDS + SKILLS_DB))
+ZIPF_EXPONENT = 1.1
+
+ROLE_FAMILIES = {
+    'Backend Engineer': ['python', 'java', 'sql', 'postgresql', 'api', 'rest', 'microservices', 'docker', 'redis'],
+    'Frontend Developer': ['javascript', 'react', 'typescript', 'html', 'css', 'vue', 'angular', 'frontend'],
+    'Full Stack Developer': ['javascript', 'react', 'node.js', 'python', 'sql', 'mongodb', 'api', 'git'],
+    'Data Scientist': ['python', 'machine learning', 'statistics', 'pandas', 'numpy', 'sql', 'tensorflow'],
+    'Data Engineer': ['python', 'spark', 'hadoop', 'sql', 'airflow', 'aws', 'data', 'kafka'],
+    'DevOps Engineer': ['docker', 'kubernetes', 'terraform', 'aws', 'ci/cd', 'linux', 'jenkins', 'bash'],
+    'Machine Learning Engineer': ['python', 'pytorch', 'tensorflow', 'deep learning', 'docker', 'aws', 'mlops'],
+    'Mobile Developer': ['swift', 'kotlin', 'react native', 'flutter', 'ios', 'android', 'git'],
+    'Data Analyst': ['sql', 'tableau', 'power bi', 'excel', 'statistics', 'data', 'analysis'],
+    'QA Engineer': ['testing', 'unit testing', 'integration', 'selenium', 'python', 'agile', 'ci/cd'],
+}
+SENIORITIES = ['Junior', '', 'Senior', 'Lead', 'Principal']
+
+FILLER = [
+    "We are a fast-growing company building products used by millions of customers.",
+    "You will collaborate with product managers, designers and other engineers.",
+    "The team values ownership, code review and continuous improvement.",
+    "We offer flexible working hours, remote options and a learning budget.",
+    "You will take part in planning, estimation and technical design discussions.",
+    "Our platform processes large volumes of data with strict reliability goals.",
+    "Experience in an agile or scrum environment is a plus.",
+    "Strong communication skills and a collaborative mindset are essential.",
+]
+SKILL_SENTENCES = [
+    "Hands-on experience with {} is required.",
+    "You should be comfortable working with {}.",
+    "Familiarity with {} is a strong plus.",
+    "Build and maintain services using {}.",
+    "Proven track record delivering projects with {}.",
+]
+RESUME_SENTENCES = [
+    "Built and shipped features using {} for a production system.",
+    "Improved performance and reliability of a service written with {}.",
+    "Led a migration project involving {}.",
+    "Mentored teammates on best practices for {}.",
+    "Designed and implemented tooling around {}.",
+]
+
+def _zipf_weights(count: int, exponent: float = ZIPF_EXPONENT) -> List[float]:
+    return [1.0 / math.pow(rank, exponent) for rank in range(1, count + 1)]
+
+class CorpusGenerator:
+    """Deterministic generator of synthetic jobs and resumes."""
+
+    def __init__(self, seed: int = DEFAULT_SEED):
+        self.seed = seed
+        self._weights = _zipf_weights(len(SKILL_VOCABULARY))
+        self._families = list(ROLE_FAMILIES)
+
+    def _skills(self, rng: random.Random, family: str, count: int) -> List[str]:
+        """Mix a role family's core skills with popularity-weighted extras."""
+        core = ROLE_FAMILIES[family]
+        skills = rng.sample(core, k=min(len(core), max(2, count * 2 // 3)))
+        while len(skills) < count:
+            skill = rng.choices(SKILL_VOCABULARY, weights=self._weights)[0]
+            if skill not in skills:
+                skills.append(skill)
+        return skills
+
+    @staticmethod
+    def _length(rng: random.Random, median: int, sigma: float = 0.4) -> int:
+        return max(1, int(rng.lognormvariate(math.log(median), sigma)))
+
+    def jobs(self, count: int) -> Iterator[Dict[str, str]]:
+        """Yield job dictionaries with 'title' and 'description'."""
+        rng = random.Random(self.seed)
+        for _ in range(count):
+            family = rng.choice(self._families)
+            seniority = rng.choice(SENIORITIES)
+            skills = self._skills(rng, family, self._length(rng, 7, 0.3))
+
+            sentences = [rng.choice(SKILL_SENTENCES).format(skill) for skill in skills]
+            sentences += rng.sample(FILLER, k=min(len(FILLER), self._length(rng, 3)))
+            rng.shuffle(sentences)
+            yield {
+                'title': f"{seniority} {family}".strip(),
+                'description': ' '.join(sentences)
+            }
+
+    def resumes(self, count: int) -> Iterator[str]:
+        """Yield resume texts with summary, experience, education and skills sections."""
+        rng = random.Random(self.seed + 1)
+        for _ in range(count):
+            family = rng.choice(self._families)
+            skills = self._skills(rng, family, self._length(rng, 12, 0.35))
+            years = rng.randint(1, 15)
+
+            experience = []
+            for job in range(self._length(rng, 3, 0.3)):
+                experience.append(f"{family}, Company {rng.randint(1, 999)} ({2024 - 3 * job - 3} - {2024 - 3 * job})")
+                experience += [rng.choice(RESUME_SENTENCES).format(rng.choice(skills))
+                               for _ in range(self._length(rng, 4, 0.3))]
+
+            yield '\n'.join([
+                'SUMMARY',
+                f"{family} with {years} years of experience delivering software for customers.",
+                'EXPERIENCE',
+                *experience,
+                'EDUCATION',
+                f"B.Sc. Computer Science, University {rng.randint(1, 99)}",
+                'SKILLS',
+                ', '.join(skills)
+            ])
+
+def build_catalog(db_path: str, count: int, seed: int = DEFAULT_SEED) -> JobCatalog:
+    """
+    Create a job catalog database with synthetic jobs, reusing an existing
+    one at the same path.
+    """
+    catalog = JobCatalog(db_path, seed_path=None)
+    if catalog.count() == count:
+        return catalog
+
+    generator = CorpusGenerator(seed).jobs(count)
+    batch, replace = [], True
+    for job in generator:
+        batch.append(job)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            catalog.import_jobs(batch, replace=replace)
+            batch, replace = [], False
+    if batch or replace:
+        catalog.import_jobs(batch, replace=replace)
+    return catalog
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=0, help="Number of jobs to generate")
+    parser.add_argument('--resumes', type=int, default=0, help="Number of resumes to generate")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--out', help="Output JSON file (defaults to stdout)")
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    if args.jobs:
+        data = list(generator.jobs(args.jobs))
+    else:
+        data = list(generator.resumes(args.resumes or 1))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(data, f, indent=2)
+    else:
+        json.dump(data, sys.stdout, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Benchmark suite for SkillSnap's matching engine.
+
+Covers job matching, candidate retrieval, skill gap analysis, PDF extraction
+and prompt building against synthetic catalogs (see corpus.py). Each catalog
+size runs in a fresh process so timings and peak memory are not skewed by
+earlier sizes.
+
+Usage:
+    python benchmarks/run.py                          # sizes 10, 1000, 10000
+    python benchmarks/run.py --sizes 10,100000,1000000
+    python benchmarks/run.py --save-baseline          # store results as the baseline
+    python benchmarks/run.py --check                  # fail on hot-path regressions
+
+--check exits with status 1 when the throughput of any hot-path benchmark
+drops by more than --threshold (default 25%) against the stored baseline.
+Baselines are machine-specific; regenerate them on the machine that runs the
+check.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+DATA_DIR = os.path.join(BENCHMARK_DIR, '.data')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baselines.json')
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_THRESHOLD = 0.25
+
+# Building the semantic index embeds every job, so skip it on huge catalogs
+SEMANTIC_MAX_JOBS = 100000
+
+# name -> (setup function, group, scaled with catalog size, hot path)
+BENCHMARKS: Dict[str, Tuple[Callable, str, bool, bool]] = {}
+
+def benchmark(name: str, group: str, scaled: bool = False, hot: bool = False):
+    """
+    Register a benchmark.
+
+    The decorated setup function receives the catalog size and returns a
+    (function, operations per call) pair; the function is what gets timed.
+    Scaled benchmarks run once per catalog size, the others once overall.
+    """
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS[name] = (setup, group, scaled, hot)
+        return setup
+    return register
+
+def _resumes(count: int = 20) -> List[str]:
+    from corpus import CorpusGenerator
+    return list(CorpusGenerator().resumes(count))
+
+@benchmark('recommend_jobs.keyword', 'matching', scaled=True, hot=True)
+def bench_recommend_keyword(size: int):
+    from ml_utils import ResumeProfile, recommend_jobs
+    profiles = [ResumeProfile(text) for text in _resumes()]
+    return (lambda: [recommend_jobs(p, top_k=5, retrieval='keyword') for p in profiles]), len(profiles)
+
+@benchmark('recommend_jobs.semantic', 'matching', scaled=True, hot=True)
+def bench_recommend_semantic(size: int):
+    from ml_utils import ResumeProfile, recommend_jobs
+    from semantic_index import get_semantic_index
+    if size > SEMANTIC_MAX_JOBS:
+        return None
+    get_semantic_index()
+    profiles = [ResumeProfile(text) for text in _resumes()]
+    return (lambda: [recommend_jobs(p, top_k=5, retrieval='semantic') for p in profiles]), len(profiles)
+
+@benchmark('find_job_candidates.keyword', 'matching', scaled=True, hot=True)
+def bench_candidates(size: int):
+    from ml_utils import ResumeProfile, find_job_candidates
+    profiles = [ResumeProfile(text) for text in _resumes()]
+    return (lambda: [find_job_candidates(p, limit=20, retrieval='keyword') for p in profiles]), len(profiles)
+
+@benchmark('semantic_index.build', 'matching', scaled=True)
+def bench_semantic_build(size: int):
+    from job_catalog import job_catalog
+    from semantic_index import SemanticJobIndex
+    if size > SEMANTIC_MAX_JOBS:
+        return None
+    jobs = list(job_catalog.iter_jobs())
+    return (lambda: SemanticJobIndex.build(jobs, 0)), len(jobs)
+
+@benchmark('skill_matrix.gap_report', 'matching', scaled=True, hot=True)
+def bench_skill_matrix(size: int):
+    from ml_utils import ResumeProfile
+    from skill_matrix import get_skill_matrix
+    matrix = get_skill_matrix()
+    profiles = [ResumeProfile(text) for text in _resumes()]
+    return (lambda: [matrix.gap_report(p.matched_skills) for p in profiles]), len(profiles)
+
+@benchmark('resume_profile.build', 'matching', hot=True)
+def bench_profile(size: int):
+    from ml_utils import ResumeProfile
+    resumes = _resumes()
+    return (lambda: [ResumeProfile(text) for text in resumes]), len(resumes)
+
+@benchmark('skill_matcher.match', 'matching', hot=True)
+def bench_skill_matcher(size: int):
+    from skill_matcher import SkillMatcher, get_skill_matcher
+    resumes = _resumes()
+    # A fresh matcher each call so fuzzy lookups are not all answered from its cache
+    skills = get_skill_matcher().skills
+    return (lambda: [SkillMatcher(skills).match(text) for text in resumes]), len(resumes)
+
+@benchmark('analyze_skill_gap.local', 'matching', hot=True)
+def bench_skill_gap(size: int):
+    from corpus import CorpusGenerator
+    from ml_utils import ResumeProfile, analyze_skill_gap
+    profiles = [ResumeProfile(text) for text in _resumes()]
+    jobs = [job['description'] for job in CorpusGenerator().jobs(len(profiles))]
+    pairs = list(zip(profiles, jobs))
+    return (lambda: [analyze_skill_gap(p, jd) for p, jd in pairs]), len(pairs)
+
+def _extraction(mode: str):
+    from extraction_benchmark import synthetic_corpus
+    from ml_utils import _extract_with_backend
+    corpus = [data for _, data in synthetic_corpus()]
+    return (lambda: [_extract_with_backend(data, mode) for data in corpus]), len(corpus)
+
+@benchmark('extraction.fast', 'extraction', hot=True)
+def bench_extraction_fast(size: int):
+    return _extraction('fast')
+
+@benchmark('extraction.auto', 'extraction')
+def bench_extraction_auto(size: int):
+    return _extraction('auto')
+
+@benchmark('extraction.layout', 'extraction')
+def bench_extraction_layout(size: int):
+    return _extraction('layout')
+
+@benchmark('prompt.job_matching', 'prompts', hot=True)
+def bench_prompt_job_matching(size: int):
+    from corpus import CorpusGenerator
+    from utils.prompt_templates import PromptTemplates
+    resumes = _resumes()
+    jobs = list(CorpusGenerator().jobs(20))
+    return (lambda: [PromptTemplates.job_matching_prompt(resume, jobs) for resume in resumes]), len(resumes)
+
+@benchmark('prompt.job_matching.request', 'prompts', hot=True)
+def bench_job_matching_request(size: int):
+    from job_catalog import job_catalog
+    from ml_utils import ResumeProfile
+    from services.llm_services import LLMJobMatchingService
+    # The production path: stored job profiles, context fitting and the job block cache
+    profiles = [ResumeProfile(text) for text in _resumes()]
+    jobs = list(job_catalog.iter_jobs(limit=20))
+    catalog_key = job_catalog.snapshot_key(job_catalog.version())
+    return (lambda: [LLMJobMatchingService.build_request(p, jobs, catalog_key=catalog_key)
+                     for p in profiles]), len(profiles)
+
+@benchmark('job_profiles.store', 'prompts')
+def bench_job_profile_store(size: int):
+    import job_profiles
+    from job_catalog import job_catalog
+    jobs = list(job_catalog.iter_jobs(limit=20))
+    job_profiles.get_profiles(jobs)
+
+    def lookup():
+        # Past the in-memory cache, as after its TTL or in a fresh worker
+        for _ in range(20):
+            job_profiles._profile_cache.clear()
+            job_profiles.get_profiles(jobs)
+    return lookup, 20
+
+@benchmark('prompt.skill_gap', 'prompts')
+def bench_prompt_skill_gap(size: int):
+    from corpus import CorpusGenerator
+    from utils.prompt_templates import PromptTemplates
+    resume = _resumes(1)[0]
+    job = next(CorpusGenerator().jobs(1))['description']
+    return (lambda: PromptTemplates.skill_gap_prompt(resume, job)), 1
+
+def measure(fn: Callable, ops: int, min_time: float, max_rounds: int) -> Dict[str, Any]:
+    """Time repeated calls, then measure peak allocations of a single call."""
+    fn()  # warm caches and lazy imports
+
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_rounds and (len(timings) < 3 or time.perf_counter() - start < min_time):
+        call_start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        'rounds': len(timings),
+        'median_ms': round(median * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'ops_per_second': round(ops / median, 2) if median > 0 else None,
+        'peak_alloc_kb': round(peak / 1024, 1)
+    }
+
+def run_worker(size: int, scaled: bool, names: Optional[List[str]], min_time: float,
+               max_rounds: int) -> Dict[str, Any]:
+    """Run the benchmarks of one kind in this process, against the catalog of the given size."""
+    sys.path.insert(0, BENCHMARK_DIR)
+    results = {}
+    for name, (setup, group, is_scaled, hot) in BENCHMARKS.items():
+        if is_scaled != scaled or (names and name not in names):
+            continue
+        prepared = setup(size)
+        if prepared is None:
+            continue
+        fn, ops = prepared
+        key = f"{name}[{size}]" if scaled else name
+        results[key] = dict(measure(fn, ops, min_time, max_rounds), group=group, hot=hot)
+        print(f"  {key:<42} {results[key]['ops_per_second']:>12} ops/s "
+              f"{results[key]['peak_alloc_kb']:>10} KB", file=sys.stderr)
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'results': results, 'max_rss_kb': maxrss}
+
+def spawn(size: int, scaled: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run a worker in a fresh process with its own catalog and in-memory caches."""
+    from corpus import build_catalog
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    db_path = os.path.join(DATA_DIR, f"jobs_{size}.db")
+    build_start = time.perf_counter()
+    build_catalog(db_path, size)
+    print(f"Catalog of {size} jobs ready in {time.perf_counter() - build_start:.1f}s", file=sys.stderr)
+
+    env = dict(os.environ, JOB_CATALOG_DB=db_path, CACHE_BACKEND='memory', CATALOG_ARRAYS_DIR='',
+               JOB_PROFILE_DB=os.path.join(DATA_DIR, 'job_profiles.db'))
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--size', str(size),
+               '--min-time', str(args.min_time), '--max-rounds', str(args.max_rounds)]
+    if scaled:
+        command.append('--scaled')
+    if args.only:
+        command += ['--only', args.only]
+    output = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[str]:
+    """List hot-path benchmarks whose throughput dropped more than the threshold."""
+    regressions = []
+    for key, result in sorted(results.items()):
+        previous = baseline.get(key)
+        if not previous or not previous.get('ops_per_second') or not result.get('ops_per_second'):
+            continue
+        change = result['ops_per_second'] / previous['ops_per_second'] - 1.0
+        flag = ''
+        if result['hot'] and change < -threshold:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"{key:<44} {previous['ops_per_second']:>12} -> {result['ops_per_second']:>12} ops/s "
+              f"({change:+.1%}){flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated catalog sizes")
+    parser.add_argument('--only', help="Comma-separated benchmark names to run")
+    parser.add_argument('--min-time', type=float, default=1.0, help="Minimum seconds timed per benchmark")
+    parser.add_argument('--max-rounds', type=int, default=50, help="Maximum timed calls per benchmark")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store results in baselines.json")
+    parser.add_argument('--check', action='store_true', help="Fail if hot paths regressed against the baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed fractional throughput drop for --check")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scaled', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else None
+    if args.worker:
+        json.dump(run_worker(args.size, args.scaled, names, args.min_time, args.max_rounds), sys.stdout)
+        return
+
+    sys.path.insert(0, BENCHMARK_DIR)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results, max_rss = {}, {}
+    for index, size in enumerate(sizes):
+        # Unscaled benchmarks only need one run, against the smallest catalog
+        for scaled in ([True, False] if index == 0 else [True]):
+            worker = spawn(size, scaled, args)
+            results.update(worker['results'])
+            max_rss[f"{'scaled' if scaled else 'fixed'}[{size}]"] = worker['max_rss_kb']
+
+    report = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor() or platform.machine()},
+        'max_rss_kb': max_rss,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            print("No baseline stored; run with --save-baseline first")
+            sys.exit(1)
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} hot-path benchmark(s) regressed by more than {args.threshold:.0%}: "
+                  f"{', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo hot-path regressions")
+
+    if args.save_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        baseline['machine'] = report['machine']
+        baseline['results'].update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {BASELINE_PATH}")
+
+if __name__ == '__main__':
+    main()
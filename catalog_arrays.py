@@ -0,0 +1,140 @@
+"""
+Shared, memory-mapped arrays for job catalog indexes.
+
+Indexes such as the skill matrix and the semantic index are built once per
+catalog version and written as .npy files to CATALOG_ARRAYS_DIR. Every
+gunicorn worker then maps the same files read-only, so the operating system
+shares one copy of the pages between all workers. Total memory stays
+roughly constant as workers are added, and a new worker attaches instantly
+instead of rebuilding. Builds are serialized with a file lock, so after a
+catalog write only one process rebuilds and the others attach to its result.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; builds then race harmlessly
+    fcntl = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directory for shared index files; empty keeps indexes in process memory
+CATALOG_ARRAYS_DIR = os.getenv('CATALOG_ARRAYS_DIR', 'catalog_arrays')
+# Builds kept per index; older ones are removed after a new one is published
+KEEP_BUILDS = 2
+
+MANIFEST = 'manifest.json'
+
+class StringTable:
+    """Read-only list of strings stored as a UTF-8 blob and offsets."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def encode(strings: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Encode strings into 'blob' and 'offsets' arrays."""
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return {
+            'blob': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'offsets': offsets
+        }
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+@contextmanager
+def _build_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on path across processes."""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def _attach(path: str) -> Dict[str, np.ndarray]:
+    """Map every array of a published build read-only."""
+    with open(os.path.join(path, MANIFEST), 'r') as f:
+        names = json.load(f)['arrays']
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in names}
+
+def _write(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """Write arrays to a temporary directory and rename it into place."""
+    temporary = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(temporary)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(temporary, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(temporary, MANIFEST), 'w') as f:
+            json.dump({'arrays': list(arrays), 'created_at': time.time()}, f)
+        os.rename(temporary, path)
+    except OSError:
+        shutil.rmtree(temporary, ignore_errors=True)
+        if not os.path.exists(os.path.join(path, MANIFEST)):
+            raise
+
+def _prune(directory: str, index: str) -> None:
+    """Remove all but the newest KEEP_BUILDS builds of an index."""
+    builds: List[str] = [
+        os.path.join(directory, entry) for entry in os.listdir(directory)
+        if entry.startswith(f"{index}-") and '.tmp-' not in entry
+    ]
+    builds.sort(key=os.path.getmtime, reverse=True)
+    for path in builds[KEEP_BUILDS:]:
+        # Workers still mapping these files keep them until they let go
+        shutil.rmtree(path, ignore_errors=True)
+
+def load_or_build(index: str, key: str, build: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Get an index's arrays for a build key, attaching to a published build or
+    building and publishing it.
+
+    Args:
+        index: Index name, e.g. 'skill_matrix-<catalog id>'; the newest
+            KEEP_BUILDS builds of each index are kept
+        key: Identifies the inputs, e.g. catalog version
+        build: Function returning the arrays by name
+
+    Returns:
+        Arrays by name: read-only memory maps, or the built arrays when
+        CATALOG_ARRAYS_DIR is empty
+    """
+    if not CATALOG_ARRAYS_DIR:
+        return build()
+
+    os.makedirs(CATALOG_ARRAYS_DIR, exist_ok=True)
+    path = os.path.join(CATALOG_ARRAYS_DIR, f"{index}-{key}")
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        return _attach(path)
+
+    with _build_lock(os.path.join(CATALOG_ARRAYS_DIR, f"{index}.lock")):
+        # Another process may have published it while we waited
+        if not os.path.exists(os.path.join(path, MANIFEST)):
+            start = time.perf_counter()
+            _write(path, build())
+            _prune(CATALOG_ARRAYS_DIR, index)
+            logger.info(f"Published {index} arrays to {path} in {time.perf_counter() - start:.2f}s")
+    return _attach(path)
@@ -0,0 +1,177 @@
+"""
+Versioned, immutable snapshots of catalog indexes for SkillSnap.
+
+An index snapshot is a base built from the whole catalog (shared by workers
+through catalog_arrays) plus a small delta segment holding the jobs changed
+since the base version. Catalog writes only rebuild the delta; once it grows
+past a fraction of the base, the next snapshot merges it into a new base.
+
+Snapshots are never modified after they are built. A new one is swapped in
+with a single reference assignment, so readers never block or see partial
+state: while one thread builds the next version, other requests keep using
+the current snapshot and report its version.
+
+Each catalog (one per tenant) has its own snapshots, created on first use and
+released together with the catalog object.
+"""
+
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Merge the delta into a new base once it holds this share of the base jobs...
+DELTA_MERGE_RATIO = float(os.getenv('CATALOG_DELTA_MERGE_RATIO', '0.05'))
+# ...but never before it holds this many jobs
+DELTA_MERGE_MIN_JOBS = int(os.getenv('CATALOG_DELTA_MERGE_MIN_JOBS', '200'))
+
+class CatalogDelta:
+    """Jobs changed in a catalog between a base version and a later version."""
+
+    def __init__(self, base_version: int, version: int, jobs: List[Dict[str, Any]],
+                 removed_ids: frozenset):
+        self.base_version = base_version
+        self.version = version
+        # Current content of jobs added or updated since the base
+        self.jobs = jobs
+        # Jobs whose base rows are stale: updated or deleted since the base
+        self.removed_ids = removed_ids
+
+    def __len__(self) -> int:
+        # Every changed job, since added and updated ids are hidden in the base too
+        return len(self.removed_ids)
+
+def load_delta(catalog, base_version: int) -> Optional[CatalogDelta]:
+    """
+    Read the changes since a base version from one consistent catalog snapshot.
+
+    Returns:
+        The delta, or None if the catalog's change log no longer covers it
+    """
+    with catalog.read_snapshot():
+        changes = catalog.changes_since(base_version)
+        if changes is None:
+            return None
+        jobs = catalog.get_jobs(changes['upserted'])
+    return CatalogDelta(
+        base_version,
+        changes['version'],
+        jobs,
+        # Updated jobs are hidden in the base and served from the delta
+        frozenset(changes['upserted']) | frozenset(changes['deleted'])
+    )
+
+S = TypeVar('S')
+
+class SnapshotStore(Generic[S]):
+    """
+    Holds the current snapshot of one catalog index and swaps in new versions.
+
+    Snapshots must have 'version' and 'base' attributes, where 'base' is the
+    snapshot the delta was applied to (or the snapshot itself for a base),
+    and a length in jobs, which sets when deltas are merged.
+    """
+
+    def __init__(self, name: str, build_base: Callable[[Any, int], S],
+                 apply_delta: Callable[[S, CatalogDelta], S]):
+        """
+        Args:
+            name: Index name, for logging
+            build_base: Function building a base snapshot from (catalog, version)
+            apply_delta: Function returning a new snapshot of (base, delta)
+        """
+        self.name = name
+        self.build_base = build_base
+        self.apply_delta = apply_delta
+        self._current: Optional[S] = None
+        self._lock = threading.Lock()
+
+    def get(self, catalog) -> S:
+        """
+        Get the snapshot for the catalog's current version.
+
+        Only the first caller to see a new version builds its snapshot;
+        concurrent callers get the previous snapshot instead of waiting, and
+        only the very first snapshot blocks.
+        """
+        snapshot = self._current
+        if snapshot is not None and snapshot.version == catalog.version():
+            return snapshot
+
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            with catalog.read_snapshot() as version:
+                snapshot = self._current
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self._advance(catalog, snapshot, version)
+                    self._current = snapshot
+            return snapshot
+        finally:
+            self._lock.release()
+
+    def _advance(self, catalog, snapshot: Optional[S], version: int) -> S:
+        """Build the snapshot for a version from the current one."""
+        if snapshot is None:
+            return self.build_base(catalog, version)
+
+        base = snapshot.base
+        delta = load_delta(catalog, base.version)
+        if delta is None:
+            logger.info(f"Rebuilding {self.name} for catalog version {version}: change log truncated or reset")
+            return self.build_base(catalog, version)
+
+        if len(delta) > max(DELTA_MERGE_MIN_JOBS, DELTA_MERGE_RATIO * len(base)):
+            logger.info(f"Merging {len(delta)} changed jobs into a new {self.name} base at version {version}")
+            return self.build_base(catalog, version)
+
+        return self.apply_delta(base, delta)
+
+# Every CatalogSnapshots instance, for index_bytes()
+_indexes: List['CatalogSnapshots'] = []
+
+class CatalogSnapshots(Generic[S]):
+    """
+    One SnapshotStore of an index per catalog.
+
+    Stores are keyed weakly by catalog object, so a catalog evicted from the
+    tenant cache takes its index snapshots with it once no request uses it.
+    Snapshots must also have an 'nbytes' attribute, for index_bytes().
+    """
+
+    def __init__(self, name: str, build_base: Callable[[Any, int], S],
+                 apply_delta: Callable[[S, CatalogDelta], S]):
+        self.name = name
+        self.build_base = build_base
+        self.apply_delta = apply_delta
+        self._stores: 'weakref.WeakKeyDictionary[Any, SnapshotStore[S]]' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        _indexes.append(self)
+
+    def get(self, catalog) -> S:
+        """Get the snapshot of this index for the catalog's current version."""
+        store = self._stores.get(catalog)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(catalog)
+                if store is None:
+                    store = self._stores[catalog] = SnapshotStore(self.name, self.build_base, self.apply_delta)
+        return store.get(catalog)
+
+    def loaded(self, catalog) -> Optional[S]:
+        """Get the catalog's current snapshot of this index without building one."""
+        store = self._stores.get(catalog)
+        return store._current if store is not None else None
+
+def index_bytes(catalog) -> Dict[str, int]:
+    """Get the size of each index loaded for a catalog, by index name."""
+    sizes = {}
+    for index in _indexes:
+        snapshot = index.loaded(catalog)
+        if snapshot is not None:
+            sizes[index.name] = snapshot.nbytes
+    return sizes
@@ -0,0 +1,39 @@
+# Gunicorn configuration for SkillSnap
+#
+# The app is loaded and warmed once in the master process; workers are
+# forked from it and share the warmed state copy-on-write.
+
+import os
+import time
+
+preload_app = True
+
+# Threads per worker. Keep this above the slots plus queue lengths of all
+# workload classes (utils/admission.py) so cheap endpoints such as
+# /api/health always find a free thread when LLM and PDF requests pile up.
+threads = int(os.getenv('GUNICORN_THREADS', '20'))
+
+# Recycle workers to bound memory growth; size with the max_requests hint of
+# GET /api/admin/memory (MEMORY_PROFILING=true)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+_fork_time = None
+
+def when_ready(server):
+    """Runs in the master after the app is preloaded, before workers fork."""
+    from startup import warm_up, format_report
+
+    warm_up()
+    server.log.info(f"SkillSnap warm-up: {format_report()}")
+
+def post_fork(server, worker):
+    global _fork_time
+    _fork_time = time.perf_counter()
+
+def post_worker_init(worker):
+    from startup import record_worker_ready
+
+    ready_seconds = time.perf_counter() - _fork_time
+    record_worker_ready(ready_seconds)
+    worker.log.info(f"Worker {worker.pid} ready in {ready_seconds * 1000:.0f}ms")
@@ -0,0 +1,436 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.getenv('JOB_CATALOG_DB', 'job_catalog.db')
+DEFAULT_SEED_PATH = 'sample_jobs.json'
+# Versions of job changes kept for incremental index updates; indexes
+# further behind than this are rebuilt in full
+CHANGE_LOG_VERSIONS = int(os.getenv('JOB_CHANGE_LOG_VERSIONS', '10000'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, description, content='jobs', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- Jobs changed by each version, for incremental index updates
+CREATE TABLE IF NOT EXISTS job_changes (
+    version INTEGER NOT NULL,
+    job_id INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS job_changes_version ON job_changes(version);
+"""
+
+class JobCatalogError(Exception):
+    """Custom exception for job catalog errors."""
+    pass
+
+def validate_job(job: Any, partial: bool = False) -> Dict[str, str]:
+    """
+    Validate a job payload and return its cleaned fields.
+
+    Args:
+        job: Job dictionary with 'title' and 'description'
+        partial: Allow either field to be omitted (for updates)
+
+    Returns:
+        Dictionary with the validated fields
+
+    Raises:
+        JobCatalogError: If the payload is invalid
+    """
+    if not isinstance(job, dict):
+        raise JobCatalogError("Job must be a JSON object")
+
+    fields = {}
+    for field in ('title', 'description'):
+        if field not in job:
+            if partial:
+                continue
+            raise JobCatalogError(f"Job {field} is required")
+        value = job[field]
+        if not isinstance(value, str) or not value.strip():
+            raise JobCatalogError(f"Job {field} must be a non-empty string")
+        fields[field] = value.strip()
+
+    if not fields:
+        raise JobCatalogError("Nothing to update: provide title and/or description")
+
+    return fields
+
+def build_match_query(terms: Iterable[str]) -> str:
+    """
+    Build an FTS5 query matching any of the given terms.
+
+    Each term becomes a quoted prefix query so that 'api' also matches 'APIs'.
+    """
+    clauses = []
+    for term in terms:
+        words = [w for w in term.replace('"', ' ').replace('/', ' ').replace('.', ' ').split() if w]
+        if words:
+            clauses.append('"' + ' '.join(words) + '"*')
+    return ' OR '.join(clauses)
+
+class JobCatalog:
+    """SQLite-backed job catalog with an FTS5 index over title and description."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, seed_path: Optional[str] = DEFAULT_SEED_PATH):
+        self.db_path = db_path
+        self.seed_path = seed_path
+        self._local = threading.local()
+        self._initialized_pid = None
+        self._catalog_id = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get a connection for the current thread and process."""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            # Connections must not cross a fork, so reconnect in each worker
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = pid
+
+        if self._initialized_pid != pid:
+            self._initialize(conn)
+            self._initialized_pid = pid
+
+        return conn
+
+    def _initialize(self, conn: sqlite3.Connection) -> None:
+        """Create the schema and seed from the JSON file on first use."""
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            seeded = conn.execute("SELECT value FROM meta WHERE key = 'seeded'").fetchone()
+            if seeded is None:
+                conn.execute("INSERT INTO meta(key, value) VALUES ('seeded', '1')")
+                conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('version', '0')")
+                if self.seed_path and os.path.exists(self.seed_path):
+                    with open(self.seed_path, 'r') as f:
+                        jobs = json.load(f)
+                    self._insert_jobs(conn, [validate_job(job) for job in jobs])
+                    logger.info(f"Seeded job catalog with {len(jobs)} jobs from {self.seed_path}")
+            # Distinguishes this database from others that reach the same version
+            conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('catalog_id', ?)", (uuid.uuid4().hex,))
+            # Changes are only logged from this version on
+            conn.execute(
+                "INSERT OR IGNORE INTO meta(key, value) "
+                "SELECT 'changes_from', value FROM meta WHERE key = 'version'"
+            )
+
+    @staticmethod
+    def _insert_jobs(conn: sqlite3.Connection, jobs: List[Dict[str, str]]) -> None:
+        conn.executemany(
+            "INSERT INTO jobs(title, description) VALUES (:title, :description)",
+            jobs
+        )
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection, changed_ids: Iterable[int] = (),
+                      deleted: bool = False, reset: bool = False) -> int:
+        """
+        Increment the version and log the jobs it changed.
+
+        Args:
+            changed_ids: IDs of jobs added, updated or deleted
+            deleted: Whether the jobs were deleted
+            reset: The whole catalog changed, so indexes must be rebuilt in full
+        """
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'")
+        version = int(conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+
+        if reset:
+            conn.execute("DELETE FROM job_changes")
+            changes_from = version
+        else:
+            conn.executemany(
+                "INSERT INTO job_changes(version, job_id, deleted) VALUES (?, ?, ?)",
+                [(version, job_id, int(deleted)) for job_id in changed_ids]
+            )
+            changes_from = None
+            if version % 100 == 0:
+                cutoff = version - CHANGE_LOG_VERSIONS
+                conn.execute("DELETE FROM job_changes WHERE version <= ?", (cutoff,))
+                changes_from = cutoff
+        if changes_from is not None:
+            conn.execute(
+                "UPDATE meta SET value = MAX(CAST(value AS INTEGER), ?) WHERE key = 'changes_from'",
+                (changes_from,)
+            )
+        return version
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        return {'id': row['id'], 'title': row['title'], 'description': row['description']}
+
+    def version(self) -> int:
+        """Get the catalog version, incremented on every write."""
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row['value']) if row else 0
+
+    @contextmanager
+    def read_snapshot(self) -> Iterator[int]:
+        """
+        Read a consistent snapshot of the catalog in the block.
+
+        All catalog reads made by this thread inside the block see the same
+        version, even while other workers write, and never block writers.
+        Nested blocks share the outer snapshot.
+
+        Yields:
+            The version of the snapshot
+        """
+        conn = self._connection()
+        if conn.in_transaction:
+            yield self.version()
+            return
+
+        conn.execute('BEGIN')
+        try:
+            yield self.version()
+        finally:
+            conn.execute('COMMIT')
+
+    def changes_since(self, version: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the jobs changed after a version.
+
+        Returns:
+            Dictionary with the current 'version', the 'upserted' job IDs
+            (added or updated, not since deleted) and the 'deleted' job IDs,
+            or None if the change log no longer reaches back to the version
+        """
+        with self.read_snapshot() as current:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'changes_from'").fetchone()
+            if row is None or version < int(row['value']) or version > current:
+                return None
+
+            upserted, deleted = set(), set()
+            rows = conn.execute(
+                "SELECT job_id, deleted FROM job_changes WHERE version > ? ORDER BY version",
+                (version,)
+            )
+            for job_id, was_deleted in rows:
+                if was_deleted:
+                    upserted.discard(job_id)
+                    deleted.add(job_id)
+                else:
+                    deleted.discard(job_id)
+                    upserted.add(job_id)
+            return {'version': current, 'upserted': upserted, 'deleted': deleted}
+
+    def get_jobs(self, job_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Get the jobs with the given IDs that exist, in ID order."""
+        job_ids = sorted(set(job_ids))
+        conn = self._connection()
+        jobs = []
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT id, title, description FROM jobs WHERE id IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                chunk
+            ).fetchall()
+            jobs += [self._row_to_job(row) for row in rows]
+        return jobs
+
+    def catalog_id(self) -> str:
+        """Get the identifier of this catalog database, fixed when it is created."""
+        if self._catalog_id is None:
+            row = self._connection().execute("SELECT value FROM meta WHERE key = 'catalog_id'").fetchone()
+            self._catalog_id = row['value'] if row else ''
+        return self._catalog_id
+
+    def snapshot_key(self, version: int) -> str:
+        """Identify a version of this catalog among all catalogs, for cache keys."""
+        return f"{self.catalog_id()}:{version}"
+
+    def count(self) -> int:
+        """Get the number of jobs in the catalog."""
+        return self._connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single job by ID, or None if it does not exist."""
+        row = self._connection().execute(
+            "SELECT id, title, description FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List jobs ordered by ID."""
+        rows = self._connection().execute(
+            "SELECT id, title, description FROM jobs ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def iter_jobs(self, batch_size: int = 1000, offset: int = 0,
+                  limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate over jobs in ID order (all of them by default) without loading them all at once."""
+        conn = self._connection()
+        last_id = 0
+        if offset:
+            row = conn.execute("SELECT id FROM jobs ORDER BY id LIMIT 1 OFFSET ?", (offset - 1,)).fetchone()
+            if row is None:
+                return
+            last_id = row['id']
+
+        remaining = -1 if limit is None else limit
+        while remaining:
+            rows = conn.execute(
+                "SELECT id, title, description FROM jobs WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size if remaining < 0 else min(batch_size, remaining))
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_job(row)
+            last_id = rows[-1]['id']
+            if remaining > 0:
+                remaining -= len(rows)
+
+    def search(self, terms: Iterable[str], limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Retrieve jobs matching any of the terms, ranked by BM25.
+
+        Args:
+            terms: Keywords or phrases to search for
+            limit: Maximum number of jobs to return
+
+        Returns:
+            List of job dictionaries, best match first
+        """
+        query = build_match_query(terms)
+        if not query:
+            return []
+
+        try:
+            rows = self._connection().execute(
+                "SELECT jobs.id, jobs.title, jobs.description FROM jobs_fts "
+                "JOIN jobs ON jobs.id = jobs_fts.rowid "
+                "WHERE jobs_fts MATCH ? ORDER BY bm25(jobs_fts) LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise JobCatalogError(f"Invalid search query: {str(e)}")
+
+        return [self._row_to_job(row) for row in rows]
+
+    def add_job(self, job: Dict[str, str]) -> Dict[str, Any]:
+        """Add a job and return it with its assigned ID."""
+        fields = validate_job(job)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs(title, description) VALUES (:title, :description)",
+                fields
+            )
+            self._bump_version(conn, [cursor.lastrowid])
+        return {'id': cursor.lastrowid, **fields}
+
+    def update_job(self, job_id: int, job: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Update a job's title and/or description.
+
+        Returns:
+            The updated job, or None if it does not exist
+        """
+        fields = validate_job(job, partial=True)
+        assignments = ', '.join(f"{field} = :{field}" for field in fields)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = :id",
+                {**fields, 'id': job_id}
+            )
+            if cursor.rowcount == 0:
+                return None
+            self._bump_version(conn, [job_id])
+        return self.get_job(job_id)
+
+    def delete_job(self, job_id: int) -> bool:
+        """Delete a job. Returns False if it does not exist."""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            if cursor.rowcount == 0:
+                return False
+            self._bump_version(conn, [job_id], deleted=True)
+        return True
+
+    def import_jobs(self, jobs: List[Dict[str, str]], replace: bool = False) -> int:
+        """
+        Bulk-import jobs in a single transaction.
+
+        Args:
+            jobs: List of job dictionaries
+            replace: Delete all existing jobs first
+
+        Returns:
+            Number of jobs imported
+        """
+        if not isinstance(jobs, list):
+            raise JobCatalogError("jobs must be a list")
+
+        cleaned = []
+        for index, job in enumerate(jobs):
+            try:
+                cleaned.append(validate_job(job))
+            except JobCatalogError as e:
+                raise JobCatalogError(f"Job {index}: {str(e)}")
+
+        conn = self._connection()
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM jobs")
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM jobs").fetchone()[0]
+            self._insert_jobs(conn, cleaned)
+            if replace:
+                self._bump_version(conn, reset=True)
+            else:
+                new_ids = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE id > ?", (last_id,))]
+                self._bump_version(conn, new_ids)
+        return len(cleaned)
+
+# Global job catalog instance
+job_catalog = JobCatalog()
@@ -0,0 +1,499 @@
+"""
+Compact job profiles for SkillSnap matching prompts.
+
+A job profile condenses a catalog job's description into the fields job
+matching needs: required skills (in the order the description names them),
+seniority, domain and a few key responsibilities. Profiles are built locally
+with the fuzzy skill matcher and keyword rules, and can be refined offline
+by an LLM. Job matching prompts render profiles instead of raw descriptions
+(LLM_JOB_PROFILES), which cuts prompt tokens per job several-fold for
+descriptions padded with company boilerplate.
+
+Profiles are stored in a SQLite file (JOB_PROFILE_DB) shared by workers and
+tenants, keyed by a hash of the job's title and description, so a profile is
+built once per job content however many catalog versions keep the job.
+Build them for each new catalog version offline:
+
+    python -m job_profiles
+    python -m job_profiles --tenant acme --refine
+
+Runs are incremental: jobs unchanged since the last run's catalog version are
+skipped. Jobs without a stored profile when a prompt is built get a local
+profile on the spot, which is stored for the next request.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from job_catalog import JobCatalog, JobCatalogError
+from skill_matcher import get_skill_matcher
+from tenant_catalogs import tenant_catalogs
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JOB_PROFILE_DB = os.getenv('JOB_PROFILE_DB', 'job_profiles.db')
+# Render job profiles instead of raw descriptions in job matching prompts
+JOB_PROFILE_PROMPTS = os.getenv('LLM_JOB_PROFILES', 'true').lower() in ('true', '1', 'yes')
+# Profiles kept in memory per process, and for how long; refined profiles
+# stored by an offline run replace cached local ones after the TTL
+PROFILE_CACHE_SIZE = int(os.getenv('JOB_PROFILE_CACHE_SIZE', '4096'))
+PROFILE_CACHE_TTL = float(os.getenv('JOB_PROFILE_CACHE_TTL', '300'))
+# Concurrent LLM requests of an offline refinement run, and the token ledger
+# client they are charged to
+PROFILE_CONCURRENCY = int(os.getenv('JOB_PROFILE_CONCURRENCY', '4'))
+PROFILE_CLIENT = os.getenv('JOB_PROFILE_CLIENT', 'job_profiles')
+
+# Source of profiles built by build_profile(); bump when its rules change so
+# stored local profiles are rebuilt. Refined profiles are stored as 'llm:<model>'.
+LOCAL_SOURCE = 'local-1'
+
+SENIORITY_LEVELS = ('junior', 'mid', 'senior', 'lead', 'unspecified')
+MAX_PROFILE_SKILLS = 15
+MAX_RESPONSIBILITIES = 4
+# Longer clauses are prose rather than a responsibility worth keeping
+MAX_RESPONSIBILITY_WORDS = 10
+
+# Seniority named in a job title, checked in order
+TITLE_SENIORITY = (
+    ('lead', re.compile(r'\b(lead|principal|staff|head|director|architect|vp)\b')),
+    ('senior', re.compile(r'\b(senior|sr)\b')),
+    ('junior', re.compile(r'\b(junior|jr|intern|internship|graduate|entry[- ]level|trainee)\b')),
+    ('mid', re.compile(r'\b(mid[- ]level|intermediate)\b'))
+)
+ENTRY_LEVEL_PATTERN = re.compile(r'\b(entry[- ]level|new grad(uate)?s?|no experience required)\b')
+YEARS_PATTERN = re.compile(r'\b(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years|yrs)\b')
+
+# Domains by the words naming them, in priority order for job titles
+DOMAINS = (
+    ('full-stack', re.compile(r'\bfull[- ]?stack\b')),
+    ('product', re.compile(r'\b(product (manager|owner)|program manager)\b')),
+    ('design', re.compile(r'\b(designer|ux|user experience)\b')),
+    ('data', re.compile(r'\b(data|machine learning|ml|ai|analytics|analyst|statistics|statistical|scientist)\b')),
+    ('frontend', re.compile(r'\b(front[- ]?end|ui|web developer)\b')),
+    ('backend', re.compile(r'\b(back[- ]?end|server[- ]side|apis?)\b')),
+    ('mobile', re.compile(r'\b(mobile|ios|android)\b')),
+    ('infrastructure', re.compile(r'\b(devops|sre|site reliability|infrastructure|platform engineer|cloud|sysadmin)\b')),
+    ('security', re.compile(r'\b(security|secops|penetration)\b')),
+    ('qa', re.compile(r'\b(qa|quality assurance|test engineer|sdet)\b'))
+)
+DOMAIN_MIN_MENTIONS = 2
+SOFTWARE_TITLE_PATTERN = re.compile(r'\b(engineer|developer|programmer)\b')
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+|\n+|\s*[•·*]\s+')
+CLAUSE_PATTERN = re.compile(r',\s*(?:and\s+|or\s+)?|;\s*')
+# Phrases introducing a requirement, stripped from the start of a clause
+LEAD_IN_PATTERN = re.compile(
+    r"^(?:we are|we're|we|you will|you'll|the (?:ideal )?candidate (?:should|will|must)|"
+    r"candidates? (?:should|will|must)|must|should|will|also|"
+    r"have|be|understand|strong|solid|proven|excellent|good|deep|hands-on|"
+    r"(?:experience|expertise|background|skills|knowledge|proficiency|familiarity|understanding) (?:in|with|of)|"
+    r"proficient (?:in|with)|familiar with|ability to|responsible for|responsibilities include)\b[\s:]*"
+)
+# Examples and requirement levels, stripped from the end of a clause
+TRAILER_PATTERN = re.compile(
+    r'\s*(?:\b(?:like|such as|e\.g\.|including)\b.*|\b(?:is|are) (?:preferred|essential|required|a plus|a bonus)\b.*|[.!?]+)$'
+)
+# Clauses that describe nearly every job and tell the model nothing
+BOILERPLATE_PATTERN = re.compile(
+    r'\b(problem[- ]solving|team (?:player|environment)|communication|interpersonal|self[- ]starter|'
+    r'fast[- ]paced|attention to detail|work independently|analytical skills|leadership skills|'
+    r'passion\w*|motivated|equal opportunity|benefits|salary|competitive|apply|collaborat\w*|'
+    r'looking for|seeking|we need|join our)\b'
+)
+# Words left in a clause that only repeat skills it names
+GENERIC_WORDS = frozenset((
+    'a', 'an', 'and', 'or', 'the', 'of', 'in', 'with', 'for', 'using', 'tools', 'tool', 'frameworks',
+    'framework', 'databases', 'database', 'languages', 'language', 'libraries', 'technologies',
+    'platforms', 'version', 'control', 'experience', 'skills', 'knowledge', 'methodologies'
+))
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+def content_hash(job: Dict[str, Any]) -> str:
+    """Identify a job's content, the key its profile is stored under."""
+    return hashlib.sha256(f"{job['title']}\0{job['description']}".encode('utf-8')).hexdigest()
+
+def profile_fingerprint(profile: Dict[str, Any]) -> str:
+    """Identify a profile's content, so text rendered from it is not reused once it is refined."""
+    return hashlib.sha256(json.dumps(profile, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def job_seniority(title: str, description: str) -> str:
+    """Get a job's seniority from its title, or else the experience its description asks for."""
+    title = title.lower()
+    for level, pattern in TITLE_SENIORITY:
+        if pattern.search(title):
+            return level
+
+    description = description.lower()
+    if ENTRY_LEVEL_PATTERN.search(description):
+        return 'junior'
+    years = [int(match) for match in YEARS_PATTERN.findall(description)]
+    if years:
+        fewest = min(years)
+        return 'junior' if fewest < 2 else 'mid' if fewest < 5 else 'senior'
+    return 'unspecified'
+
+def job_domain(title: str, description: str) -> str:
+    """Get a job's domain from its title, or else the domain its description names repeatedly."""
+    title = title.lower()
+    for domain, pattern in DOMAINS:
+        if pattern.search(title):
+            return domain
+
+    description = description.lower()
+    counts = [(len(pattern.findall(description)), domain) for domain, pattern in DOMAINS]
+    count, domain = max(counts, key=lambda item: item[0])
+    # A single mention is too weak to narrow down a generic title
+    if count >= DOMAIN_MIN_MENTIONS:
+        return domain
+    return 'software' if SOFTWARE_TITLE_PATTERN.search(title) else 'general'
+
+def job_responsibilities(title: str, description: str, skill_phrases: Iterable[str]) -> List[str]:
+    """
+    Get the short requirement clauses of a description that are not skills
+    or boilerplate, such as 'software development lifecycle'.
+    """
+    title = title.lower()
+    skill_phrases = sorted(set(skill_phrases), key=len, reverse=True)
+    responsibilities: List[str] = []
+    for sentence in SENTENCE_PATTERN.split(description):
+        for clause in CLAUSE_PATTERN.split(sentence):
+            clause = clause.strip().lower()
+            # The clause introducing the role repeats its title; headings end with ':'
+            if not clause or title in clause or clause.endswith(':') or BOILERPLATE_PATTERN.search(clause):
+                continue
+            previous = None
+            while previous != clause:
+                previous = clause
+                clause = TRAILER_PATTERN.sub('', LEAD_IN_PATTERN.sub('', clause)).strip()
+
+            words = WORD_PATTERN.findall(clause)
+            if not words or len(words) > MAX_RESPONSIBILITY_WORDS:
+                continue
+            remainder = f" {' '.join(words)} "
+            for phrase in skill_phrases:
+                remainder = remainder.replace(f" {phrase} ", ' ')
+            if all(word in GENERIC_WORDS for word in remainder.split()):
+                continue
+            if clause not in responsibilities:
+                responsibilities.append(clause)
+            if len(responsibilities) == MAX_RESPONSIBILITIES:
+                return responsibilities
+    return responsibilities
+
+def build_profile(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a job's profile locally from its title and description."""
+    title, description = job['title'], job['description']
+    # Matches are in order of first mention, which puts the core skills first
+    matches = get_skill_matcher().match(f"{title}\n{description}")
+    return {
+        'skills': list(matches)[:MAX_PROFILE_SKILLS],
+        'seniority': job_seniority(title, description),
+        'domain': job_domain(title, description),
+        'responsibilities': job_responsibilities(title, description, list(matches) + list(matches.values()))
+    }
+
+def normalize_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Bring a profile from an LLM to the shape and limits of local profiles."""
+    def strings(values: Any, limit: int) -> List[str]:
+        items: List[str] = []
+        for value in values if isinstance(values, list) else []:
+            value = str(value).strip().lower()
+            if value and value not in items:
+                items.append(value)
+        return items[:limit]
+
+    seniority = str(profile.get('seniority') or '').strip().lower()
+    return {
+        'skills': strings(profile.get('skills'), MAX_PROFILE_SKILLS),
+        'seniority': seniority if seniority in SENIORITY_LEVELS else 'unspecified',
+        'domain': str(profile.get('domain') or '').strip().lower() or 'general',
+        'responsibilities': strings(profile.get('responsibilities'), MAX_RESPONSIBILITIES)
+    }
+
+PROFILE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_profiles (
+    content_hash TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    source TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS profile_runs (
+    catalog_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    refined INTEGER NOT NULL,
+    checked INTEGER NOT NULL,
+    built INTEGER NOT NULL,
+    llm_refined INTEGER NOT NULL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (catalog_id, version, refined)
+);
+"""
+
+class JobProfileStore:
+    """Job profiles by content hash, and the catalog versions profiled, shared across workers."""
+
+    def __init__(self, db_path: str = JOB_PROFILE_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get a connection for the current thread and process."""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            # Connections must not cross a fork, so reconnect in each worker
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(PROFILE_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Tuple[Dict[str, Any], str]]:
+        """Get the current (profile, source) stored for each content hash that has one."""
+        hashes = list(hashes)
+        conn = self._connection()
+        found = {}
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = conn.execute(
+                f"SELECT content_hash, profile, source FROM job_profiles "
+                f"WHERE content_hash IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            for key, profile, source in rows:
+                # Local profiles built by older rules are stale
+                if source == LOCAL_SOURCE or source.startswith('llm:'):
+                    found[key] = (json.loads(profile), source)
+        return found
+
+    def put_many(self, profiles: Iterable[Tuple[str, Dict[str, Any], str]]) -> None:
+        """Store (content hash, profile, source) entries, replacing earlier profiles."""
+        now = time.time()
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO job_profiles (content_hash, profile, source, created_at) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(profile), source, now) for key, profile, source in profiles]
+        )
+
+    def last_run(self, catalog_id: str, refined: bool = False) -> Optional[Dict[str, Any]]:
+        """Get the latest run over a catalog, counting only refined runs if refined is set."""
+        row = self._connection().execute(
+            "SELECT version, refined, checked, built, llm_refined, finished_at FROM profile_runs "
+            "WHERE catalog_id = ? AND refined >= ? ORDER BY version DESC, refined DESC LIMIT 1",
+            (catalog_id, int(refined))
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('version', 'refined', 'checked', 'built', 'llm_refined', 'finished_at'), row))
+
+    def record_run(self, catalog_id: str, version: int, refined: bool, checked: int,
+                   built: int, llm_refined: int) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO profile_runs "
+            "(catalog_id, version, refined, checked, built, llm_refined, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (catalog_id, version, int(refined), checked, built, llm_refined, time.time())
+        )
+
+# Global profile store
+profile_store = JobProfileStore()
+
+_profile_cache: 'OrderedDict[str, Tuple[Dict[str, Any], str, float]]' = OrderedDict()
+_profile_lock = threading.Lock()
+
+def _cache_profiles(profiles: Dict[str, Dict[str, Any]]) -> Dict[str, Tuple[Dict[str, Any], str]]:
+    entries = {key: (profile, profile_fingerprint(profile)) for key, profile in profiles.items()}
+    expires_at = time.monotonic() + PROFILE_CACHE_TTL
+    with _profile_lock:
+        for key, (profile, fingerprint) in entries.items():
+            _profile_cache[key] = (profile, fingerprint, expires_at)
+            _profile_cache.move_to_end(key)
+        while len(_profile_cache) > PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    return entries
+
+def get_profiles(jobs: List[Dict[str, Any]],
+                 store: JobProfileStore = profile_store) -> List[Tuple[Dict[str, Any], str]]:
+    """
+    Get the (profile, fingerprint) of each job, from memory, the profile store
+    or, for jobs never profiled, built locally and stored.
+    """
+    keys = [content_hash(job) for job in jobs]
+    profiles: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    now = time.monotonic()
+    with _profile_lock:
+        for key in keys:
+            entry = _profile_cache.get(key)
+            if entry is not None and entry[2] > now:
+                _profile_cache.move_to_end(key)
+                profiles[key] = entry[:2]
+
+    missing = [key for key in dict.fromkeys(keys) if key not in profiles]
+    if missing:
+        try:
+            stored = {key: profile for key, (profile, _) in store.get_many(missing).items()}
+        except sqlite3.Error as e:
+            logger.warning(f"Job profile store unavailable, building profiles locally: {e}")
+            stored = {}
+        built = {}
+        for job, key in zip(jobs, keys):
+            if key in profiles or key in stored or key in built:
+                continue
+            built[key] = build_profile(job)
+        if built:
+            try:
+                store.put_many((key, profile, LOCAL_SOURCE) for key, profile in built.items())
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to store job profiles: {e}")
+        profiles.update(_cache_profiles({**stored, **built}))
+    return [profiles[key] for key in keys]
+
+def with_profiles(jobs: List[Dict[str, Any]], store: JobProfileStore = profile_store) -> List[Dict[str, Any]]:
+    """
+    Copy jobs with their profiles under 'profile', for prompts that render
+    profiles, and the profile's fingerprint under 'profile_key'.
+    """
+    return [{**job, 'profile': profile, 'profile_key': fingerprint}
+            for job, (profile, fingerprint) in zip(jobs, get_profiles(jobs, store))]
+
+def _batches(jobs: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for job in jobs:
+        batch.append(job)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def _refine_profiles(pending: List[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+                           store: JobProfileStore, concurrency: int) -> Tuple[int, int]:
+    """Refine (content hash, job, local profile) entries with the LLM. Returns (refined, failed)."""
+    from services.llm_preflight import client_context
+    from services.llm_services import LLMJobProfileService
+
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {'refined': 0, 'failed': 0}
+
+    async def refine(key: str, job: Dict[str, Any], profile: Dict[str, Any]) -> None:
+        async with semaphore:
+            usage: Dict[str, Any] = {}
+            try:
+                refined = await LLMJobProfileService.refine_profile(job, profile, usage)
+            except Exception as e:
+                # The local profile stays in place
+                logger.warning(f"Failed to refine the profile of job {job.get('id')}: {e}")
+                counts['failed'] += 1
+                return
+            store.put_many([(key, normalize_profile(refined), f"llm:{usage.get('model', 'unknown')}")])
+            counts['refined'] += 1
+
+    with client_context(PROFILE_CLIENT):
+        await asyncio.gather(*(refine(key, job, profile) for key, job, profile in pending))
+    return counts['refined'], counts['failed']
+
+def build_catalog_profiles(catalog: JobCatalog, store: JobProfileStore = profile_store, refine: bool = False,
+                           concurrency: int = PROFILE_CONCURRENCY, full: bool = False) -> Dict[str, Any]:
+    """
+    Profile the jobs of a catalog's current version.
+
+    Only jobs changed since the last run (a refined run, if refine is set)
+    are checked unless full is set; jobs whose content already has a profile
+    (a refined one, if refine is set) are skipped.
+
+    Args:
+        catalog: Catalog to profile
+        store: Where profiles are stored
+        refine: Refine local profiles with the LLM
+        concurrency: Concurrent LLM requests when refining
+        full: Check every job, not only those changed since the last run
+
+    Returns:
+        Summary of the run
+    """
+    catalog_id = catalog.catalog_id()
+    pending: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+    queued = set()
+    checked = built = 0
+    with catalog.read_snapshot() as version:
+        last = None if full else store.last_run(catalog_id, refined=refine)
+        changes = catalog.changes_since(last['version']) if last is not None else None
+        if changes is not None:
+            jobs = iter(catalog.get_jobs(changes['upserted']))
+            logger.info(f"Checking {len(changes['upserted'])} jobs changed since version {last['version']}")
+        else:
+            jobs = catalog.iter_jobs()
+
+        for batch in _batches(jobs, 500):
+            checked += len(batch)
+            keys = [content_hash(job) for job in batch]
+            stored = store.get_many(keys)
+            new_profiles = {}
+            for job, key in zip(batch, keys):
+                if key in new_profiles or key in queued:
+                    continue
+                profile, source = stored.get(key, (None, LOCAL_SOURCE))
+                if profile is None:
+                    profile = new_profiles[key] = build_profile(job)
+                if refine and not source.startswith('llm:'):
+                    pending.append((key, job, profile))
+                    queued.add(key)
+            store.put_many((key, profile, LOCAL_SOURCE) for key, profile in new_profiles.items())
+            built += len(new_profiles)
+
+    llm_refined = failed = 0
+    if pending:
+        logger.info(f"Refining {len(pending)} job profiles with the LLM")
+        llm_refined, failed = asyncio.run(_refine_profiles(pending, store, concurrency))
+    if not failed:
+        # A run with failures is redone in full next time
+        store.record_run(catalog_id, version, refine, checked, built, llm_refined)
+    return {
+        'catalog_version': version,
+        'checked': checked,
+        'built': built,
+        'refined': llm_refined,
+        'refine_failed': failed
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Build compact job profiles for the current catalog version.')
+    parser.add_argument('--tenant', default=None, help='Tenant whose job catalog is profiled (default catalog if omitted)')
+    parser.add_argument('--db', default=JOB_PROFILE_DB, help='Profile store database')
+    parser.add_argument('--refine', action='store_true', help='Refine local profiles with the LLM')
+    parser.add_argument('--concurrency', type=int, default=PROFILE_CONCURRENCY)
+    parser.add_argument('--full', action='store_true', help='Check every job, not only those changed since the last run')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    args = parse_args(argv)
+
+    try:
+        catalog = tenant_catalogs.get(args.tenant)
+    except JobCatalogError as e:
+        logger.error(str(e))
+        return 2
+    summary = build_catalog_profiles(catalog, JobProfileStore(args.db), args.refine, args.concurrency, args.full)
+    logger.info(
+        f"Catalog version {summary['catalog_version']}: {summary['checked']} jobs checked, "
+        f"{summary['built']} profiles built, {summary['refined']} refined"
+        + (f", {summary['refine_failed']} refinements failed" if summary['refine_failed'] else "")
+    )
+    return 1 if summary['refine_failed'] else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,81 +1,572 @@
+import hashlib
+import io
 import json
+import logging
+import os
 import pdfplumber
 import re
-from typing import List, Dict, Tuple
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional, Tuple, Union
+from job_catalog import JobCatalog, job_catalog
+from resume_sections import ResumeDocument, lines_from_words, segment_lines, segment_text
+from semantic_index import get_semantic_index
+from skill_matcher import get_skill_matcher
+from utils.cache_backend import get_cache
+from utils.cpu_pool import run_cpu_bound
+from utils.memory_profile import stage
 
-def extract_text_from_pdf(pdf_file) -> str:
+logger = logging.getLogger(__name__)
+
+# PDF extraction modes:
+#   fast   - raw text from pdfium only (no layout analysis)
+#   layout - pdfplumber layout analysis only (original behaviour)
+#   auto   - fast path first, escalate to layout when quality heuristics fail
+EXTRACTION_MODES = ('auto', 'fast', 'layout')
+DEFAULT_EXTRACTION_MODE = os.getenv('PDF_EXTRACTION_MODE', 'auto').lower()
+
+# Quality thresholds for the fast path
+MIN_CHARS_PER_PAGE = 200
+MAX_BAD_CHAR_RATIO = 0.01
+MAX_LONG_WORD_RATIO = 0.05
+MAX_SINGLE_CHAR_WORD_RATIO = 0.3
+MIN_AVG_LINE_LENGTH = 12
+MIN_GUTTER_WIDTH = 10
+MIN_COLUMN_SHARE = 0.2
+
+# Version of the extraction code; bump it when extracted text or ResumeDocument
+# changes so entries written by older code are not served
+PDF_EXTRACTION_VERSION = 1
+
+# Extracted text is cached across workers by PDF content hash and mode
+PDF_TEXT_CACHE_SIZE = int(os.getenv('PDF_TEXT_CACHE_SIZE', '256'))
+PDF_TEXT_CACHE_TTL = float(os.getenv('PDF_TEXT_CACHE_TTL', '604800'))
+_pdf_text_cache = get_cache(f'pdf_text:v{PDF_EXTRACTION_VERSION}', PDF_TEXT_CACHE_SIZE, PDF_TEXT_CACHE_TTL)
+# Sections of uploaded resumes by text hash, for prompts built from the text later
+_document_cache = get_cache(f'resume_sections:v{PDF_EXTRACTION_VERSION}', PDF_TEXT_CACHE_SIZE, PDF_TEXT_CACHE_TTL)
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def get_resume_document(text: str) -> ResumeDocument:
+    """
+    Get the sections of a resume, preferring the layout-based segmentation
+    from its upload and falling back to segmenting the plain text.
+    """
+    document = _document_cache.get(_text_key(text))
+    return document if document is not None else segment_text(text)
+
+def _read_pdf_bytes(pdf_file) -> bytes:
+    """Read raw PDF bytes from a path or file-like object."""
+    if hasattr(pdf_file, 'read'):
+        if hasattr(pdf_file, 'seek'):
+            pdf_file.seek(0)
+        return pdf_file.read()
+    with open(pdf_file, 'rb') as f:
+        return f.read()
+
+def _gutter_position(spans: List[Tuple[float, float]], page_width: float) -> float:
     """
-    Extract text from a PDF file using pdfplumber.
+    Find a vertical gutter between two text columns.
+    
+    Looks for the widest horizontal range in the middle half of the page
+    that no text span crosses, with a meaningful share of text on each side.
+    Single-column pages always have body lines crossing the middle, so
+    right-aligned dates and short headings do not produce a gutter.
     
     Args:
-        pdf_file: File object or file-like object containing PDF data
+        spans: (x0, x1) horizontal extents of text on the page
+        page_width: Width of the page
     
     Returns:
-        str: Extracted text from the PDF
+        x coordinate to split the page at, or 0.0 if there is no gutter
+    """
+    if not spans or page_width <= 0:
+        return 0.0
     
-    Raises:
-        Exception: If PDF extraction fails
+    low, high = page_width / 4, page_width * 3 / 4
+    best_start, best_width = 0.0, 0.0
+    cursor = low
+    for x0, x1 in sorted(spans):
+        if x1 <= cursor:
+            continue
+        if x0 >= high:
+            break
+        if x0 - cursor > best_width:
+            best_start, best_width = cursor, x0 - cursor
+        cursor = x1
+    if high - cursor > best_width:
+        best_start, best_width = cursor, high - cursor
+    
+    if best_width < MIN_GUTTER_WIDTH or best_width >= high - low:
+        return 0.0
+    
+    split = best_start + best_width / 2
+    left_extent = sum(x1 - x0 for x0, x1 in spans if x1 <= split)
+    total_extent = sum(x1 - x0 for x0, x1 in spans)
+    if min(left_extent, total_extent - left_extent) < MIN_COLUMN_SHARE * total_extent:
+        return 0.0
+    return split
+
+def _extract_fast(data: bytes) -> Tuple[str, int, bool]:
+    """
+    Extract raw text with pdfium, without layout analysis.
+    
+    Returns:
+        Tuple of (text, page count, multi-column flag)
     """
+    import pypdfium2 as pdfium
+    
+    pdf = pdfium.PdfDocument(data)
     try:
-        text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
+        page_texts = []
+        multi_column = False
+        for page in pdf:
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_range()
+                if not multi_column:
+                    rects = [textpage.get_rect(i) for i in range(textpage.count_rects())]
+                    spans = [(rect[0], rect[2]) for rect in rects]
+                    multi_column = bool(_gutter_position(spans, page.get_width()))
+            finally:
+                textpage.close()
+                page.close()
+            if page_text:
+                page_texts.append(page_text.replace('\r\n', '\n').replace('\r', '\n'))
+        
+        return "\n".join(page_texts).strip(), len(pdf), multi_column
+    finally:
+        pdf.close()
+
+def _page_regions(page) -> list:
+    """Split a pdfplumber page into its text columns, in reading order."""
+    gutter = _gutter_position([(char['x0'], char['x1']) for char in page.chars], page.width)
+    if not gutter:
+        return [page]
+    return [
+        page.crop((0, 0, gutter, page.height)),
+        page.crop((gutter, 0, page.width, page.height))
+    ]
+
+def _extract_layout(data: bytes) -> str:
+    """Extract text with pdfplumber's layout analysis, reading columns in order."""
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            for region in _page_regions(page):
+                page_text = region.extract_text()
                 if page_text:
                     text += page_text + "\n"
+    
+    return text.strip()
+
+def _extract_sectioned(data: bytes) -> ResumeDocument:
+    """Extract text with pdfplumber and segment it into sections from font cues."""
+    lines = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            for region in _page_regions(page):
+                lines += lines_from_words(region.extract_words(extra_attrs=['fontname', 'size']))
+    
+    return segment_lines(lines)
+
+def _fast_text_problem(text: str, page_count: int, multi_column: bool) -> str:
+    """
+    Check fast-path output against quality heuristics.
+    
+    Returns:
+        Reason the text should be re-extracted, or an empty string if usable
+    """
+    if multi_column:
+        return 'multi-column layout'
+    
+    if len(text) < MIN_CHARS_PER_PAGE * max(page_count, 1):
+        return 'low characters per page'
+    
+    bad_chars = sum(1 for c in text if c == '\ufffd' or (ord(c) < 32 and c not in '\n\t'))
+    if bad_chars / len(text) > MAX_BAD_CHAR_RATIO:
+        return 'unreadable characters'
+    
+    words = text.split()
+    if not words:
+        return 'no words'
+    if sum(1 for w in words if len(w) > 25) / len(words) > MAX_LONG_WORD_RATIO:
+        return 'missing word spacing'
+    if sum(1 for w in words if len(w) == 1) / len(words) > MAX_SINGLE_CHAR_WORD_RATIO:
+        return 'garbled ordering'
+    
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 20 and sum(len(line) for line in lines) / len(lines) < MIN_AVG_LINE_LENGTH:
+        return 'fragmented lines'
+    
+    return ''
+
+def _extract_with_backend(data: bytes, extraction_mode: str) -> Tuple[str, str]:
+    """
+    Extract text using the requested mode.
+    
+    Returns:
+        Tuple of (text, backend actually used: 'fast' or 'layout')
+    """
+    if extraction_mode in ('auto', 'fast'):
+        try:
+            text, page_count, multi_column = _extract_fast(data)
+        except ImportError:
+            logger.info("pypdfium2 not installed, using layout extraction")
+        else:
+            if extraction_mode == 'fast':
+                return text, 'fast'
+            problem = _fast_text_problem(text, page_count, multi_column)
+            if not problem:
+                return text, 'fast'
+            logger.debug(f"Escalating PDF extraction to layout analysis: {problem}")
+    
+    return _extract_layout(data), 'layout'
+
+@stage('pdf_extraction')
+def extract_text_from_pdf(pdf_file, extraction_mode: str = None,
+                          sectioned: bool = False) -> Union[str, ResumeDocument]:
+    """
+    Extract text from a PDF file.
+    
+    In 'auto' mode a fast raw-text pass runs first and pdfplumber's layout
+    analysis is only used when the fast output fails quality checks. Parsing
+    runs on the CPU process pool and the caller caches the results.
+    
+    Args:
+        pdf_file: File path, file object or file-like object containing PDF data
+        extraction_mode: 'auto', 'fast' or 'layout' (defaults to PDF_EXTRACTION_MODE)
+        sectioned: Return a ResumeDocument segmented from font size, weight and
+            position cues. This always uses pdfplumber, since segmentation
+            needs font data, and remembers the sections for the extracted
+            text so later prompts built from that text can use them
+    
+    Returns:
+        str: Extracted text from the PDF, or a ResumeDocument if sectioned
+    
+    Raises:
+        Exception: If PDF extraction fails
+    """
+    extraction_mode = (extraction_mode or DEFAULT_EXTRACTION_MODE).lower()
+    if extraction_mode not in EXTRACTION_MODES:
+        raise ValueError(f"Invalid extraction_mode '{extraction_mode}'. Use one of: {', '.join(EXTRACTION_MODES)}")
+    
+    try:
+        data = _read_pdf_bytes(pdf_file)
+        if sectioned:
+            key = f"{hashlib.sha256(data).hexdigest()}:sectioned"
+            document = _pdf_text_cache.get(key)
+            if document is None:
+                document = run_cpu_bound(_extract_sectioned, data)
+                _pdf_text_cache.set(key, document)
+            _document_cache.set(_text_key(document.text), document)
+            return document
         
-        return text.strip()
+        key = f"{hashlib.sha256(data).hexdigest()}:{extraction_mode}"
+        text = _pdf_text_cache.get(key)
+        if text is None:
+            text, _ = run_cpu_bound(_extract_with_backend, data, extraction_mode)
+            _pdf_text_cache.set(key, text)
+        return text
     except Exception as e:
         raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
-def recommend_jobs(resume_text: str, top_k: int = 3) -> List[Dict[str, str]]:
+# Common tech keywords used for job matching
+TECH_KEYWORDS = [
+    'python', 'javascript', 'react', 'node', 'sql', 'git', 'aws', 'azure',
+    'machine learning', 'data', 'analysis', 'statistics', 'pandas', 'numpy',
+    'tensorflow', 'pytorch', 'tableau', 'power bi', 'spark', 'hadoop',
+    'docker', 'kubernetes', 'api', 'rest', 'frontend', 'backend', 'database',
+    'mongodb', 'postgresql', 'mysql', 'java', 'spring', 'microservices',
+    'agile', 'scrum', 'ci/cd', 'testing', 'unit testing', 'integration'
+]
+
+# Common skills/technologies used for skill gap analysis
+SKILLS_DB = [
+    'python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'swift', 'kotlin',
+    'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
+    'aws', 'azure', 'google cloud', 'docker', 'kubernetes', 'terraform',
+    'git', 'jenkins', 'ci/cd', 'devops', 'linux', 'bash', 'shell scripting',
+    'machine learning', 'deep learning', 'data science', 'artificial intelligence',
+    'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
+    'tableau', 'power bi', 'excel', 'r', 'matlab', 'spss',
+    'html', 'css', 'bootstrap', 'sass', 'tailwind',
+    'rest api', 'graphql', 'microservices', 'soap', 'json', 'xml',
+    'agile', 'scrum', 'kanban', 'project management',
+    'testing', 'unit testing', 'integration testing', 'selenium', 'junit',
+    'spark', 'hadoop', 'kafka', 'airflow', 'etl', 'data pipeline'
+]
+
+# SKILLS_DB names appearing as whole words, so 'java' is not read from
+# 'javascript', 'go' from 'good' or 'r' from any word with that letter. The
+# lookahead finds skills that overlap ('unit testing' and 'testing').
+SKILL_MENTION_PATTERN = re.compile(
+    r"(?=(?<![a-z0-9])("
+    + '|'.join(re.escape(skill) for skill in sorted(SKILLS_DB, key=len, reverse=True))
+    + r")(?![a-z0-9+#]))"
+)
+
+def mentioned_skills(normalized: str) -> frozenset:
+    """Get the SKILLS_DB names written out in lowercased text."""
+    return frozenset(SKILL_MENTION_PATTERN.findall(normalized))
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Number of resume profiles kept in the shared cache, and as live objects in
+# each process (in front of the shared cache, so the several lookups of a
+# request skip unpickling and profiles keep their memoized embeddings)
+PROFILE_CACHE_SIZE = int(os.getenv('RESUME_PROFILE_CACHE_SIZE', '256'))
+PROFILE_LOCAL_CACHE_SIZE = int(os.getenv('RESUME_PROFILE_LOCAL_CACHE_SIZE', '64'))
+PROFILE_CACHE_TTL = float(os.getenv('RESUME_PROFILE_CACHE_TTL', '86400'))
+# Version of ResumeProfile's fields; bump it when they change. Profiles are
+# also keyed by the skill matcher's digest, since they hold its matches.
+RESUME_PROFILE_VERSION = 1
+
+class ResumeProfile:
+    """
+    Preprocessed view of a resume, built once and shared across analyses.
+    
+    Use get_resume_profile() rather than constructing this directly so that
+    profiles are reused for identical resume content.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        self.normalized = text.lower()
+        
+        words = WORD_PATTERN.findall(self.normalized)
+        self.term_frequencies = Counter(words)
+        self.tokens = frozenset(self.term_frequencies)
+        
+        # Substring matching, consistent with the keyword lists above
+        self.matched_keywords = frozenset(kw for kw in TECH_KEYWORDS if kw in self.normalized)
+        
+        # Skills resolved from typos, aliases and variants, e.g. 'k8s' -> 'kubernetes'
+        # Resolved names are taken whole, so 'js' -> 'javascript' does not
+        # also credit 'java'
+        self.skill_mentions = get_skill_matcher().match(text)
+        self.matched_skills = mentioned_skills(self.normalized) | frozenset(self.skill_mentions)
+        
+        self.document = get_resume_document(text)
+        
+        self.char_count = len(text)
+        self.word_count = len(words)
+        self.line_count = text.count('\n') + 1 if text else 0
+        
+        self._embedding = None
+        self._embedding_key = None
+    
+    def embedding(self, embedder, version: int):
+        """Get the resume embedding for a semantic index, computing it once per index version."""
+        key = (id(embedder), version)
+        if self._embedding_key != key:
+            self._embedding = embedder.embed(self.text)
+            self._embedding_key = key
+        return self._embedding
+    
+    def __getstate__(self):
+        # Embeddings are tied to an in-process semantic index, so don't share them
+        state = self.__dict__.copy()
+        state['_embedding'] = None
+        state['_embedding_key'] = None
+        return state
+    
+    def length_stats(self) -> Dict[str, int]:
+        """Get character, word, line and unique token counts."""
+        return {
+            'characters': self.char_count,
+            'words': self.word_count,
+            'lines': self.line_count,
+            'unique_tokens': len(self.tokens)
+        }
+
+_profile_cache = get_cache(f'resume_profile:v{RESUME_PROFILE_VERSION}', PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL,
+                           local_entries=PROFILE_LOCAL_CACHE_SIZE)
+
+@stage('resume_profile')
+def get_resume_profile(resume: Union[str, ResumeProfile]) -> ResumeProfile:
+    """
+    Get the profile for a resume, memoized by content hash and skill
+    vocabulary in this process and in the shared cache.
+    
+    Args:
+        resume: Resume text or an existing ResumeProfile
+    
+    Returns:
+        ResumeProfile for the resume
+    """
+    if isinstance(resume, ResumeProfile):
+        return resume
+    
+    key = f"{get_skill_matcher().digest}:{hashlib.sha256(resume.encode('utf-8')).hexdigest()}"
+    profile = _profile_cache.get(key)
+    if profile is not None:
+        return profile
+    
+    profile = ResumeProfile(resume)
+    _profile_cache.set(key, profile)
+    return profile
+
+def resume_text_of(resume: Union[str, ResumeProfile]) -> str:
+    """Get the raw text of a resume given as text or a ResumeProfile."""
+    return resume.text if isinstance(resume, ResumeProfile) else resume
+
+# Maximum number of catalog jobs scored per recommendation request
+CANDIDATE_LIMIT = int(os.getenv('JOB_CANDIDATE_LIMIT', '200'))
+
+# Candidate retrieval strategies:
+#   keyword  - FTS5 keyword search over the catalog
+#   semantic - approximate nearest neighbours over local embeddings
+RETRIEVAL_MODES = ('keyword', 'semantic')
+DEFAULT_RETRIEVAL_MODE = os.getenv('JOB_RETRIEVAL_MODE', 'keyword').lower()
+
+def _validate_retrieval(retrieval: Optional[str]) -> str:
+    retrieval = (retrieval or DEFAULT_RETRIEVAL_MODE).lower()
+    if retrieval not in RETRIEVAL_MODES:
+        raise ValueError(f"Invalid retrieval '{retrieval}'. Use one of: {', '.join(RETRIEVAL_MODES)}")
+    return retrieval
+
+@contextmanager
+def catalog_snapshot(retrieval: Optional[str] = None, catalog: Optional[JobCatalog] = None) -> Iterator[int]:
+    """
+    Pin the job catalog for the retrieval and recommendation calls in the block.
+    
+    Keyword retrieval reads a single database snapshot. Semantic retrieval
+    uses the current index snapshot, which may briefly trail the database
+    while a newer one is being built.
+    
+    Args:
+        retrieval: 'keyword' or 'semantic' (defaults to JOB_RETRIEVAL_MODE)
+        catalog: Job catalog to read (defaults to the default catalog)
+    
+    Yields:
+        The catalog version results in the block are computed against
+    """
+    catalog = catalog or job_catalog
+    with catalog.read_snapshot() as version:
+        if _validate_retrieval(retrieval) == 'semantic':
+            version = get_semantic_index(catalog).version
+        yield version
+
+@stage('candidate_retrieval')
+def find_job_candidates(resume: Union[str, ResumeProfile], limit: int = CANDIDATE_LIMIT,
+                        retrieval: Optional[str] = None,
+                        catalog: Optional[JobCatalog] = None) -> List[Dict[str, str]]:
+    """
+    Retrieve catalog jobs relevant to the resume, best match first.
+    
+    Args:
+        resume: The text content of the resume or its ResumeProfile
+        limit: Maximum number of jobs to return
+        retrieval: 'keyword' or 'semantic' (defaults to JOB_RETRIEVAL_MODE)
+        catalog: Job catalog to search (defaults to the default catalog)
+    
+    Returns:
+        List of job dictionaries from the catalog
+    """
+    profile = get_resume_profile(resume)
+    catalog = catalog or job_catalog
+    
+    if _validate_retrieval(retrieval) == 'semantic':
+        index = get_semantic_index(catalog)
+        neighbours = index.search_vector(profile.embedding(index.embedder, index.version), top_k=limit)
+        jobs = (catalog.get_job(n['job_id']) for n in neighbours)
+        return [job for job in jobs if job is not None]
+    
+    resume_keywords = [kw for kw in TECH_KEYWORDS if kw in profile.matched_keywords]
+    
+    candidates = catalog.search(resume_keywords, limit=limit) if resume_keywords else []
+    if len(candidates) < limit:
+        # Pad with unmatched jobs so callers always get a full candidate list
+        seen = {job['id'] for job in candidates}
+        for job in catalog.list_jobs(limit=limit):
+            if len(candidates) >= limit:
+                break
+            if job['id'] not in seen:
+                candidates.append(job)
+    
+    return candidates
+
+def _semantic_recommendations(profile: ResumeProfile, top_k: int, catalog: JobCatalog) -> List[Dict[str, str]]:
+    """Rank catalog jobs by embedding similarity to the resume."""
+    index = get_semantic_index(catalog)
+    recommendations = []
+    
+    for neighbour in index.search_vector(profile.embedding(index.embedder, index.version), top_k=top_k):
+        job = catalog.get_job(neighbour['job_id'])
+        if job is None:
+            continue
+        job_desc_lower = job['description'].lower()
+        recommendations.append({
+            'job_id': job['id'],
+            'title': job['title'],
+            'score': round(max(neighbour['similarity'], 0.0) * 100, 2),
+            'matched_keywords': [
+                kw for kw in TECH_KEYWORDS if kw in profile.matched_keywords and kw in job_desc_lower
+            ]
+        })
+    
+    return recommendations
+
+@stage('recommendation')
+def recommend_jobs(resume: Union[str, ResumeProfile], top_k: int = 3,
+                   retrieval: Optional[str] = None,
+                   catalog: Optional[JobCatalog] = None) -> List[Dict[str, str]]:
     """
-    Recommend jobs based on resume text using simple keyword matching.
-    (Simplified version without ML - will add ML later)
+    Recommend jobs based on resume text.
+    
+    In 'keyword' mode candidates are retrieved from the indexed job catalog
+    and scored by keyword overlap. In 'semantic' mode jobs are ranked by
+    similarity of locally computed embeddings, which also finds roles that
+    share few exact keywords with the resume.
     
     Args:
-        resume_text: The text content of the resume
+        resume: The text content of the resume or its ResumeProfile
         top_k: Number of top recommendations to return
+        retrieval: 'keyword' or 'semantic' (defaults to JOB_RETRIEVAL_MODE)
+        catalog: Job catalog to recommend from (defaults to the default catalog)
     
     Returns:
         List of dictionaries containing job titles and match scores
     """
+    retrieval = _validate_retrieval(retrieval)
+    catalog = catalog or job_catalog
+    
     try:
-        # Load sample jobs
-        with open('sample_jobs.json', 'r') as f:
-            jobs = json.load(f)
+        profile = get_resume_profile(resume)
+        
+        if retrieval == 'semantic':
+            return _semantic_recommendations(profile, top_k, catalog)
+        
+        jobs = find_job_candidates(profile, limit=max(CANDIDATE_LIMIT, top_k), retrieval='keyword',
+                                   catalog=catalog)
         
         # Simple keyword-based matching (temporary solution)
         job_scores = []
-        resume_lower = resume_text.lower()
         
         for job in jobs:
             # Count keyword matches
             job_desc_lower = job['description'].lower()
             
-            # Extract common tech keywords
-            tech_keywords = [
-                'python', 'javascript', 'react', 'node', 'sql', 'git', 'aws', 'azure',
-                'machine learning', 'data', 'analysis', 'statistics', 'pandas', 'numpy',
-                'tensorflow', 'pytorch', 'tableau', 'power bi', 'spark', 'hadoop',
-                'docker', 'kubernetes', 'api', 'rest', 'frontend', 'backend', 'database',
-                'mongodb', 'postgresql', 'mysql', 'java', 'spring', 'microservices',
-                'agile', 'scrum', 'ci/cd', 'testing', 'unit testing', 'integration'
-            ]
-            
             score = 0
             matched_keywords = []
+            total_keywords_in_job = 0
             
-            for keyword in tech_keywords:
-                if keyword in resume_lower and keyword in job_desc_lower:
-                    score += 1
-                    matched_keywords.append(keyword)
+            for keyword in TECH_KEYWORDS:
+                if keyword in job_desc_lower:
+                    total_keywords_in_job += 1
+                    if keyword in profile.matched_keywords:
+                        score += 1
+                        matched_keywords.append(keyword)
             
             # Calculate percentage match
-            total_keywords_in_job = sum(1 for kw in tech_keywords if kw in job_desc_lower)
             match_percentage = (score / max(total_keywords_in_job, 1)) * 100 if total_keywords_in_job > 0 else 0
             
             job_scores.append({
+                'job_id': job['id'],
                 'title': job['title'],
                 'score': match_percentage,
                 'matched_keywords': matched_keywords
@@ -88,54 +579,30 @@ def recommend_jobs(resume_text: str, top_k: int = 3) -> List[Dict[str, str]]:
     except Exception as e:
         raise Exception(f"Failed to recommend jobs: {str(e)}")
 
-def analyze_skill_gap(resume_text: str, job_description: str) -> List[str]:
+def job_skills(job_description: str) -> frozenset:
+    """Get the skills a job description asks for, including fuzzy and alias matches."""
+    return mentioned_skills(job_description.lower()) | frozenset(get_skill_matcher().match(job_description))
+
+@stage('skill_gap')
+def analyze_skill_gap(resume: Union[str, ResumeProfile], job_description: str) -> List[str]:
     """
     Analyze skill gap between resume and job description using simple text processing.
     (Simplified version without spaCy - will add NLP later)
     
     Args:
-        resume_text: The text content of the resume
+        resume: The text content of the resume or its ResumeProfile
         job_description: The job description text
     
     Returns:
         List of skills that are missing from the resume
     """
     try:
-        # Define common skills/technologies
-        skills_db = [
-            'python', 'javascript', 'java', 'c++', 'c#', 'go', 'rust', 'swift', 'kotlin',
-            'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
-            'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
-            'aws', 'azure', 'google cloud', 'docker', 'kubernetes', 'terraform',
-            'git', 'jenkins', 'ci/cd', 'devops', 'linux', 'bash', 'shell scripting',
-            'machine learning', 'deep learning', 'data science', 'artificial intelligence',
-            'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras',
-            'tableau', 'power bi', 'excel', 'r', 'matlab', 'spss',
-            'html', 'css', 'bootstrap', 'sass', 'tailwind',
-            'rest api', 'graphql', 'microservices', 'soap', 'json', 'xml',
-            'agile', 'scrum', 'kanban', 'project management',
-            'testing', 'unit testing', 'integration testing', 'selenium', 'junit',
-            'spark', 'hadoop', 'kafka', 'airflow', 'etl', 'data pipeline'
-        ]
-        
-        # Convert to lowercase for case-insensitive matching
-        resume_lower = resume_text.lower()
-        job_desc_lower = job_description.lower()
-        
-        # Find skills mentioned in job description
-        job_skills = []
-        for skill in skills_db:
-            if skill in job_desc_lower:
-                job_skills.append(skill)
-        
-        # Find skills missing from resume
-        missing_skills = []
-        for skill in job_skills:
-            if skill not in resume_lower:
-                missing_skills.append(skill)
-        
-        # Remove duplicates and return
-        return list(set(missing_skills))
+        profile = get_resume_profile(resume)
+        
+        # Find skills mentioned in job description but missing from resume
+        missing_skills = job_skills(job_description) - profile.matched_skills
+        
+        return list(missing_skills)
         
     except Exception as e:
         raise Exception(f"Failed to analyze skill gap: {str(e)}") 
\ No newline at end of file
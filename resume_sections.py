@@ -0,0 +1,214 @@
+"""
+Resume section segmentation for SkillSnap.
+
+Splits a resume into summary, experience, education, skills and projects so
+that each LLM prompt only carries the sections its task needs. PDFs are
+segmented from pdfplumber's word and font data: headings are short lines
+naming a known section that stand out from the body by font size, weight,
+capitalization or spacing. Plain text falls back to the wording and
+capitalization of short lines.
+"""
+
+import hashlib
+import re
+from statistics import median
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+SECTIONS = ('summary', 'experience', 'education', 'skills', 'projects')
+# Recognized headings that belong to none of the sections above
+OTHER_SECTION = 'other'
+
+HEADINGS = {
+    'summary': (
+        'summary', 'professional summary', 'career summary', 'executive summary',
+        'profile', 'professional profile', 'personal profile', 'about', 'about me',
+        'objective', 'career objective', 'professional objective'
+    ),
+    'experience': (
+        'experience', 'work experience', 'professional experience', 'relevant experience',
+        'employment', 'employment history', 'work history', 'career history',
+        'professional background', 'internships', 'internship experience'
+    ),
+    'education': (
+        'education', 'academic background', 'academic qualifications', 'qualifications',
+        'education and training', 'education and certifications', 'certifications',
+        'certificates', 'licenses and certifications', 'courses', 'coursework'
+    ),
+    'skills': (
+        'skills', 'technical skills', 'key skills', 'core skills', 'core competencies',
+        'competencies', 'technologies', 'tools and technologies', 'skills and tools',
+        'tech stack', 'technical proficiencies', 'areas of expertise', 'expertise'
+    ),
+    'projects': (
+        'projects', 'personal projects', 'selected projects', 'key projects',
+        'academic projects', 'side projects', 'open source', 'portfolio'
+    ),
+    OTHER_SECTION: (
+        'awards', 'honors', 'honors and awards', 'achievements', 'publications',
+        'languages', 'interests', 'hobbies', 'volunteering', 'volunteer experience',
+        'references', 'activities', 'leadership', 'memberships', 'contact'
+    ),
+}
+HEADING_INDEX = {heading: section for section, headings in HEADINGS.items() for heading in headings}
+
+MAX_HEADING_WORDS = 5
+MAX_HEADING_LENGTH = 40
+# Font size ratio to the body text that marks a heading
+HEADING_SIZE_RATIO = 1.12
+# Vertical gap, in body line heights, that sets a heading apart from the text above
+HEADING_GAP_RATIO = 1.6
+# Words whose fonts are this close on the baseline form one line
+LINE_TOLERANCE = 3.0
+
+BOLD_FONT = re.compile(r"bold|black|heavy|semibold|demi", re.IGNORECASE)
+
+class Line(NamedTuple):
+    """A line of text on a PDF page with its layout cues."""
+    text: str
+    size: float
+    bold: bool
+    x0: float
+    top: float
+    bottom: float
+
+def normalize_heading(text: str) -> str:
+    """Lowercase a candidate heading and drop punctuation, e.g. 'WORK EXPERIENCE:' -> 'work experience'."""
+    text = text.lower().replace('&', ' and ')
+    return ' '.join(re.sub(r"[^a-z ]+", ' ', text).split())
+
+def fingerprint(text: str) -> str:
+    """Hash section text, ignoring changes in whitespace."""
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()[:16]
+
+def classify_heading(text: str) -> Optional[str]:
+    """Get the section a heading names, or None if it is not a known heading."""
+    if len(text) > MAX_HEADING_LENGTH or len(text.split()) > MAX_HEADING_WORDS:
+        return None
+    return HEADING_INDEX.get(normalize_heading(text))
+
+class ResumeDocument:
+    """Resume text together with its sections."""
+
+    def __init__(self, text: str, sections: Dict[str, str], segmentation: str):
+        self.text = text
+        self.sections = sections
+        # 'layout' when segmented from PDF font data, 'text' otherwise
+        self.segmentation = segmentation
+
+    def render(self, names: Optional[Sequence[str]] = None) -> str:
+        """
+        Get the text of the requested sections, each under its heading.
+
+        Returns the full text when names is None or the resume has none of
+        the requested sections, so a task never loses its resume entirely.
+        """
+        if names is None:
+            return self.text
+        parts = [
+            f"{name.upper()}:\n{self.sections[name]}"
+            for name in names if self.sections.get(name)
+        ]
+        return '\n\n'.join(parts) if parts else self.text
+
+    def fingerprints(self, names: Optional[Sequence[str]] = None) -> Dict[str, str]:
+        """Fingerprint each present section (of names, or all), in document section order."""
+        return {
+            name: fingerprint(text) for name, text in self.sections.items()
+            if text and (names is None or name in names)
+        }
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'sections': dict(self.sections), 'segmentation': self.segmentation}
+
+def _group_sections(entries: Iterable[tuple]) -> Dict[str, str]:
+    """Join (section or None, text) entries into section texts; None continues the current section."""
+    sections: Dict[str, List[str]] = {}
+    current = 'summary'  # Name, contact details and any untitled introduction
+    for section, text in entries:
+        if section is not None:
+            current = section
+            continue
+        sections.setdefault(current, []).append(text)
+    return {name: '\n'.join(lines).strip() for name, lines in sections.items() if ''.join(lines).strip()}
+
+def segment_text(text: str) -> ResumeDocument:
+    """Segment plain resume text using heading wording and capitalization."""
+    entries = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        section = classify_heading(stripped) if stripped else None
+        # Mixed-case headings must look like titles, not words in a sentence
+        if section is not None and not (stripped.isupper() or stripped.endswith(':') or stripped[0].isupper()):
+            section = None
+        entries.append((section, line))
+    return ResumeDocument(text, _group_sections(entries), 'text')
+
+def lines_from_words(words: List[Dict]) -> List[Line]:
+    """
+    Group pdfplumber words into lines with their font cues.
+
+    Args:
+        words: Output of extract_words(extra_attrs=['fontname', 'size'])
+
+    Returns:
+        Lines in reading order
+    """
+    lines: List[List[Dict]] = []
+    for word in sorted(words, key=lambda w: (round(w['bottom']), w['x0'])):
+        if lines and abs(lines[-1][0]['bottom'] - word['bottom']) <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+
+    result = []
+    for line_words in lines:
+        line_words.sort(key=lambda w: w['x0'])
+        chars = sum(len(w['text']) for w in line_words)
+        result.append(Line(
+            text=' '.join(w['text'] for w in line_words),
+            # Character-weighted so one large glyph doesn't make a body line a heading
+            size=sum(w['size'] * len(w['text']) for w in line_words) / max(chars, 1),
+            bold=all(BOLD_FONT.search(w.get('fontname', '')) for w in line_words),
+            x0=line_words[0]['x0'],
+            top=min(w['top'] for w in line_words),
+            bottom=max(w['bottom'] for w in line_words)
+        ))
+    return result
+
+def segment_lines(lines: List[Line]) -> ResumeDocument:
+    """
+    Segment PDF lines using font size, weight, capitalization and spacing.
+
+    A line is a heading if it names a known section and stands out from the
+    body text by at least one layout cue. Once a known heading has been seen,
+    unrecognized lines that are both larger and bold also start a section, so
+    content under headings like 'Volunteering' doesn't leak into the skills.
+    """
+    text = '\n'.join(line.text for line in lines)
+    if not lines:
+        return ResumeDocument(text, {}, 'layout')
+
+    body_size = median(line.size for line in lines)
+    body_height = median(line.bottom - line.top for line in lines)
+
+    entries = []
+    seen_heading = False
+    previous: Optional[Line] = None
+    for line in lines:
+        larger = line.size >= body_size * HEADING_SIZE_RATIO
+        caps = line.text.isupper()
+        spaced = previous is None or line.top - previous.bottom > body_height * HEADING_GAP_RATIO
+        previous = line
+
+        section = classify_heading(line.text)
+        if section is not None and not (larger or line.bold or caps or spaced or line.text.endswith(':')):
+            section = None
+        if (section is None and seen_heading and larger and line.bold
+                and len(line.text.split()) <= MAX_HEADING_WORDS):
+            section = OTHER_SECTION
+
+        if section is not None:
+            seen_heading = True
+        entries.append((section, line.text))
+
+    return ResumeDocument(text, _group_sections(entries), 'layout')
@@ -1,16 +1,56 @@
-from flask import Blueprint, request, jsonify, render_template
+from flask import Blueprint, request, jsonify, render_template, g
 from werkzeug.utils import secure_filename
 import os
 import json
 import asyncio
-from ml_utils import extract_text_from_pdf, recommend_jobs, analyze_skill_gap
+import functools
+import hmac
+from ml_utils import (
+    extract_text_from_pdf,
+    recommend_jobs,
+    analyze_skill_gap,
+    find_job_candidates,
+    get_resume_profile,
+    catalog_snapshot,
+    EXTRACTION_MODES,
+    RETRIEVAL_MODES,
+    DEFAULT_RETRIEVAL_MODE
+)
+from job_catalog import JobCatalogError
+from tenant_catalogs import tenant_catalogs, UnknownTenantError
+from skill_matcher import get_skill_matcher
+from skill_matrix import get_skill_matrix
+from startup import get_startup_report
+from utils.http_cache import compute_etag, not_modified, with_etag
+from utils.serialization import stream_response
+from utils.admission import admit, Overloaded, overloaded_response, workload_stats
+from utils import memory_profile
 from services.llm_services import (
     LLMJobMatchingService, 
     LLMSkillGapService, 
     LLMResumeImprovementService,
     LLMSkillsExtractionService,
     check_llm_availability,
-    LLMServiceError
+    LLMServiceError,
+    DETAIL_LEVELS,
+    tiering_stats
+)
+from services.llm_handler import llm_handler
+from services.llm_preflight import (
+    set_client,
+    reset_client,
+    token_ledger,
+    LLMPreflightError,
+    PromptTooLargeError,
+    QuotaExceededError
+)
+from services.llm_results import (
+    result_key,
+    parse_deadline,
+    run_with_deadline,
+    background_stats,
+    local_job_matches,
+    local_skill_gap
 )
 
 # Create blueprint for routes
@@ -19,18 +59,159 @@ api = Blueprint('api', __name__)
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# Maximum number of catalog jobs sent to the LLM for matching
+LLM_MAX_JOBS = int(os.getenv('LLM_MAX_JOBS', '20'))
+
+# Jobs sent to the LLM for matching: 'catalog' (default) sends the same
+# leading catalog jobs every time, so the whole prompt before the resume is
+# served from the provider's cache; 'retrieved' picks the most relevant jobs
+# for each resume, for catalogs much larger than LLM_MAX_JOBS, at the cost
+# of only the instructions being cached
+LLM_MATCH_CANDIDATES = os.getenv('LLM_MATCH_CANDIDATES', 'catalog').lower()
+
+# Largest page of GET /api/jobs; pages above JOBS_STREAM_MIN are streamed
+JOBS_PAGE_MAX = int(os.getenv('JOBS_PAGE_MAX', '10000'))
+JOBS_STREAM_MIN = int(os.getenv('JOBS_STREAM_MIN', '500'))
+JOBS_SEARCH_MAX = 500
+
+# Limits for catalog-wide skill gap responses
+CATALOG_GAP_MAX_JOBS = 200
+CATALOG_GAP_MAX_SKILLS = 50
+
+# Request header identifying the client for LLM token quotas (e.g. set by an
+# authenticating proxy); the remote address is used when unset
+LLM_CLIENT_HEADER = os.getenv('LLM_CLIENT_HEADER')
+
+# Token protecting job catalog writes; without one, writes are refused
+# unless JOB_CATALOG_OPEN_WRITES allows them (local development only)
+JOB_CATALOG_ADMIN_TOKEN = os.getenv('JOB_CATALOG_ADMIN_TOKEN')
+JOB_CATALOG_OPEN_WRITES = os.getenv('JOB_CATALOG_OPEN_WRITES', 'false').lower() in ('true', '1', 'yes')
+
+# Request header selecting the tenant whose job catalog a request uses; the
+# default catalog is used when it is absent
+TENANT_HEADER = os.getenv('TENANT_HEADER', 'X-Tenant-Id')
+
 def allowed_file(filename):
     """Check if file has allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def load_job_descriptions():
-    """Load job descriptions from sample_jobs.json."""
+def load_job_descriptions(catalog, resume=None, limit=LLM_MAX_JOBS, retrieval=None):
+    """
+    Load job descriptions from a job catalog.
+    
+    When a resume (text or ResumeProfile) is given, the catalog jobs most
+    relevant to it (by keyword or semantic retrieval) are returned instead
+    of the first jobs in the catalog.
+    """
     try:
-        with open('sample_jobs.json', 'r') as f:
-            return json.load(f)
+        if resume:
+            return find_job_candidates(resume, limit=limit, retrieval=retrieval, catalog=catalog)
+        return catalog.list_jobs(limit=limit)
     except Exception as e:
         raise Exception(f"Failed to load job descriptions: {str(e)}")
 
+def invalid_retrieval_response(data):
+    """Return a 400 response if the request asks for an unknown retrieval mode."""
+    retrieval = data.get('retrieval')
+    if retrieval is not None and str(retrieval).lower() not in RETRIEVAL_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"retrieval must be one of: {', '.join(RETRIEVAL_MODES)}"
+        }), 400
+    return None
+
+def invalid_detail_response(data):
+    """Return a 400 response if the request asks for an unknown detail level."""
+    detail = data.get('detail')
+    if detail is not None and str(detail).lower() not in DETAIL_LEVELS:
+        return jsonify({
+            'success': False,
+            'error': f"detail must be one of: {', '.join(DETAIL_LEVELS)}"
+        }), 400
+    return None
+
+def request_deadline():
+    """Get the request's LLM deadline in seconds, or a 400 response if the header is invalid."""
+    try:
+        return parse_deadline(request.headers.get('X-Deadline-Ms')), None
+    except ValueError as e:
+        return None, (jsonify({'success': False, 'error': str(e)}), 400)
+
+def llm_client_id():
+    """Identify the client that LLM token usage is charged to."""
+    if LLM_CLIENT_HEADER and request.headers.get(LLM_CLIENT_HEADER):
+        return request.headers[LLM_CLIENT_HEADER]
+    return request.remote_addr
+
+def preflight_error_response(error):
+    """Return a 413 or 429 response for a request refused before reaching the LLM."""
+    if isinstance(error, QuotaExceededError):
+        response = jsonify({
+            'success': False,
+            'error': str(error),
+            'retry_after': error.retry_after
+        })
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 429
+    
+    body = {'success': False, 'error': str(error)}
+    if isinstance(error, PromptTooLargeError):
+        body.update(input_tokens=error.input_tokens, context_window=error.context_window)
+    return jsonify(body), 413
+
+def admin_allowed():
+    """Check the request carries the admin token; admin endpoints stay closed until one is configured."""
+    if not JOB_CATALOG_ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {JOB_CATALOG_ADMIN_TOKEN}")
+
+def catalog_write_allowed():
+    """Check a job catalog write carries the admin token, or that open writes are enabled."""
+    if not JOB_CATALOG_ADMIN_TOKEN:
+        return JOB_CATALOG_OPEN_WRITES
+    return admin_allowed()
+
+def tenant_catalog(create=False):
+    """
+    Decorator resolving the request's tenant (TENANT_HEADER) to its job
+    catalog, available to the view as g.catalog.
+    
+    Unknown tenants get a 404, unless create is set and the request carries
+    the configured admin token, in which case an empty catalog is created for
+    them. JOB_CATALOG_OPEN_WRITES never creates tenants.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                g.catalog = tenant_catalogs.get(
+                    request.headers.get(TENANT_HEADER), create=create and admin_allowed()
+                )
+            except UnknownTenantError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 404
+            except JobCatalogError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@api.before_request
+def set_llm_client():
+    """Charge LLM requests made while handling this request to its client."""
+    g.llm_client_token = set_client(llm_client_id())
+
+@api.teardown_request
+def reset_llm_client(error=None):
+    token = g.pop('llm_client_token', None)
+    if token is not None:
+        reset_client(token)
+
 # Main page route
 @api.route('/')
 def index():
@@ -38,12 +219,15 @@ def index():
     return render_template('index.html')
 
 @api.route('/api/upload_resume', methods=['POST'])
+@admit('cpu')
 def upload_resume():
     """
     Upload and extract text from PDF resume.
     
-    Expected: multipart/form-data with 'file' field containing PDF
-    Returns: JSON with extracted text
+    Expected: multipart/form-data with 'file' field containing PDF, an
+    optional 'extraction_mode' field ('auto', 'fast' or 'layout') and an
+    optional 'sections' field ('true' to segment the resume from its layout)
+    Returns: JSON with extracted text, and its sections if requested
     """
     try:
         # Check if file is in request
@@ -69,8 +253,17 @@ def upload_resume():
                 'error': 'Only PDF files are allowed'
             }), 400
         
+        extraction_mode = request.form.get('extraction_mode')
+        if extraction_mode and extraction_mode.lower() not in EXTRACTION_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"extraction_mode must be one of: {', '.join(EXTRACTION_MODES)}"
+            }), 400
+        
         # Extract text from PDF
-        extracted_text = extract_text_from_pdf(file)
+        sectioned = request.form.get('sections', 'false').lower() in ('true', '1', 'yes')
+        document = extract_text_from_pdf(file, extraction_mode, sectioned=sectioned)
+        extracted_text = document.text if sectioned else document
         
         if not extracted_text.strip():
             return jsonify({
@@ -78,12 +271,15 @@ def upload_resume():
                 'error': 'No text could be extracted from the PDF'
             }), 400
         
-        return jsonify({
+        response = {
             'success': True,
             'text': extracted_text,
             'filename': secure_filename(file.filename),
             'character_count': len(extracted_text)
-        })
+        }
+        if sectioned:
+            response.update(document.to_dict())
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({
@@ -92,11 +288,13 @@ def upload_resume():
         }), 500
 
 @api.route('/api/recommend_jobs', methods=['POST'])
+@tenant_catalog()
 def get_job_recommendations():
     """
     Get job recommendations based on resume text.
     
-    Expected: JSON with 'resume_text' field
+    Expected: JSON with 'resume_text' field and optional 'retrieval'
+    ('keyword' or 'semantic')
     Returns: JSON with recommended jobs
     """
     try:
@@ -116,14 +314,30 @@ def get_job_recommendations():
                 'error': 'resume_text cannot be empty'
             }), 400
         
-        # Get recommendations
-        recommendations = recommend_jobs(resume_text)
+        error_response = invalid_retrieval_response(data)
+        if error_response:
+            return error_response
         
-        return jsonify({
+        retrieval = (data.get('retrieval') or DEFAULT_RETRIEVAL_MODE).lower()
+        
+        # Get recommendations from one consistent catalog snapshot
+        with catalog_snapshot(retrieval, g.catalog) as catalog_version:
+            # Identical resume, retrieval mode and catalog version give an
+            # identical answer; the version is the one results are computed
+            # against, which for semantic retrieval can trail the database
+            etag = compute_etag('recommend_jobs', resume_text, retrieval, g.catalog.snapshot_key(catalog_version))
+            cached_response = not_modified(etag)
+            if cached_response:
+                return cached_response
+            
+            recommendations = recommend_jobs(resume_text, retrieval=retrieval, catalog=g.catalog)
+        
+        return with_etag(jsonify({
             'success': True,
+            'catalog_version': catalog_version,
             'recommendations': recommendations,
             'total_recommendations': len(recommendations)
-        })
+        }), etag)
         
     except Exception as e:
         return jsonify({
@@ -157,13 +371,79 @@ def analyze_skill_gaps():
                 'error': 'resume_text and job_description cannot be empty'
             }), 400
         
+        # The answer also depends on the skill vocabulary and matching rules
+        etag = compute_etag('skill_gap', resume_text, job_description, get_skill_matcher().digest)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
         # Analyze skill gap
         missing_skills = analyze_skill_gap(resume_text, job_description)
         
-        return jsonify({
+        return with_etag(jsonify({
             'success': True,
             'analysis': missing_skills
-        })
+        }), etag)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api.route('/api/skill_gap/catalog', methods=['POST'])
+@tenant_catalog()
+def analyze_catalog_skill_gaps():
+    """
+    Analyze skill gaps between a resume and every job in the catalog.
+    
+    Expected: JSON with 'resume_text' field, optional 'limit' (jobs to
+    detail, default 20) and 'top_missing' (default 10)
+    Returns: JSON with coverage per job, missing skills for the best-covered
+    jobs and the skills missing most often across the catalog
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'resume_text' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'resume_text field is required'
+            }), 400
+        
+        resume_text = data['resume_text'].strip()
+        
+        if not resume_text:
+            return jsonify({
+                'success': False,
+                'error': 'resume_text cannot be empty'
+            }), 400
+        
+        try:
+            limit = min(max(int(data.get('limit', 20)), 0), CATALOG_GAP_MAX_JOBS)
+            top_missing = min(max(int(data.get('top_missing', 10)), 0), CATALOG_GAP_MAX_SKILLS)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'limit and top_missing must be integers'
+            }), 400
+        
+        # The matrix snapshot may briefly trail the catalog while a newer one builds
+        matrix = get_skill_matrix(g.catalog)
+        etag = compute_etag('skill_gap_catalog', resume_text, limit, top_missing,
+                            g.catalog.snapshot_key(matrix.version), get_skill_matcher().digest)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        profile = get_resume_profile(resume_text)
+        report = matrix.gap_report(profile.matched_skills, limit=limit, top_missing=top_missing)
+        
+        return with_etag(jsonify({
+            'success': True,
+            'catalog_version': matrix.version,
+            **report
+        }), etag)
         
     except Exception as e:
         return jsonify({
@@ -174,12 +454,19 @@ def analyze_skill_gaps():
 # New LLM-based endpoints
 
 @api.route('/api/llm_job_match', methods=['POST'])
+@admit('llm')
+@tenant_catalog()
 def llm_job_match():
     """
     LLM-based semantic job matching.
     
-    Expected: JSON with 'resume_text' field
-    Returns: JSON with LLM-analyzed job matches
+    Expected: JSON with 'resume_text' field, optional 'retrieval' used
+    to pick the jobs for the local fallback (and those sent to the LLM with
+    LLM_MATCH_CANDIDATES=retrieved) and optional 'detail'
+    ('full' or 'compact'). An optional X-Deadline-Ms header bounds how
+    long to wait for the LLM.
+    Returns: JSON with LLM-analyzed job matches, or local keyword matches
+    marked 'degraded' if the LLM missed the deadline
     """
     try:
         # Check LLM availability
@@ -207,21 +494,64 @@ def llm_job_match():
                 'error': 'resume_text cannot be empty'
             }), 400
         
-        # Load job descriptions
-        job_descriptions = load_job_descriptions()
+        error_response = invalid_retrieval_response(data) or invalid_detail_response(data)
+        if error_response:
+            return error_response
+        
+        deadline, error_response = request_deadline()
+        if error_response:
+            return error_response
+        
+        # Preprocess the resume once for candidate retrieval and matching
+        resume_profile = get_resume_profile(resume_text)
         
-        # Run LLM job matching
-        async def run_llm_matching():
-            return await LLMJobMatchingService.match_jobs(resume_text, job_descriptions)
+        # Load the catalog jobs most relevant to this resume, or the shared catalog block
+        with catalog_snapshot(data.get('retrieval'), g.catalog) as catalog_version:
+            if LLM_MATCH_CANDIDATES == 'catalog':
+                job_descriptions = load_job_descriptions(g.catalog)
+            else:
+                job_descriptions = load_job_descriptions(g.catalog, resume_profile, retrieval=data.get('retrieval'))
+        catalog_key = g.catalog.snapshot_key(catalog_version)
         
-        result = asyncio.run(run_llm_matching())
+        # Run LLM job matching, waiting no longer than the deadline
+        key = result_key(
+            'job_matching', resume_profile.content_hash, data.get('detail'),
+            llm_handler.get_active_model('job_matching'), catalog_key, [job['id'] for job in job_descriptions]
+        )
+        result, completed = run_with_deadline(
+            key,
+            lambda: LLMJobMatchingService.match_jobs(
+                resume_profile, job_descriptions, data.get('detail'), catalog_key
+            ),
+            deadline
+        )
+        
+        if not completed:
+            # Fall back to local keyword matching while the LLM call finishes
+            recommendations = recommend_jobs(resume_profile, top_k=5, retrieval=data.get('retrieval'),
+                                             catalog=g.catalog)
+            return jsonify({
+                'success': True,
+                'catalog_version': catalog_version,
+                'degraded': True,
+                'degraded_reason': 'deadline_exceeded',
+                'llm_analysis': local_job_matches(recommendations),
+                'recommendations': recommendations,
+                'provider_info': llm_status['provider_info']
+            })
         
         return jsonify({
             'success': True,
+            'catalog_version': catalog_version,
+            'degraded': False,
             'llm_analysis': result,
             'provider_info': llm_status['provider_info']
         })
         
+    except LLMPreflightError as e:
+        return preflight_error_response(e)
+    except Overloaded as e:
+        return overloaded_response(e)
     except LLMServiceError as e:
         return jsonify({
             'success': False,
@@ -234,12 +564,16 @@ def llm_job_match():
         }), 500
 
 @api.route('/api/llm_skill_gap', methods=['POST'])
+@admit('llm')
 def llm_skill_gap():
     """
     LLM-based skill gap analysis.
     
-    Expected: JSON with 'resume_text' and 'job_description' fields
-    Returns: JSON with LLM-analyzed skill gaps and improvement suggestions
+    Expected: JSON with 'resume_text' and 'job_description' fields and
+    optional 'detail' ('full' or 'compact'). An optional X-Deadline-Ms
+    header bounds how long to wait for the LLM.
+    Returns: JSON with LLM-analyzed skill gaps and improvement suggestions,
+    or local missing skills marked 'degraded' if the LLM missed the deadline
     """
     try:
         # Check LLM availability
@@ -268,18 +602,48 @@ def llm_skill_gap():
                 'error': 'resume_text and job_description cannot be empty'
             }), 400
         
-        # Run LLM skill gap analysis
-        async def run_llm_analysis():
-            return await LLMSkillGapService.analyze_skill_gap(resume_text, job_description)
+        error_response = invalid_detail_response(data)
+        if error_response:
+            return error_response
+        
+        deadline, error_response = request_deadline()
+        if error_response:
+            return error_response
         
-        result = asyncio.run(run_llm_analysis())
+        # Run LLM skill gap analysis, waiting no longer than the deadline
+        key = result_key(
+            'skill_gap', resume_text, job_description, data.get('detail'),
+            llm_handler.get_active_model('skill_gap')
+        )
+        result, completed = run_with_deadline(
+            key,
+            lambda: LLMSkillGapService.analyze_skill_gap(resume_text, job_description, data.get('detail')),
+            deadline
+        )
+        
+        if not completed:
+            # Fall back to local skill matching while the LLM call finishes
+            missing_skills = analyze_skill_gap(resume_text, job_description)
+            return jsonify({
+                'success': True,
+                'degraded': True,
+                'degraded_reason': 'deadline_exceeded',
+                'llm_analysis': local_skill_gap(missing_skills),
+                'missing_skills': missing_skills,
+                'provider_info': llm_status['provider_info']
+            })
         
         return jsonify({
             'success': True,
+            'degraded': False,
             'llm_analysis': result,
             'provider_info': llm_status['provider_info']
         })
         
+    except LLMPreflightError as e:
+        return preflight_error_response(e)
+    except Overloaded as e:
+        return overloaded_response(e)
     except LLMServiceError as e:
         return jsonify({
             'success': False,
@@ -292,11 +656,13 @@ def llm_skill_gap():
         }), 500
 
 @api.route('/api/resume_improve', methods=['POST'])
+@admit('llm')
 def resume_improve():
     """
     LLM-based resume improvement suggestions.
     
-    Expected: JSON with 'resume_text' and 'job_description' fields
+    Expected: JSON with 'resume_text' and 'job_description' fields and
+    optional 'detail' ('full' or 'compact')
     Returns: JSON with LLM-generated improvement suggestions
     """
     try:
@@ -326,9 +692,13 @@ def resume_improve():
                 'error': 'resume_text and job_description cannot be empty'
             }), 400
         
+        error_response = invalid_detail_response(data)
+        if error_response:
+            return error_response
+        
         # Run LLM resume improvement
         async def run_llm_improvement():
-            return await LLMResumeImprovementService.improve_resume(resume_text, job_description)
+            return await LLMResumeImprovementService.improve_resume(resume_text, job_description, data.get('detail'))
         
         result = asyncio.run(run_llm_improvement())
         
@@ -338,6 +708,8 @@ def resume_improve():
             'provider_info': llm_status['provider_info']
         })
         
+    except LLMPreflightError as e:
+        return preflight_error_response(e)
     except LLMServiceError as e:
         return jsonify({
             'success': False,
@@ -349,6 +721,221 @@ def resume_improve():
             'error': f"Resume improvement failed: {str(e)}"
         }), 500
 
+# Job catalog endpoints
+
+def stream_jobs_page(catalog, offset, limit):
+    """Yield a GET /api/jobs response envelope and its jobs from one catalog snapshot."""
+    with catalog.read_snapshot() as version:
+        total = catalog.count()
+        yield {
+            'success': True,
+            'total_jobs': total,
+            'catalog_version': version
+        }, max(min(limit, total - offset), 0)
+        yield from catalog.iter_jobs(offset=offset, limit=limit)
+
+@api.route('/api/jobs', methods=['GET'])
+@tenant_catalog()
+def list_jobs():
+    """
+    List or search jobs in the catalog.
+    
+    Query params: 'q' (optional search terms), 'offset', 'limit' (max
+    JOBS_PAGE_MAX, or 500 when searching)
+    Returns: JSON with jobs and catalog totals; large pages are streamed
+    """
+    try:
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), JOBS_PAGE_MAX)
+        query = request.args.get('q', '').strip()
+        
+        if query:
+            jobs = g.catalog.search(query.split(), limit=min(limit, JOBS_SEARCH_MAX))
+        elif limit > JOBS_STREAM_MIN:
+            return stream_response(stream_jobs_page(g.catalog, offset, limit), 'jobs')
+        else:
+            jobs = g.catalog.list_jobs(offset=offset, limit=limit)
+        
+        return jsonify({
+            'success': True,
+            'jobs': jobs,
+            'total_jobs': g.catalog.count(),
+            'catalog_version': g.catalog.version()
+        })
+        
+    except JobCatalogError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to list jobs: {str(e)}"
+        }), 500
+
+@api.route('/api/jobs/<int:job_id>', methods=['GET'])
+@tenant_catalog()
+def get_job(job_id):
+    """Get a single job from the catalog."""
+    job = g.catalog.get_job(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+@api.route('/api/jobs', methods=['POST'])
+@tenant_catalog(create=True)
+def add_job():
+    """
+    Add a job to the catalog.
+    
+    Expected: JSON with 'title' and 'description' fields
+    Returns: JSON with the created job
+    """
+    if not catalog_write_allowed():
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    try:
+        job = g.catalog.add_job(request.get_json(silent=True))
+        return jsonify({
+            'success': True,
+            'job': job,
+            'catalog_version': g.catalog.version()
+        }), 201
+        
+    except JobCatalogError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to add job: {str(e)}"
+        }), 500
+
+@api.route('/api/jobs/<int:job_id>', methods=['PUT'])
+@tenant_catalog()
+def update_job(job_id):
+    """
+    Update a job in the catalog.
+    
+    Expected: JSON with 'title' and/or 'description' fields
+    Returns: JSON with the updated job
+    """
+    if not catalog_write_allowed():
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    try:
+        job = g.catalog.update_job(job_id, request.get_json(silent=True))
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job,
+            'catalog_version': g.catalog.version()
+        })
+        
+    except JobCatalogError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to update job: {str(e)}"
+        }), 500
+
+@api.route('/api/jobs/<int:job_id>', methods=['DELETE'])
+@tenant_catalog()
+def delete_job(job_id):
+    """Delete a job from the catalog."""
+    if not catalog_write_allowed():
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    try:
+        if not g.catalog.delete_job(job_id):
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'catalog_version': g.catalog.version()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to delete job: {str(e)}"
+        }), 500
+
+@api.route('/api/jobs/import', methods=['POST'])
+@tenant_catalog(create=True)
+def import_jobs():
+    """
+    Bulk-import jobs into the catalog.
+    
+    Expected: JSON with 'jobs' list and optional 'replace' flag
+    Returns: JSON with the number of imported jobs
+    """
+    if not catalog_write_allowed():
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    try:
+        data = request.get_json()
+        
+        if not data or 'jobs' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'jobs field is required'
+            }), 400
+        
+        imported = g.catalog.import_jobs(data['jobs'], replace=bool(data.get('replace', False)))
+        
+        return jsonify({
+            'success': True,
+            'imported': imported,
+            'total_jobs': g.catalog.count(),
+            'catalog_version': g.catalog.version()
+        })
+        
+    except JobCatalogError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to import jobs: {str(e)}"
+        }), 500
+
 @api.route('/api/llm_status', methods=['GET'])
 def llm_status():
     """
@@ -358,28 +945,140 @@ def llm_status():
     """
     try:
         status = check_llm_availability()
-        return jsonify({
+        
+        # Changes only when provider configuration or models change
+        etag = compute_etag('llm_status', status)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        
+        return with_etag(jsonify({
             'success': True,
             'llm_status': status
-        })
+        }), etag)
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f"Failed to check LLM status: {str(e)}"
         }), 500
 
+@api.route('/api/llm_usage', methods=['GET'])
+def llm_usage():
+    """
+    Get the calling client's LLM token usage.
+    
+    Returns: JSON with usage and remaining tokens per quota window, and the
+    client's most recent requests with estimated and actual token counts
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'usage': token_ledger.client_usage(llm_client_id())
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to get LLM usage: {str(e)}"
+        }), 500
+
 @api.route('/api/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint.
     
-    Returns: JSON with health status
+    Returns: JSON with health status, the startup timing report, the
+    load on each workload class, LLM responses per model tier and the
+    worker's open tenant catalogs
     """
+    tenants = tenant_catalogs.stats()
     return jsonify({
         'status': 'healthy',
-        'message': 'SkillSnap API is running'
+        'message': 'SkillSnap API is running',
+        'startup': get_startup_report(),
+        'workloads': workload_stats(),
+        'llm_background': background_stats(),
+        'llm_tiers': tiering_stats(),
+        'tenants': {name: value for name, value in tenants.items() if name != 'tenants'}
     })
 
+@api.route('/api/admin/tenants', methods=['GET'])
+def tenant_stats():
+    """
+    Tenant catalog usage in the worker process serving the request.
+    
+    Query parameters: 'tenant' (report a single tenant) and 'evict' (with
+    'tenant', close its catalog in this worker)
+    Returns: JSON with LRU occupancy, hit/load/eviction counters and, per
+    tenant, requests, loads, evictions, last use and loaded index sizes
+    """
+    if not admin_allowed():
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    tenant_id = request.args.get('tenant')
+    try:
+        if not tenant_id:
+            return jsonify({
+                'success': True,
+                **tenant_catalogs.stats()
+            })
+        
+        evicted = request.args.get('evict') == '1' and tenant_catalogs.evict(tenant_id)
+        return jsonify({
+            'success': True,
+            'pid': os.getpid(),
+            'tenant': tenant_id,
+            'evicted': evicted,
+            **tenant_catalogs.tenant_stats(tenant_id)
+        })
+    except JobCatalogError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@api.route('/api/admin/memory', methods=['GET'])
+def memory_stats():
+    """
+    Memory instrumentation report for the worker process serving the request.
+    
+    Query parameters: 'top' (allocation sites to list, default 20),
+    'group_by' ('lineno', 'filename' or 'traceback'), 'compare' (rank sites
+    by growth since the baseline snapshot) and 'reset_baseline'.
+    Returns: JSON with per-endpoint and per-stage allocations, RSS and GC
+    samples, a max_requests hint and the top allocation sites
+    """
+    if not admin_allowed():
+        return jsonify({
+            'success': False,
+            'error': 'Unauthorized'
+        }), 401
+    
+    if not memory_profile.MEMORY_PROFILING:
+        return jsonify({
+            'success': False,
+            'error': 'Memory profiling is disabled; set MEMORY_PROFILING=true'
+        }), 404
+    
+    try:
+        top = int(request.args.get('top', 20))
+        group_by = request.args.get('group_by', 'lineno')
+        if request.args.get('reset_baseline') == '1':
+            memory_profile.reset_baseline()
+        compare = request.args.get('compare') == '1'
+        return jsonify({
+            'success': True,
+            **memory_profile.memory_report(),
+            'top_allocations': memory_profile.top_allocations(top, group_by, compare)
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
 # Error handlers
 @api.errorhandler(404)
 def not_found(error):
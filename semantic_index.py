@@ -0,0 +1,365 @@
+"""
+Offline semantic retrieval for SkillSnap.
+
+Documents are embedded locally with hashed word and character n-gram features
+followed by a sparse random projection, so no model download or network call
+is needed. Job embeddings are indexed with random-hyperplane LSH for fast
+approximate nearest-neighbour lookups. The index is a set of flat arrays
+shared by all workers through catalog_arrays.
+"""
+
+import copy
+import logging
+import math
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog_arrays import StringTable, load_or_build
+from catalog_snapshot import CatalogSnapshots
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = int(os.getenv('SEMANTIC_EMBEDDING_DIM', '256'))
+PROJECTIONS_PER_FEATURE = 4
+LSH_TABLES = 8
+LSH_BITS = 10
+RANDOM_SEED = 1729
+IDF_BUCKETS = 2 ** 20
+TRIGRAM_WEIGHT = 0.3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our the their to
+we will with you your ability able strong skills experience knowledge looking seeking
+ideal candidate should including like such team work working environment
+""".split())
+
+class HashingEmbedder:
+    """Embed text with hashed n-gram features and a sparse random projection."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, seed: int = RANDOM_SEED):
+        self.dim = dim
+        self.idf: Optional[np.ndarray] = None
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for multiply-shift hashing of feature ids into dimensions
+        self._dim_multipliers = rng.integers(1, 2 ** 31, size=PROJECTIONS_PER_FEATURE, dtype=np.uint64) | 1
+        self._sign_multipliers = rng.integers(1, 2 ** 31, size=PROJECTIONS_PER_FEATURE, dtype=np.uint64) | 1
+
+    @staticmethod
+    def features(text: str) -> Counter:
+        """Extract word unigrams, word bigrams and in-word character trigrams."""
+        words = [w for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOPWORDS]
+
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            features.update(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    @staticmethod
+    def _feature_ids(features: Counter) -> np.ndarray:
+        return np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint64, count=len(features))
+
+    def fit(self, texts: Iterable[str]) -> 'HashingEmbedder':
+        """
+        Learn smoothed inverse document frequencies over hashed features so
+        that catalog boilerplate contributes little to embeddings.
+        """
+        document_frequency = np.zeros(IDF_BUCKETS, dtype=np.int32)
+        documents = 0
+        for text in texts:
+            features = self.features(text)
+            if features:
+                buckets = np.unique(self._feature_ids(features) % np.uint64(IDF_BUCKETS)).astype(np.intp)
+                document_frequency[buckets] += 1
+            documents += 1
+
+        self.idf = (np.log((1.0 + documents) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        return self
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a single document.
+
+        Returns:
+            L2-normalized float32 vector of length dim
+        """
+        features = self.features(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not features:
+            return vector
+
+        ids = self._feature_ids(features)
+        weights = np.fromiter(
+            ((1.0 + math.log(c)) * (TRIGRAM_WEIGHT if f[0] == '#' else 1.0) for f, c in features.items()),
+            dtype=np.float32, count=len(features)
+        )
+        if self.idf is not None:
+            weights *= self.idf[(ids % np.uint64(IDF_BUCKETS)).astype(np.intp)]
+
+        dims = ((ids[:, None] * self._dim_multipliers[None, :]) >> np.uint64(16)) % np.uint64(self.dim)
+        signs = (((ids[:, None] * self._sign_multipliers[None, :]) >> np.uint64(31)) & np.uint64(1)).astype(np.float32)
+        contributions = weights[:, None] * (1.0 - 2.0 * signs)
+        np.add.at(vector, dims.astype(np.intp).ravel(), contributions.ravel())
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        """Embed several documents into a (n, dim) matrix."""
+        vectors = [self.embed(text) for text in texts]
+        if not vectors:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(vectors)
+
+class LSHIndex:
+    """
+    Random-hyperplane LSH index with multi-probe lookups and exact re-ranking.
+
+    Each table is stored as the row order sorted by bucket key alongside the
+    sorted keys, offset by table so all tables form one sorted array. Every
+    probed bucket is then a contiguous slice found by a single vectorized
+    binary search, and the index is made of flat arrays that can be
+    memory-mapped.
+    """
+
+    def __init__(self, vectors: np.ndarray, sorted_keys: Optional[np.ndarray] = None,
+                 order: Optional[np.ndarray] = None, tables: int = LSH_TABLES, bits: int = LSH_BITS,
+                 seed: int = RANDOM_SEED):
+        self.vectors = vectors
+        self.tables = tables
+        self.bits = bits
+        rng = np.random.default_rng(seed + 1)
+        self._planes = rng.standard_normal((tables * bits, vectors.shape[1])).astype(np.float32)
+        self._powers = (1 << np.arange(bits, dtype=np.int64))
+        self._flips = np.concatenate(([0], self._powers))
+        self._table_offsets = np.arange(tables, dtype=np.int64) << bits
+
+        if sorted_keys is None or order is None:
+            sorted_keys, order = self.build_tables(vectors)
+        self.sorted_keys = sorted_keys
+        self.order = order
+        self._flat_keys = sorted_keys.reshape(-1)
+        self._flat_order = order.reshape(-1)
+
+    def _keys(self, vectors: np.ndarray) -> np.ndarray:
+        """Compute one integer bucket key per table for each vector."""
+        bits = (vectors @ self._planes.T) > 0
+        bits = bits.reshape(len(vectors), self.tables, self.bits)
+        return bits.astype(np.int64) @ self._powers
+
+    def build_tables(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bucket vectors in every table.
+
+        Returns:
+            Tuple of (sorted bucket keys offset by table, row order), each of
+            shape (tables, n)
+        """
+        keys = self._keys(vectors).T if len(vectors) else np.zeros((self.tables, 0), dtype=np.int64)
+        order = np.argsort(keys, axis=1, kind='stable')
+        sorted_keys = np.take_along_axis(keys, order, axis=1) + self._table_offsets[:, None]
+        return sorted_keys, order
+
+    def query(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """
+        Find approximate nearest neighbours by cosine similarity.
+
+        Args:
+            vector: Normalized query vector
+            k: Number of neighbours to return
+
+        Returns:
+            List of (row index, cosine similarity), most similar first
+        """
+        n = len(self.vectors)
+        if n == 0 or k <= 0:
+            return []
+
+        keys = self._keys(vector[None, :])[0]
+        # Probe the exact bucket plus every bucket one bit-flip away, in every table
+        probes = ((keys[:, None] ^ self._flips[None, :]) + self._table_offsets[:, None]).ravel()
+        # Keys are integers, so a bucket ends where the next key would start
+        bounds = np.searchsorted(self._flat_keys, np.concatenate((probes, probes + 1)))
+        starts = bounds[:len(probes)]
+        lengths = bounds[len(probes):] - starts
+
+        total = int(lengths.sum())
+        if total:
+            # Positions of every row in every probed slice, without a Python loop
+            positions = np.arange(total) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+            candidates = np.unique(self._flat_order[positions])
+        else:
+            candidates = np.empty(0, dtype=np.int64)
+
+        if len(candidates) < k:
+            # Too few collisions for a full answer, so fall back to exact search
+            candidates = np.arange(n)
+            scores = self.vectors @ vector
+        else:
+            scores = self.vectors[candidates] @ vector
+
+        top = min(k, len(candidates))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+class SemanticJobIndex:
+    """
+    Semantic index over a job catalog at a specific catalog version.
+
+    A base index covers the whole catalog at its build version. apply_delta()
+    derives an index for a later version that hides the base rows of changed
+    jobs and searches their current content exactly in a small delta segment.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], version: int):
+        """
+        Args:
+            arrays: Index arrays from build_arrays(), possibly memory-mapped
+            version: Catalog version the arrays were built from
+        """
+        self.version = version
+        self.base = self
+        self.embedder = HashingEmbedder()
+        self.embedder.idf = arrays['idf']
+        self.job_ids = arrays['job_ids']
+        self.titles = StringTable(arrays['title_blob'], arrays['title_offsets'])
+        self.index = LSHIndex(arrays['vectors'], arrays['lsh_keys'], arrays['lsh_order'])
+
+        # Delta segment: changed jobs, and base rows they replace
+        self.removed_ids = np.empty(0, dtype=np.int64)
+        self.delta_vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.delta_jobs: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the index arrays, including the delta segment."""
+        return sum(array.nbytes for array in (
+            self.embedder.idf, self.index.vectors, self.index.sorted_keys, self.index.order, self.job_ids,
+            self.titles.blob, self.titles.offsets, self.removed_ids, self.delta_vectors
+        ))
+
+    def apply_delta(self, delta) -> 'SemanticJobIndex':
+        """
+        Get an index for a later catalog version from this base index.
+
+        Args:
+            delta: CatalogDelta since this index's version
+
+        Returns:
+            A new index sharing this one's arrays
+        """
+        index = copy.copy(self)
+        index.version = delta.version
+        index.removed_ids = np.array(sorted(delta.removed_ids), dtype=np.int64)
+        index.delta_vectors = self.embedder.embed_many(
+            f"{job['title']}\n{job['description']}" for job in delta.jobs
+        )
+        index.delta_jobs = [{'id': job['id'], 'title': job['title']} for job in delta.jobs]
+        return index
+
+    @classmethod
+    def build(cls, jobs: List[Dict[str, Any]], version: int,
+              embedder: Optional[HashingEmbedder] = None) -> 'SemanticJobIndex':
+        """Build an index held in process memory."""
+        return cls(cls.build_arrays(jobs, embedder), version)
+
+    @staticmethod
+    def build_arrays(jobs: List[Dict[str, Any]], embedder: Optional[HashingEmbedder] = None) -> Dict[str, np.ndarray]:
+        """
+        Embed and bucket jobs.
+
+        Args:
+            jobs: Jobs with 'id', 'title' and 'description'
+            embedder: Embedder with learned IDF weights; by default one is fitted to the jobs
+
+        Returns:
+            Arrays by name, as stored in the shared catalog arrays
+        """
+        start = time.perf_counter()
+        texts = [f"{job['title']}\n{job['description']}" for job in jobs]
+        if embedder is None:
+            embedder = HashingEmbedder().fit(texts)
+        vectors = embedder.embed_many(texts)
+        lsh = LSHIndex(vectors)
+        titles = StringTable.encode([job['title'] for job in jobs])
+        logger.info(f"Built semantic index for {len(jobs)} jobs in {time.perf_counter() - start:.2f}s")
+
+        return {
+            'idf': embedder.idf,
+            'vectors': vectors,
+            'lsh_keys': lsh.sorted_keys,
+            'lsh_order': lsh.order,
+            'job_ids': np.array([job['id'] for job in jobs], dtype=np.int64),
+            'title_blob': titles['blob'],
+            'title_offsets': titles['offsets']
+        }
+
+    def search(self, text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retrieve the jobs most semantically similar to the text.
+
+        Returns:
+            List of dictionaries with 'job_id', 'title' and cosine 'similarity'
+        """
+        return self.search_vector(self.embedder.embed(text), top_k)
+
+    def search_vector(self, vector: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Retrieve the jobs nearest to an already computed embedding."""
+        # Ask the base for enough extra rows to make up for hidden ones
+        results = [
+            {'job_id': int(self.job_ids[row]), 'title': self.titles[row], 'similarity': similarity}
+            for row, similarity in self.index.query(vector, top_k + len(self.removed_ids))
+        ]
+        if not len(self.removed_ids) and not self.delta_jobs:
+            return results[:top_k]
+
+        removed = set(self.removed_ids.tolist())
+        results = [result for result in results if result['job_id'] not in removed]
+        if self.delta_jobs:
+            scores = self.delta_vectors @ vector
+            results += [
+                {'job_id': job['id'], 'title': job['title'], 'similarity': float(score)}
+                for job, score in zip(self.delta_jobs, scores)
+            ]
+            results.sort(key=lambda result: -result['similarity'])
+        return results[:top_k]
+
+def _build_base(catalog, version: int) -> SemanticJobIndex:
+    """Build or attach to the shared base index for a catalog version."""
+    arrays = load_or_build(
+        f"semantic_index-{catalog.catalog_id()}",
+        f"v{version}-d{EMBEDDING_DIM}",
+        lambda: SemanticJobIndex.build_arrays(list(catalog.iter_jobs()))
+    )
+    return SemanticJobIndex(arrays, version)
+
+_snapshots = CatalogSnapshots('semantic index', _build_base, SemanticJobIndex.apply_delta)
+
+def get_semantic_index(catalog=None) -> SemanticJobIndex:
+    """
+    Get the semantic index snapshot for the current version of a catalog
+    (the default catalog if none is given).
+
+    Catalog writes are applied as deltas to a shared base index, which is
+    rebuilt once the delta grows large; see catalog_snapshot.
+    """
+    if catalog is None:
+        from job_catalog import job_catalog as catalog
+
+    return _snapshots.get(catalog)
@@ -0,0 +1,261 @@
+"""
+Provider batch APIs for offline LLM workloads.
+
+Batch APIs accept thousands of requests at once and process them
+asynchronously, usually within hours, at a lower price and outside the
+interactive rate limits. Each backend submits a list of BatchRequests,
+reports the batch status and yields a BatchResult per request:
+
+- 'openai': OpenAI Batch API (JSONL file of chat completion requests)
+- 'anthropic': Anthropic Message Batches API
+- 'local': an in-process stand-in that answers requests with a supplied
+  function and keeps results on disk, for testing batch pipelines without
+  provider credentials
+"""
+
+import io
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from services.llm_handler import AnthropicProvider, OpenAIProvider, llm_handler
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Directory where the local stand-in keeps submitted batches
+LOCAL_BATCH_DIR = os.getenv('LLM_LOCAL_BATCH_DIR', 'local_batches')
+
+class BatchRequest(NamedTuple):
+    """
+    One prompt in a batch. custom_id must match [a-zA-Z0-9_-]{1,64}. model
+    is the model chosen for the request's task (LLMHandler.route); the
+    provider's main model if omitted.
+    """
+    custom_id: str
+    prompt: str
+    max_tokens: int
+    temperature: float
+    model: Optional[str] = None
+
+class BatchResult(NamedTuple):
+    """Outcome of one batch request: response text or an error, and token usage."""
+    custom_id: str
+    text: Optional[str]
+    error: Optional[str]
+    usage: Dict[str, Any]
+
+class BatchBackend(ABC):
+    """A provider's batch API."""
+
+    name: str = ''
+
+    @abstractmethod
+    def submit(self, requests: List[BatchRequest]) -> str:
+        """Submit requests and return the batch id."""
+        pass
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Get the batch status: 'running', 'ended' or 'failed'."""
+        pass
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        """Yield the result of every request in an ended batch."""
+        pass
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API over /v1/chat/completions."""
+
+    name = 'openai'
+
+    def __init__(self, provider: OpenAIProvider):
+        self.provider = provider
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        client = self.provider._get_client()
+        lines = [
+            json.dumps({
+                'custom_id': request.custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': {
+                    'model': request.model or self.provider.model,
+                    'messages': self.provider.messages(request.prompt),
+                    'max_tokens': request.max_tokens,
+                    'temperature': request.temperature
+                }
+            })
+            for request in requests
+        ]
+        upload = client.files.create(
+            file=('batch.jsonl', io.BytesIO('\n'.join(lines).encode('utf-8'))),
+            purpose='batch'
+        )
+        batch = client.batches.create(
+            input_file_id=upload.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        status = self.provider._get_client().batches.retrieve(batch_id).status
+        if status == 'completed':
+            return 'ended'
+        if status in ('failed', 'expired', 'cancelled'):
+            return 'failed'
+        return 'running'
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        client = self.provider._get_client()
+        batch = client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                body = response.get('body') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    error = entry.get('error') or body.get('error') or f"status {response.get('status_code')}"
+                    yield BatchResult(entry['custom_id'], None, str(error), {})
+                    continue
+                usage = body.get('usage') or {}
+                yield BatchResult(
+                    entry['custom_id'],
+                    body['choices'][0]['message']['content'].strip(),
+                    None,
+                    {
+                        'input_tokens': usage.get('prompt_tokens'),
+                        'output_tokens': usage.get('completion_tokens'),
+                        'cached_input_tokens': (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+                    }
+                )
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API."""
+
+    name = 'anthropic'
+
+    def __init__(self, provider: AnthropicProvider):
+        self.provider = provider
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        batch = self.provider._get_client().messages.batches.create(requests=[
+            {
+                'custom_id': request.custom_id,
+                'params': {
+                    'model': request.model or self.provider.model,
+                    'max_tokens': request.max_tokens,
+                    'temperature': request.temperature,
+                    'messages': [{'role': 'user', 'content': self.provider._content(request.prompt)}]
+                }
+            }
+            for request in requests
+        ])
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.provider._get_client().messages.batches.retrieve(batch_id)
+        return 'ended' if batch.processing_status == 'ended' else 'running'
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        for entry in self.provider._get_client().messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != 'succeeded':
+                error = getattr(result, 'error', None) or result.type
+                yield BatchResult(entry.custom_id, None, str(error), {})
+                continue
+            usage = result.message.usage
+            cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+            cache_write = getattr(usage, 'cache_creation_input_tokens', None) or 0
+            yield BatchResult(
+                entry.custom_id,
+                result.message.content[0].text.strip(),
+                None,
+                {
+                    'input_tokens': usage.input_tokens + cache_read + cache_write,
+                    'output_tokens': usage.output_tokens,
+                    'cached_input_tokens': cache_read
+                }
+            )
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Stand-in batch API that answers every request when it is submitted.
+
+    Results are written to LOCAL_BATCH_DIR, so a pipeline that restarts
+    after a crash can still collect batches it submitted before.
+    """
+
+    name = 'local'
+
+    def __init__(self, respond: Callable[[BatchRequest], str], directory: str = LOCAL_BATCH_DIR):
+        """
+        Args:
+            respond: Function returning the response text for a request
+            directory: Where submitted batches are kept
+        """
+        self.respond = respond
+        self.directory = directory
+
+    def _path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.jsonl")
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        batch_id = f"local-{uuid.uuid4().hex}"
+        temporary = f"{self._path(batch_id)}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            for request in requests:
+                try:
+                    entry = {'custom_id': request.custom_id, 'text': self.respond(request)}
+                except Exception as e:
+                    entry = {'custom_id': request.custom_id, 'error': str(e)}
+                f.write(json.dumps(entry) + '\n')
+        os.replace(temporary, self._path(batch_id))
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return 'ended' if os.path.exists(self._path(batch_id)) else 'failed'
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        with open(self._path(batch_id), 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                yield BatchResult(entry['custom_id'], entry.get('text'), entry.get('error'), {})
+
+def get_batch_backend(name: str = 'auto', respond: Optional[Callable[[BatchRequest], str]] = None) -> BatchBackend:
+    """
+    Get a batch backend by name.
+
+    Args:
+        name: 'openai', 'anthropic', 'local', or 'auto' for the batch API of
+            the provider that would serve the next request
+        respond: Response function for the 'local' stand-in
+
+    Raises:
+        ValueError: If the backend is unknown, not configured, or the
+            provider has no batch API
+    """
+    if name == 'local':
+        if respond is None:
+            raise ValueError("The local batch backend needs a response function")
+        return LocalBatchBackend(respond)
+
+    if name == 'auto':
+        name, _ = llm_handler.select_provider()
+
+    provider = llm_handler.providers.get(name)
+    if isinstance(provider, OpenAIProvider) and provider.is_available():
+        return OpenAIBatchBackend(provider)
+    if isinstance(provider, AnthropicProvider) and provider.is_available():
+        return AnthropicBatchBackend(provider)
+    raise ValueError(f"No batch API available for provider '{name}'")
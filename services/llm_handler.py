@@ -1,29 +1,105 @@
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import importlib.util
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from abc import ABC, abstractmethod
-import openai
-from openai import OpenAI
-import anthropic
-import requests
+
+from utils.prompt_templates import prompt_segments
+from services.llm_preflight import (
+    PROMPT_OVERHEAD_TOKENS,
+    PromptTooLargeError,
+    context_window,
+    current_client,
+    estimate_tokens,
+    plan_request,
+    token_ledger,
+    truncate_to_tokens
+)
+
+# Provider SDKs (openai, anthropic, requests) are imported lazily on first use
+# so that importing this module, and booting workers, stays fast.
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Mark the shared leading segments of prompts as cacheable for providers that
+# need explicit cache breakpoints (Anthropic); OpenAI caches prefixes itself
+PROMPT_CACHING = os.getenv('LLM_PROMPT_CACHING', 'true').lower() in ('true', '1', 'yes')
+
+# Model tiers: 'fast' is each provider's small, cheap model (OPENAI_FAST_MODEL
+# etc.) and 'large' its main model (OPENAI_MODEL etc.)
+MODEL_TIERS = ('fast', 'large')
+DEFAULT_TASK_TIERS = 'skills_extraction=fast,skill_gap=fast,job_profiling=fast,job_matching=large,resume_improvement=large'
+# Prompts longer than this go to the large model even for fast-tier tasks
+FAST_MAX_INPUT_TOKENS = int(os.getenv('LLM_FAST_MAX_INPUT_TOKENS', '6000'))
+
+def parse_task_tiers(spec: str) -> Dict[str, str]:
+    """Parse 'task=tier,...' into a task to tier mapping."""
+    tiers = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        task, _, tier = item.partition('=')
+        tier = tier.strip().lower()
+        if tier not in MODEL_TIERS:
+            raise ValueError(f"Invalid model tier '{tier}' for task '{task.strip()}'. Use one of: {', '.join(MODEL_TIERS)}")
+        tiers[task.strip()] = tier
+    return tiers
+
+# Tier each task is routed to first; unlisted tasks use the large model
+TASK_TIERS = parse_task_tiers(os.getenv('LLM_TASK_TIERS', DEFAULT_TASK_TIERS))
+
+@lru_cache(maxsize=None)
+def sdk_installed(module_name: str) -> bool:
+    """Check whether a provider SDK can be imported, without importing it."""
+    return importlib.util.find_spec(module_name) is not None
+
+def record_usage(usage: Optional[Dict[str, Any]], input_tokens: Optional[int],
+                 output_tokens: Optional[int], cached_input_tokens: Optional[int] = None) -> None:
+    """
+    Fill a caller-supplied usage dictionary with provider token counts.
+    
+    input_tokens is the whole prompt, including the cached_input_tokens read
+    from the provider's prompt cache.
+    """
+    if usage is None:
+        return
+    usage['input_tokens'] = input_tokens
+    usage['output_tokens'] = output_tokens
+    usage['cached_input_tokens'] = cached_input_tokens
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    model: str
+    fast_model: Optional[str] = None
+    
     @abstractmethod
     async def generate_response(self, prompt: str, **kwargs) -> str:
-        """Generate response from the LLM."""
+        """
+        Generate response from the LLM.
+        
+        A 'model' keyword overrides the provider's main model. If a 'usage'
+        dictionary is passed in kwargs, it is filled with the 'input_tokens',
+        'output_tokens' and 'cached_input_tokens' reported by the provider.
+        """
         pass
     
+    def model_for(self, tier: Optional[str]) -> str:
+        """Get the model serving a tier; the main model unless a fast model is configured."""
+        if tier == 'fast' and self.fast_model:
+            return self.fast_model
+        return self.model
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the provider is available and configured."""
         pass
+    
+    def warm_up(self) -> None:
+        """Import the provider SDK and create its client ahead of the first request."""
+        pass
 
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT-4 provider implementation."""
@@ -31,30 +107,52 @@ class OpenAIProvider(LLMProvider):
     def __init__(self):
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.model = os.getenv('OPENAI_MODEL', 'gpt-4')
+        self.fast_model = os.getenv('OPENAI_FAST_MODEL', 'gpt-4o-mini')
         self.client = None
-        
-        if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
     
     def is_available(self) -> bool:
-        return bool(self.api_key and self.client)
+        return bool(self.api_key) and sdk_installed('openai')
+    
+    def _get_client(self):
+        """Create the OpenAI client on first use."""
+        if self.client is None:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=self.api_key)
+        return self.client
+    
+    def warm_up(self) -> None:
+        self._get_client()
+    
+    @staticmethod
+    def messages(prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for a prompt."""
+        return [
+            {"role": "system", "content": "You are an expert resume and job matching analyst."},
+            {"role": "user", "content": prompt}
+        ]
     
     async def generate_response(self, prompt: str, **kwargs) -> str:
         if not self.is_available():
             raise Exception("OpenAI API key not configured")
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert resume and job matching analyst."},
-                    {"role": "user", "content": prompt}
-                ],
+            response = self._get_client().chat.completions.create(
+                model=kwargs.get('model') or self.model,
+                messages=self.messages(prompt),
                 max_tokens=kwargs.get('max_tokens', 2000),
                 temperature=kwargs.get('temperature', 0.3),
                 top_p=kwargs.get('top_p', 0.9)
             )
             
+            # Prompts of 1024+ tokens are prefix-cached automatically
+            details = getattr(response.usage, 'prompt_tokens_details', None)
+            record_usage(
+                kwargs.get('usage'),
+                getattr(response.usage, 'prompt_tokens', None),
+                getattr(response.usage, 'completion_tokens', None),
+                getattr(details, 'cached_tokens', None)
+            )
+            
             return response.choices[0].message.content.strip()
             
         except Exception as e:
@@ -67,28 +165,60 @@ class AnthropicProvider(LLMProvider):
     def __init__(self):
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
         self.model = os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
+        self.fast_model = os.getenv('ANTHROPIC_FAST_MODEL', 'claude-3-haiku-20240307')
         self.client = None
-        
-        if self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
     
     def is_available(self) -> bool:
-        return bool(self.api_key and self.client)
+        return bool(self.api_key) and sdk_installed('anthropic')
+    
+    def _get_client(self):
+        """Create the Anthropic client on first use."""
+        if self.client is None:
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=self.api_key)
+        return self.client
+    
+    def warm_up(self) -> None:
+        self._get_client()
+    
+    @staticmethod
+    def _content(prompt: str):
+        """Split a prompt into text blocks with a cache breakpoint after each shared segment."""
+        segments = [segment for segment in prompt_segments(prompt) if segment]
+        if not PROMPT_CACHING or len(segments) < 2:
+            return prompt
+        blocks = [
+            {"type": "text", "text": segment, "cache_control": {"type": "ephemeral"}}
+            for segment in segments[:-1]
+        ]
+        blocks.append({"type": "text", "text": segments[-1]})
+        return blocks
     
     async def generate_response(self, prompt: str, **kwargs) -> str:
         if not self.is_available():
             raise Exception("Anthropic API key not configured")
         
         try:
-            response = self.client.messages.create(
-                model=self.model,
+            response = self._get_client().messages.create(
+                model=kwargs.get('model') or self.model,
                 max_tokens=kwargs.get('max_tokens', 2000),
                 temperature=kwargs.get('temperature', 0.3),
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": self._content(prompt)}
                 ]
             )
             
+            # input_tokens excludes tokens read from or written to the cache
+            cache_read = getattr(response.usage, 'cache_read_input_tokens', None) or 0
+            cache_write = getattr(response.usage, 'cache_creation_input_tokens', None) or 0
+            input_tokens = getattr(response.usage, 'input_tokens', None)
+            record_usage(
+                kwargs.get('usage'),
+                input_tokens + cache_read + cache_write if input_tokens is not None else None,
+                getattr(response.usage, 'output_tokens', None),
+                cache_read
+            )
+            
             return response.content[0].text.strip()
             
         except Exception as e:
@@ -101,23 +231,29 @@ class MistralProvider(LLMProvider):
     def __init__(self):
         self.api_key = os.getenv('MISTRAL_API_KEY')
         self.model = os.getenv('MISTRAL_MODEL', 'mistral-large-latest')
+        self.fast_model = os.getenv('MISTRAL_FAST_MODEL', 'mistral-small-latest')
         self.base_url = "https://api.mistral.ai/v1"
     
     def is_available(self) -> bool:
-        return bool(self.api_key)
+        return bool(self.api_key) and sdk_installed('requests')
+    
+    def warm_up(self) -> None:
+        import requests  # noqa: F401
     
     async def generate_response(self, prompt: str, **kwargs) -> str:
         if not self.is_available():
             raise Exception("Mistral API key not configured")
         
         try:
+            import requests
+            
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
             }
             
             data = {
-                "model": self.model,
+                "model": kwargs.get('model') or self.model,
                 "messages": [
                     {"role": "user", "content": prompt}
                 ],
@@ -136,6 +272,9 @@ class MistralProvider(LLMProvider):
                 raise Exception(f"Mistral API error: {response.status_code} - {response.text}")
             
             result = response.json()
+            usage = result.get('usage') or {}
+            record_usage(kwargs.get('usage'), usage.get('prompt_tokens'), usage.get('completion_tokens'))
+            
             return result['choices'][0]['message']['content'].strip()
             
         except Exception as e:
@@ -160,38 +299,194 @@ class LLMHandler:
     
     def get_available_provider(self) -> LLMProvider:
         """Get the first available provider in order of preference."""
+        name, provider = self.select_provider()
+        self._log_provider(name)
+        return provider
+    
+    def _log_provider(self, name: str) -> None:
+        if name == self.preferred_provider:
+            logger.info(f"Using preferred LLM provider: {name}")
+        else:
+            logger.info(f"Using fallback LLM provider: {name}")
+    
+    def select_provider(self) -> Tuple[str, LLMProvider]:
+        """Get the name and instance of the first available provider in order of preference."""
         
         # Try preferred provider first
         if self.preferred_provider in self.providers:
             provider = self.providers[self.preferred_provider]
             if provider.is_available():
-                logger.info(f"Using preferred LLM provider: {self.preferred_provider}")
-                return provider
+                return self.preferred_provider, provider
         
         # Try fallback providers
         for provider_name in self.fallback_order:
             if provider_name in self.providers:
                 provider = self.providers[provider_name]
                 if provider.is_available():
-                    logger.info(f"Using fallback LLM provider: {provider_name}")
-                    return provider
+                    return provider_name, provider
         
         raise Exception("No LLM provider is available. Please configure at least one API key.")
     
+    def task_tier(self, task: Optional[str]) -> str:
+        """Get the model tier a task is routed to first (LLM_TASK_TIERS)."""
+        return TASK_TIERS.get(task, 'large')
+    
+    def get_active_model(self, task: Optional[str] = None) -> str:
+        """
+        Identify the provider and model that would serve the next request
+        for a task.
+        
+        Returns:
+            String like 'openai:gpt-4', or an empty string if none is available
+        """
+        for name in [self.preferred_provider] + self.fallback_order:
+            provider = self.providers.get(name)
+            if provider is not None and provider.is_available():
+                return f"{name}:{provider.model_for(self.task_tier(task))}"
+        return ''
+    
+    def task_models(self, task: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        Get the provider that would serve a task and the models it may be
+        served by: its tier's model and, on escalation, the large model.
+        """
+        name, provider = self.select_provider()
+        return name, sorted({provider.model_for(self.task_tier(task)), provider.model})
+    
+    def estimate_tokens(self, text: str, task: Optional[str] = None) -> int:
+        """Estimate tokens in text for the models that may serve a task, taking the largest estimate."""
+        name, models = self.task_models(task)
+        return max(estimate_tokens(text, name, model) for model in models)
+    
+    def truncate_to_tokens(self, text: str, max_tokens: int, task: Optional[str] = None) -> str:
+        """Cut text to about max_tokens tokens in every model that may serve a task."""
+        name, models = self.task_models(task)
+        # Cutting for the model whose tokenizer counts the most fits the others too
+        model = max(models, key=lambda model: estimate_tokens(text, name, model))
+        return truncate_to_tokens(text, max_tokens, name, model)
+    
+    def input_capacity(self, max_tokens: int, task: Optional[str] = None) -> int:
+        """
+        Get the prompt tokens that fit alongside max_tokens of output in every
+        model a task may be served by.
+        """
+        _, models = self.task_models(task)
+        return min(context_window(model) for model in models) - max_tokens - PROMPT_OVERHEAD_TOKENS
+    
+    def _plan(self, prompt: str, name: str, provider: LLMProvider, tier: str,
+              max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """Choose the model for a tier and plan the request; long prompts go to the large model."""
+        model = provider.model_for(tier)
+        if model != provider.model:
+            try:
+                plan = plan_request(prompt, name, model, max_tokens)
+                if plan['input_tokens'] <= FAST_MAX_INPUT_TOKENS:
+                    return model, plan
+            except PromptTooLargeError:
+                pass
+            logger.info(f"Prompt too long for the fast model {model}; using {provider.model}")
+        return provider.model, plan_request(prompt, name, provider.model, max_tokens)
+    
+    def route(self, prompt: str, task: Optional[str] = None, max_tokens: int = 2000,
+              provider_name: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Choose the model a task's prompt would be sent to and plan the request,
+        as generate_response() does: the task's tier (LLM_TASK_TIERS), with
+        prompts too long for the fast model sent to the large one.
+        
+        Args:
+            prompt: Prompt text
+            task: Task name, e.g. 'job_matching'
+            max_tokens: Output budget
+            provider_name: Provider to route within; the one that would serve
+                the next request if omitted
+        
+        Returns:
+            Tuple of (model, plan from plan_request())
+        
+        Raises:
+            PromptTooLargeError: If the prompt cannot fit the context window
+        """
+        if provider_name is None:
+            name, provider = self.select_provider()
+        else:
+            name, provider = provider_name, self.providers[provider_name]
+        return self._plan(prompt, name, provider, self.task_tier(task), max_tokens)
+    
     async def generate_response(self, prompt: str, **kwargs) -> str:
-        """Generate response using the best available provider."""
-        provider = self.get_available_provider()
-        return await provider.generate_response(prompt, **kwargs)
+        """
+        Generate response using the best available provider.
+        
+        Before any network call the prompt is checked against the model's
+        context window (shrinking max_tokens if needed) and its tokens are
+        reserved against the current client's quotas. A 'task' keyword is
+        recorded in the token ledger and selects the model tier
+        (LLM_TASK_TIERS) unless a 'tier' keyword is given. The model used is
+        recorded in the usage dictionary under 'model' and 'tier'.
+        
+        Raises:
+            PromptTooLargeError: If the prompt cannot fit the context window
+            QuotaExceededError: If the client is over a token quota
+        """
+        name, provider = self.select_provider()
+        self._log_provider(name)
+        task = kwargs.pop('task', None)
+        tier = kwargs.pop('tier', None) or self.task_tier(task)
+        model, plan = self._plan(prompt, name, provider, tier, kwargs.get('max_tokens', 2000))
+        kwargs['max_tokens'] = plan['max_tokens']
+        kwargs['model'] = model
+        
+        entry_id = token_ledger.reserve(
+            current_client(), name, model, task, plan['input_tokens'], plan['max_tokens']
+        )
+        
+        usage = kwargs.get('usage')
+        if usage is None:
+            usage = kwargs['usage'] = {}
+        usage['estimated_input_tokens'] = plan['input_tokens']
+        usage['model'] = model
+        usage['tier'] = 'large' if model == provider.model else 'fast'
+        
+        try:
+            response = await provider.generate_response(prompt, **kwargs)
+        except Exception:
+            token_ledger.settle(entry_id, usage, succeeded=False)
+            raise
+        token_ledger.settle(entry_id, usage, succeeded=True)
+        return response
+    
+    def warm_up(self) -> List[str]:
+        """
+        Import the SDKs and create clients for all configured providers.
+        
+        Called from the gunicorn master when preloading so that forked
+        workers inherit ready clients instead of importing SDKs on their
+        first request.
+        
+        Returns:
+            Names of the providers that were warmed
+        """
+        warmed = []
+        for name, provider in self.providers.items():
+            if provider.is_available():
+                provider.warm_up()
+                warmed.append(name)
+        return warmed
     
     def get_provider_info(self) -> Dict[str, Any]:
         """Get information about available providers."""
         info = {
             'preferred_provider': self.preferred_provider,
             'available_providers': [],
-            'configured_providers': []
+            'configured_providers': [],
+            'models': {},
+            'fast_models': {},
+            'task_tiers': dict(TASK_TIERS)
         }
         
         for name, provider in self.providers.items():
+            info['models'][name] = provider.model
+            info['fast_models'][name] = provider.model_for('fast')
             if provider.is_available():
                 info['available_providers'].append(name)
             if hasattr(provider, 'api_key') and provider.api_key:
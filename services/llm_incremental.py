@@ -0,0 +1,151 @@
+"""
+Incremental re-analysis of edited resumes.
+
+LLM analyses of a resume against a job are stored with the fingerprints of
+the resume sections they were computed from, and indexed by each section
+fingerprint. When an edited resume is analyzed against the same job, the
+stored analysis sharing the most sections is found and only the sections
+whose content changed are sent back to the model; its answer is merged into
+the stored analysis. Storage is content-addressed and shared by all workers
+through the cache backend.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from resume_sections import ResumeDocument, classify_heading, normalize_heading
+from services.llm_handler import llm_handler
+from services.llm_results import result_key
+from utils.cache_backend import get_cache
+from utils.prompt_templates import PromptTemplates
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SECTION_CACHE_SIZE = int(os.getenv('LLM_SECTION_CACHE_SIZE', '2048'))
+# Iteration sessions on a resume can span hours
+SECTION_CACHE_TTL = float(os.getenv('LLM_SECTION_CACHE_TTL', '86400'))
+# Re-analyze the whole resume when more than this share of its sections changed
+MAX_CHANGED_RATIO = float(os.getenv('LLM_INCREMENTAL_MAX_CHANGED', '0.5'))
+
+_analysis_cache = get_cache('llm_section_analyses', SECTION_CACHE_SIZE, SECTION_CACHE_TTL)
+
+def section_name(label: str) -> str:
+    """Map a section label written by the model, e.g. 'Work Experience', to a section name."""
+    return classify_heading(label) or normalize_heading(label)
+
+class Reanalysis:
+    """
+    What an analysis of a resume against a job has to recompute.
+
+    mode is 'full' (no usable previous analysis, or too much changed),
+    'incremental' (send only the changed sections) or 'cached' (nothing
+    the task reads has changed).
+    """
+
+    def __init__(self, task: str, document: ResumeDocument, job_description: str, detail: str):
+        self.task = task
+        self.document = document
+        self.scope = result_key(task, job_description, detail, llm_handler.get_active_model(task))
+        self.fingerprints = document.fingerprints(PromptTemplates.TASK_SECTIONS[task])
+        self.previous: Optional[Dict[str, Any]] = None
+        self.changed: List[str] = list(self.fingerprints)
+        self.removed: List[str] = []
+        self.mode = 'full'
+
+        record = self._find_previous()
+        if record is None:
+            return
+        previous_fingerprints = record['fingerprints']
+        changed = [name for name, value in self.fingerprints.items() if previous_fingerprints.get(name) != value]
+        removed = [name for name in previous_fingerprints if name not in self.fingerprints]
+        if not changed and not removed:
+            self.previous, self.changed, self.mode = record['result'], [], 'cached'
+        elif (len(changed) + len(removed)) / len(self.fingerprints) <= MAX_CHANGED_RATIO:
+            self.previous, self.changed, self.removed, self.mode = record['result'], changed, removed, 'incremental'
+
+    def _record_key(self, fingerprints: Dict[str, str]) -> str:
+        digest = hashlib.sha256(json.dumps(fingerprints, sort_keys=True).encode('utf-8')).hexdigest()
+        return f"{self.scope}:{digest}"
+
+    def _find_previous(self) -> Optional[Dict[str, Any]]:
+        """Find the stored analysis for this job sharing the most sections with the resume."""
+        if not self.fingerprints:
+            return None
+        record = _analysis_cache.get(self._record_key(self.fingerprints))
+        if record is not None:
+            return record
+
+        votes = Counter()
+        for name, value in self.fingerprints.items():
+            key = _analysis_cache.get(f"{self.scope}:{name}:{value}")
+            if key is not None:
+                votes[key] += 1
+        for key, _ in votes.most_common():
+            record = _analysis_cache.get(key)
+            if record is not None:
+                return record
+        return None
+
+    @property
+    def edited(self) -> Dict[str, str]:
+        """Text of the changed sections."""
+        return {name: self.document.sections[name] for name in self.changed}
+
+    def store(self, result: Dict[str, Any]) -> None:
+        """Store an analysis of the current resume for later edits to build on."""
+        if not self.fingerprints:
+            return
+        key = self._record_key(self.fingerprints)
+        _analysis_cache.set(key, {'fingerprints': self.fingerprints, 'result': result})
+        for name, value in self.fingerprints.items():
+            _analysis_cache.set(f"{self.scope}:{name}:{value}", key)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'reanalyzed_sections': list(self.changed),
+            'reused_sections': [name for name in self.fingerprints if name not in self.changed],
+            'removed_sections': list(self.removed)
+        }
+
+def unchanged_improvement(previous: Dict[str, Any], reanalysis: Reanalysis) -> Dict[str, Any]:
+    """Previous resume improvement analysis reduced to the context an update prompt needs."""
+    stale = set(reanalysis.changed) | set(reanalysis.removed)
+    context = {key: value for key, value in previous.items() if key != 'section_analysis'}
+    context['section_analysis'] = [
+        {key: value for key, value in item.items() if key != 'rewritten_content'}
+        for item in previous.get('section_analysis', [])
+        if section_name(item.get('section', '')) not in stale
+    ]
+    return context
+
+def merge_resume_improvement(previous: Dict[str, Any], update: Dict[str, Any],
+                             reanalysis: Reanalysis) -> Dict[str, Any]:
+    """Replace the section analyses of changed sections and take the whole-resume fields from the update."""
+    stale = set(reanalysis.changed) | set(reanalysis.removed)
+    order = {name: i for i, name in enumerate(reanalysis.fingerprints)}
+    sections = [
+        item for item in previous.get('section_analysis', [])
+        if section_name(item.get('section', '')) not in stale
+    ] + update.get('section_analysis', [])
+    sections.sort(key=lambda item: order.get(section_name(item.get('section', '')), len(order)))
+    return {**previous, **update, 'section_analysis': sections}
+
+def merge_skill_gap(previous: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop resolved missing skills, add newly missing ones and take the whole-resume fields from the update."""
+    resolved = {skill.lower() for skill in update.get('resolved_skills', [])}
+    missing = [item for item in previous.get('missing_skills', []) if item.get('skill', '').lower() not in resolved]
+    seen = {item.get('skill', '').lower() for item in missing}
+    missing += [item for item in update.get('missing_skills', []) if item.get('skill', '').lower() not in seen]
+
+    merged = dict(previous)
+    for field in ('experience_gaps', 'overall_assessment', 'priority_improvements', 'confidence'):
+        if field in update:
+            merged[field] = update[field]
+    merged['missing_skills'] = missing
+    return merged
@@ -0,0 +1,358 @@
+"""
+Pre-flight checks and token accounting for LLM requests.
+
+Before any network call, LLMHandler estimates the prompt size for the chosen
+provider and model, shrinks the output budget or rejects prompts that cannot
+fit the model's context window, and reserves the estimated tokens against the
+calling client's sliding-window quotas. Every request is recorded in a SQLite
+ledger shared by all workers and settled with the provider's reported usage.
+"""
+
+import contextvars
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Context windows by model name prefix; the longest matching prefix wins
+CONTEXT_WINDOWS = {
+    'gpt-4o': 128000,
+    'gpt-4-turbo': 128000,
+    'gpt-4-1106': 128000,
+    'gpt-4-0125': 128000,
+    'gpt-4-32k': 32768,
+    'gpt-4': 8192,
+    'gpt-3.5-turbo': 16385,
+    'claude-3': 200000,
+    'claude': 100000,
+    'mistral-large': 128000,
+    'mistral-medium': 32000,
+    'mistral-small': 32000,
+    'open-mistral': 32000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+# Overrides the table above for every model when set
+CONTEXT_WINDOW_OVERRIDE = int(os.getenv('LLM_CONTEXT_WINDOW', '0'))
+
+# Average characters per token, used when no tokenizer is installed
+CHARS_PER_TOKEN = {'openai': 4.0, 'anthropic': 3.5, 'mistral': 3.5}
+# Tokens for the system prompt and message framing around the prompt
+PROMPT_OVERHEAD_TOKENS = 20
+# Smallest output budget worth sending a request for
+MIN_OUTPUT_TOKENS = int(os.getenv('LLM_MIN_OUTPUT_TOKENS', '256'))
+
+# Sliding-window quotas per client as "seconds:tokens" pairs, e.g.
+# "60:20000,86400:200000"; empty disables quotas (usage is still recorded)
+CLIENT_TOKEN_QUOTAS = os.getenv('LLM_CLIENT_TOKEN_QUOTAS', '')
+QUOTA_DB = os.getenv('LLM_QUOTA_DB', os.getenv('CACHE_DB', 'skillsnap_cache.db'))
+# Ledger rows older than this are pruned
+USAGE_RETENTION_SECONDS = int(os.getenv('LLM_USAGE_RETENTION_SECONDS', str(7 * 24 * 3600)))
+PRUNE_INTERVAL_SECONDS = 300
+
+ANONYMOUS_CLIENT = 'anonymous'
+
+class LLMPreflightError(Exception):
+    """Base exception for requests refused before reaching a provider."""
+    pass
+
+class PromptTooLargeError(LLMPreflightError):
+    """The prompt cannot fit the model's context window."""
+
+    def __init__(self, input_tokens: int, context_window: int):
+        self.input_tokens = input_tokens
+        self.context_window = context_window
+        super().__init__(
+            f"Prompt is too large: about {input_tokens} tokens, the model accepts "
+            f"{context_window} including at least {MIN_OUTPUT_TOKENS} output tokens"
+        )
+
+class QuotaExceededError(LLMPreflightError):
+    """The client has used up its token quota for a window."""
+
+    def __init__(self, window: int, limit: int, retry_after: int):
+        self.window = window
+        self.limit = limit
+        self.retry_after = retry_after
+        super().__init__(
+            f"Token quota of {limit} tokens per {window}s exceeded; retry in {retry_after}s"
+        )
+
+def parse_quotas(spec: str) -> List[Tuple[int, int]]:
+    """Parse "seconds:tokens,..." into (window seconds, token limit) pairs."""
+    quotas = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        window, limit = part.split(':')
+        quotas.append((int(window), int(limit)))
+    return quotas
+
+def context_window(model: str) -> int:
+    """Get the context window of a model, in tokens."""
+    if CONTEXT_WINDOW_OVERRIDE:
+        return CONTEXT_WINDOW_OVERRIDE
+    matches = [prefix for prefix in CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return CONTEXT_WINDOWS[max(matches, key=len)]
+
+@lru_cache(maxsize=16)
+def _openai_encoding(model: str):
+    """Load the tiktoken encoding for an OpenAI model, if tiktoken is installed."""
+    try:
+        import tiktoken
+    except ImportError:  # tiktoken is optional; the heuristic is used instead
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+def estimate_tokens(text: str, provider: str, model: str) -> int:
+    """
+    Estimate the number of tokens in text for a provider and model.
+
+    Uses tiktoken for OpenAI models when it is installed; otherwise a
+    conservative estimate from character and word counts.
+    """
+    if provider == 'openai':
+        encoding = _openai_encoding(model)
+        if encoding is not None:
+            return len(encoding.encode(text))
+
+    chars_per_token = CHARS_PER_TOKEN.get(provider, 3.5)
+    return math.ceil(max(len(text) / chars_per_token, len(text.split()) * 1.3))
+
+def truncate_to_tokens(text: str, max_tokens: int, provider: str, model: str) -> str:
+    """Cut text at a line or word boundary so it fits in about max_tokens tokens."""
+    tokens = estimate_tokens(text, provider, model)
+    if tokens <= max_tokens:
+        return text
+
+    cut = text[:max(int(len(text) * max_tokens / tokens), 0)]
+    boundary = max(cut.rfind('\n'), cut.rfind(' '))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip()
+
+def plan_request(prompt: str, provider: str, model: str, max_tokens: int) -> Dict[str, int]:
+    """
+    Check that a prompt fits the model, shrinking the output budget if needed.
+
+    Returns:
+        Dictionary with 'input_tokens', 'max_tokens' and 'context_window'
+
+    Raises:
+        PromptTooLargeError: If the prompt leaves less than MIN_OUTPUT_TOKENS
+    """
+    window = context_window(model)
+    input_tokens = estimate_tokens(prompt, provider, model) + PROMPT_OVERHEAD_TOKENS
+    available = window - input_tokens
+    if available < min(MIN_OUTPUT_TOKENS, max_tokens):
+        raise PromptTooLargeError(input_tokens, window)
+
+    if max_tokens > available:
+        logger.info(f"Reduced max_tokens from {max_tokens} to {available} to fit the {window}-token context")
+        max_tokens = available
+    return {'input_tokens': input_tokens, 'max_tokens': max_tokens, 'context_window': window}
+
+_client_id: contextvars.ContextVar = contextvars.ContextVar('llm_client_id', default=ANONYMOUS_CLIENT)
+
+def current_client() -> str:
+    """Get the client that LLM requests are currently charged to."""
+    return _client_id.get()
+
+def set_client(client_id: Optional[str]) -> contextvars.Token:
+    """Charge subsequent LLM requests in this context to a client; returns a token for reset_client()."""
+    return _client_id.set(client_id or ANONYMOUS_CLIENT)
+
+def reset_client(token: contextvars.Token) -> None:
+    """Restore the client that was current before set_client()."""
+    _client_id.reset(token)
+
+@contextmanager
+def client_context(client_id: Optional[str]) -> Iterator[None]:
+    """Charge LLM requests made inside the block to a client."""
+    token = set_client(client_id)
+    try:
+        yield
+    finally:
+        reset_client(token)
+
+LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_ledger (
+    id INTEGER PRIMARY KEY,
+    client TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    task TEXT,
+    estimated_input_tokens INTEGER NOT NULL,
+    max_output_tokens INTEGER NOT NULL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cached_input_tokens INTEGER,
+    charged_tokens INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS token_ledger_client ON token_ledger(client, created_at);
+"""
+
+class TokenLedger:
+    """Per-request token accounting and sliding-window quotas, shared across workers."""
+
+    def __init__(self, db_path: str = QUOTA_DB, quotas: Optional[List[Tuple[int, int]]] = None):
+        self.db_path = db_path
+        self.quotas = parse_quotas(CLIENT_TOKEN_QUOTAS) if quotas is None else quotas
+        self._local = threading.local()
+        self._last_prune = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get a connection for the current thread and process."""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            # Connections must not cross a fork, so reconnect in each worker
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(LEDGER_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(token_ledger)")}
+            if 'cached_input_tokens' not in columns:
+                # Ledgers created before prompt caching was reported
+                try:
+                    conn.execute("ALTER TABLE token_ledger ADD COLUMN cached_input_tokens INTEGER")
+                except sqlite3.OperationalError:
+                    pass  # Another worker added it first
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    @staticmethod
+    def _used(conn: sqlite3.Connection, client: str, since: float) -> int:
+        return conn.execute(
+            "SELECT COALESCE(SUM(charged_tokens), 0) FROM token_ledger WHERE client = ? AND created_at > ?",
+            (client, since)
+        ).fetchone()[0]
+
+    def _retry_after(self, conn: sqlite3.Connection, client: str, window: int, limit: int,
+                     requested: int, now: float) -> int:
+        """Seconds until enough of the window's usage expires to admit the request."""
+        if requested > limit:
+            return window
+
+        used = self._used(conn, client, now - window)
+        rows = conn.execute(
+            "SELECT created_at, charged_tokens FROM token_ledger "
+            "WHERE client = ? AND created_at > ? ORDER BY created_at",
+            (client, now - window)
+        )
+        for created_at, charged in rows:
+            used -= charged
+            if used + requested <= limit:
+                return max(math.ceil(created_at + window - now), 1)
+        return window
+
+    def reserve(self, client: str, provider: str, model: str, task: Optional[str],
+                input_tokens: int, max_output_tokens: int) -> int:
+        """
+        Check the client's quotas and record a pending request.
+
+        The estimated input plus the full output budget is charged until the
+        request is settled with the provider's reported usage.
+
+        Returns:
+            Ledger entry id
+
+        Raises:
+            QuotaExceededError: If the request would exceed any quota window
+        """
+        conn = self._connection()
+        now = time.time()
+        requested = input_tokens + max_output_tokens
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for window, limit in self.quotas:
+                if self._used(conn, client, now - window) + requested > limit:
+                    retry_after = self._retry_after(conn, client, window, limit, requested, now)
+                    raise QuotaExceededError(window, limit, retry_after)
+
+            cursor = conn.execute(
+                "INSERT INTO token_ledger(client, created_at, provider, model, task, "
+                "estimated_input_tokens, max_output_tokens, charged_tokens, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')",
+                (client, now, provider, model, task, input_tokens, max_output_tokens, requested)
+            )
+            entry_id = cursor.lastrowid
+
+            if now - self._last_prune > PRUNE_INTERVAL_SECONDS:
+                conn.execute("DELETE FROM token_ledger WHERE created_at < ?", (now - USAGE_RETENTION_SECONDS,))
+                self._last_prune = now
+        return entry_id
+
+    def settle(self, entry_id: int, usage: Optional[Dict[str, Any]], succeeded: bool) -> None:
+        """
+        Replace a reservation with actual usage. Failed requests are not
+        charged; successful ones without reported usage keep the estimate for
+        input and the full output budget.
+        """
+        usage = usage or {}
+        input_tokens = usage.get('input_tokens')
+        output_tokens = usage.get('output_tokens')
+        try:
+            if succeeded:
+                self._connection().execute(
+                    "UPDATE token_ledger SET input_tokens = ?, output_tokens = ?, cached_input_tokens = ?, "
+                    "status = 'ok', "
+                    "charged_tokens = COALESCE(?, estimated_input_tokens) + COALESCE(?, max_output_tokens) "
+                    "WHERE id = ?",
+                    (input_tokens, output_tokens, usage.get('cached_input_tokens'),
+                     input_tokens, output_tokens, entry_id)
+                )
+            else:
+                self._connection().execute(
+                    "UPDATE token_ledger SET status = 'failed', charged_tokens = 0 WHERE id = ?",
+                    (entry_id,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to settle token ledger entry {entry_id}: {str(e)}")
+
+    def client_usage(self, client: str, recent: int = 10) -> Dict[str, Any]:
+        """Get a client's usage in each quota window and its most recent requests."""
+        conn = self._connection()
+        now = time.time()
+        windows = []
+        for window, limit in self.quotas:
+            used = self._used(conn, client, now - window)
+            windows.append({
+                'window_seconds': window,
+                'limit': limit,
+                'used': used,
+                'remaining': max(limit - used, 0)
+            })
+
+        columns = ['created_at', 'provider', 'model', 'task', 'estimated_input_tokens',
+                   'max_output_tokens', 'input_tokens', 'output_tokens', 'cached_input_tokens',
+                   'charged_tokens', 'status']
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM token_ledger WHERE client = ? ORDER BY id DESC LIMIT ?",
+            (client, recent)
+        ).fetchall()
+        return {
+            'client': client,
+            'quotas': windows,
+            'recent_requests': [dict(zip(columns, row)) for row in rows]
+        }
+
+# Global token ledger instance
+token_ledger = TokenLedger()
@@ -0,0 +1,176 @@
+"""
+Deadline-bounded execution and result caching for LLM calls.
+
+LLM calls run on a background thread pool. A request waits for its result
+only until its deadline; if the provider is slower, the caller falls back to
+a local result while the call keeps running and stores its result in the
+shared cache, so a retry of the same request is answered instantly by any
+worker. The pool's backlog is bounded; calls beyond it are shed as Overloaded.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.admission import Overloaded, workload_classes
+from utils.cache_backend import get_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LLM_DEADLINE_SECONDS = float(os.getenv('LLM_DEADLINE_SECONDS', '20'))
+MAX_DEADLINE_SECONDS = float(os.getenv('LLM_MAX_DEADLINE_SECONDS', '120'))
+BACKGROUND_WORKERS = int(os.getenv('LLM_BACKGROUND_WORKERS', '8'))
+# Calls allowed to wait for a background thread; more are shed with a 503
+BACKGROUND_QUEUE = int(os.getenv('LLM_BACKGROUND_QUEUE', '8'))
+RESULT_CACHE_SIZE = int(os.getenv('LLM_RESULT_CACHE_SIZE', '512'))
+RESULT_CACHE_TTL = float(os.getenv('LLM_RESULT_CACHE_TTL', '3600'))
+
+# LLM results are shared across workers through the cache backend
+llm_result_cache = get_cache('llm_results', RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='llm-call')
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def result_key(task: str, *parts: Any) -> str:
+    """Build a cache key from a task name and the inputs that determine its result."""
+    payload = json.dumps([task, *parts], sort_keys=True, separators=(',', ':'), default=str)
+    return f"{task}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def parse_deadline(header_value: Optional[str]) -> float:
+    """
+    Get the deadline for a request, in seconds.
+
+    Args:
+        header_value: Value of the X-Deadline-Ms request header, if any
+
+    Returns:
+        Deadline from the header, or LLM_DEADLINE_SECONDS, capped at
+        LLM_MAX_DEADLINE_SECONDS
+    """
+    deadline = LLM_DEADLINE_SECONDS
+    if header_value:
+        try:
+            deadline = max(float(header_value) / 1000.0, 0.0)
+        except ValueError:
+            raise ValueError("X-Deadline-Ms must be a number of milliseconds")
+    return min(deadline, MAX_DEADLINE_SECONDS)
+
+def _finish(key: str, future: Future) -> None:
+    """Store a finished background result and clear the in-flight entry."""
+    try:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Background LLM call {key} failed: {str(error)}")
+            return
+        # Cache before clearing the in-flight entry so no request sees neither
+        llm_result_cache.set(key, future.result())
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def run_with_deadline(key: str, make_call: Callable[[], Awaitable[Any]],
+                      deadline: float) -> Tuple[Optional[Any], bool]:
+    """
+    Run an LLM call, waiting at most until the deadline.
+
+    Identical concurrent requests share one in-flight call. A call that
+    misses the deadline keeps running and caches its result when done.
+
+    Args:
+        key: Cache key from result_key()
+        make_call: Function returning the coroutine to run
+        deadline: Seconds to wait for the result
+
+    Returns:
+        Tuple of (result or None, whether the result was available in time)
+
+    Raises:
+        Overloaded: If the background pool's queue is full
+        Exception: If the call fails before the deadline
+    """
+    cached = llm_result_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        started = future is None
+        if started:
+            # Calls that missed their deadline keep their threads, so bound the backlog
+            if len(_inflight) >= BACKGROUND_WORKERS + BACKGROUND_QUEUE:
+                raise Overloaded('llm', 'queue_full', workload_classes['llm'].retry_after())
+            # Run in a copy of the caller's context so the LLM client is charged
+            context = contextvars.copy_context()
+            future = _executor.submit(context.run, lambda: asyncio.run(make_call()))
+            _inflight[key] = future
+
+    if started:
+        # Registered outside the lock since it runs inline if already done
+        future.add_done_callback(lambda done: _finish(key, done))
+
+    try:
+        return future.result(timeout=deadline), True
+    except FutureTimeoutError:
+        logger.info(f"LLM call {key} missed its {deadline:.1f}s deadline, continuing in background")
+        return None, False
+
+def background_stats() -> Dict[str, int]:
+    """Get the number of LLM calls running or waiting on the background pool."""
+    with _inflight_lock:
+        inflight = len(_inflight)
+    return {
+        'inflight': inflight,
+        'workers': BACKGROUND_WORKERS,
+        'max_queue': BACKGROUND_QUEUE
+    }
+
+# Summary of local matches served while the LLM call finishes
+DEGRADED_MATCH_SUMMARY = 'Quick keyword-based match; the detailed AI analysis is still running.'
+
+def local_job_matches(recommendations: List[Dict[str, Any]],
+                      summary: str = DEGRADED_MATCH_SUMMARY) -> Dict[str, Any]:
+    """
+    Shape local keyword recommendations like an LLM job matching result,
+    so clients can render either one.
+    """
+    matches = []
+    for job in recommendations:
+        keywords = job.get('matched_keywords', [])
+        matches.append({
+            'job_title': job['title'],
+            'score': round(job['score']),
+            'reasons': [f"Matched keywords: {', '.join(keywords)}"] if keywords else [],
+            'strengths': keywords,
+            'concerns': []
+        })
+    return {
+        'matches': matches,
+        'analysis_summary': summary
+    }
+
+def local_skill_gap(missing_skills: List[str]) -> Dict[str, Any]:
+    """Shape local missing skills like an LLM skill gap result."""
+    return {
+        'missing_skills': [
+            {
+                'skill': skill,
+                'importance': 'medium',
+                'description': 'Mentioned in the job description but not found in your resume.',
+                'improvement_suggestions': []
+            }
+            for skill in sorted(missing_skills)
+        ],
+        'experience_gaps': [],
+        'overall_assessment': 'Quick keyword-based comparison; the detailed AI analysis is still running.',
+        'priority_improvements': sorted(missing_skills)[:3]
+    }
@@ -1,56 +1,331 @@
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import os
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Union
+from job_profiles import JOB_PROFILE_PROMPTS, with_profiles
+from ml_utils import ResumeProfile, get_resume_profile, job_skills
+from resume_sections import ResumeDocument
 from services.llm_handler import llm_handler
+from services.llm_incremental import Reanalysis, merge_resume_improvement, merge_skill_gap, unchanged_improvement
+from services.llm_preflight import LLMPreflightError
 from utils.prompt_templates import PromptTemplates
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Response detail levels; 'compact' uses terser schemas in PromptTemplates
+DETAIL_LEVELS = ('full', 'compact')
+
+# Sampling temperature for job matching, shared with batch scoring
+JOB_MATCHING_TEMPERATURE = 0.2
+
+# Upper bound for any single response
+MAX_OUTPUT_TOKENS = int(os.getenv('LLM_MAX_OUTPUT_TOKENS', '4000'))
+
+# Output token budgets as (fixed tokens, tokens per item) by task and detail.
+# Items are jobs for matching, required skills for skill gap analysis,
+# resume sections for improvement and detected skills for extraction.
+OUTPUT_BUDGETS = {
+    'job_matching': {'full': (150, 220), 'compact': (60, 70)},
+    'skill_gap': {'full': (500, 180), 'compact': (150, 50)},
+    'resume_improvement': {'full': (700, 550), 'compact': (250, 140)},
+    'skills_extraction': {'full': (300, 45), 'compact': (100, 15)},
+    'job_profiling': {'full': (120, 8)}
+}
+
+# Items assumed when the real count is unknown or very small
+MIN_BUDGET_ITEMS = {
+    'job_matching': 1,
+    'skill_gap': 5,
+    'resume_improvement': 4,
+    'skills_extraction': 10,
+    'job_profiling': 10
+}
+
+# Fields every response of a task must have, and their types; lists are
+# given as (list, item type). Responses that do not match are errors, or
+# escalated when served by the fast model.
+RESPONSE_SCHEMAS = {
+    'job_matching': {'matches': (list, dict)},
+    'skill_gap': {'missing_skills': (list, dict)},
+    'resume_improvement': {'section_analysis': (list, dict)},
+    'skills_extraction': {'technical_skills': (list, dict)},
+    'job_profiling': {'skills': (list, str), 'seniority': str, 'domain': str, 'responsibilities': (list, str)}
+}
+
+# Retry fast-model responses on the large model when they fail validation
+# or report low confidence
+LLM_ESCALATION = os.getenv('LLM_ESCALATION', 'true').lower() in ('true', '1', 'yes')
+# Share of extracted skills rated 'low' confidence that makes a low-confidence response
+LOW_CONFIDENCE_SHARE = float(os.getenv('LLM_LOW_CONFIDENCE_SHARE', '0.5'))
+
+SKILL_CATEGORIES = ('technical_skills', 'soft_skills', 'tools_technologies', 'languages')
+
 class LLMServiceError(Exception):
     """Custom exception for LLM service errors."""
     pass
 
+_tier_stats: Dict[str, Dict[str, int]] = {}
+_tier_lock = threading.Lock()
+
+def _count_tier(task: str, key: str) -> None:
+    with _tier_lock:
+        stats = _tier_stats.setdefault(task, {'fast': 0, 'large': 0, 'escalated_invalid': 0, 'escalated_low_confidence': 0})
+        stats[key] += 1
+
+def tiering_stats() -> Dict[str, Dict[str, Any]]:
+    """Responses served by each model tier per task in this process, and how many were escalated."""
+    with _tier_lock:
+        stats = {task: dict(counts) for task, counts in _tier_stats.items()}
+    for counts in stats.values():
+        escalated = counts['escalated_invalid'] + counts['escalated_low_confidence']
+        first_fast = counts['fast'] + escalated
+        counts['escalation_rate'] = round(escalated / first_fast, 3) if first_fast else None
+    return stats
+
+def validate_detail(detail: Optional[str]) -> str:
+    """Normalize a detail level, rejecting unknown values."""
+    detail = (detail or 'full').lower()
+    if detail not in DETAIL_LEVELS:
+        raise LLMServiceError(f"Invalid detail '{detail}'. Use one of: {', '.join(DETAIL_LEVELS)}")
+    return detail
+
+def output_budget(task: str, detail: str = 'full', items: int = 0) -> int:
+    """
+    Compute the max_tokens budget for a response.
+    
+    Args:
+        task: Key in OUTPUT_BUDGETS
+        detail: 'full' or 'compact'
+        items: Number of items the response has to cover
+    
+    Returns:
+        Output token budget, capped at MAX_OUTPUT_TOKENS
+    """
+    fixed, per_item = OUTPUT_BUDGETS[task][detail]
+    items = max(items, MIN_BUDGET_ITEMS[task])
+    return min(fixed + per_item * items, MAX_OUTPUT_TOKENS)
+
+def log_token_usage(task: str, budget: int, usage: Dict[str, Any]) -> None:
+    """Log actual versus budgeted output tokens for a response."""
+    output_tokens = usage.get('output_tokens')
+    if output_tokens is None:
+        logger.info(f"{task}: output budget {budget} tokens (provider reported no usage)")
+        return
+    
+    cached = usage.get('cached_input_tokens')
+    logger.info(
+        f"{task}: {output_tokens}/{budget} output tokens "
+        f"({output_tokens / budget:.0%} of budget), {usage.get('input_tokens')} input tokens"
+        + (f" ({cached} cached)" if cached is not None else "")
+    )
+    if output_tokens >= budget:
+        logger.warning(f"{task}: response hit its output budget and may be truncated")
+
+# Resumes are never truncated below this many tokens to fit a context window
+MIN_RESUME_TOKENS = 500
+
+def fit_resume_text(resume: ResumeDocument, task: str, build_prompt,
+                    budget: int) -> Union[str, ResumeDocument]:
+    """
+    Truncate a resume so that its prompt fits the model's context window
+    alongside the output budget.
+    
+    Args:
+        resume: Resume sections
+        task: Task whose sections are sent, a key in PromptTemplates.TASK_SECTIONS
+        build_prompt: Function building the prompt from the resume
+        budget: Output token budget
+    
+    Returns:
+        The resume unchanged if it fits, otherwise the task's sections as
+        truncated text; if even MIN_RESUME_TOKENS would not fit, it is
+        returned unchanged for the handler to reject
+    """
+    capacity = llm_handler.input_capacity(budget, task)
+    prompt_tokens = llm_handler.estimate_tokens(build_prompt(resume), task)
+    if prompt_tokens <= capacity:
+        return resume
+    
+    resume_text = PromptTemplates.resume_text(resume, task)
+    allowed = llm_handler.estimate_tokens(resume_text, task) - (prompt_tokens - capacity)
+    if allowed < MIN_RESUME_TOKENS:
+        return resume
+    
+    logger.warning(f"Truncating resume to about {allowed} tokens to fit the context window")
+    return llm_handler.truncate_to_tokens(resume_text, allowed, task)
+
+def fit_job_descriptions(resume: ResumeDocument, job_descriptions: List[Dict[str, str]],
+                         detail: str, catalog_key: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Drop the least relevant jobs (the list is ordered best first) until the
+    job matching prompt fits the model's context window.
+    """
+    jobs = job_descriptions
+    while len(jobs) > 1:
+        budget = output_budget('job_matching', detail, len(jobs))
+        capacity = llm_handler.input_capacity(budget, 'job_matching')
+        prompt_tokens = llm_handler.estimate_tokens(
+            PromptTemplates.job_matching_prompt(resume, jobs, detail, catalog_key), 'job_matching'
+        )
+        if prompt_tokens <= capacity:
+            break
+        # Shrink in proportion to the overshoot, by at least one job
+        keep = min(len(jobs) - 1, max(1, int(len(jobs) * capacity / prompt_tokens)))
+        jobs = jobs[:keep]
+    
+    if len(jobs) < len(job_descriptions):
+        logger.warning(f"Sending {len(jobs)} of {len(job_descriptions)} jobs to fit the context window")
+    return jobs
+
+def parse_json_response(response: str, task: str) -> Dict[str, Any]:
+    """Parse an LLM response as a JSON object and check it against the task's RESPONSE_SCHEMAS entry."""
+    try:
+        result = json.loads(response)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse LLM response as JSON: {e}")
+        logger.error(f"Raw response: {response}")
+        raise LLMServiceError("Invalid response format from LLM")
+    
+    if not isinstance(result, dict):
+        raise LLMServiceError("Invalid response format from LLM")
+    for field, field_type in RESPONSE_SCHEMAS[task].items():
+        if field not in result:
+            raise LLMServiceError(f"LLM response missing '{field}' field")
+        value = result[field]
+        field_type, item_type = field_type if isinstance(field_type, tuple) else (field_type, None)
+        if not isinstance(value, field_type) or (item_type and not all(isinstance(item, item_type) for item in value)):
+            raise LLMServiceError(f"LLM response has an invalid '{field}' field")
+    return result
+
+def low_confidence(task: str, result: Dict[str, Any]) -> Optional[str]:
+    """Get why a parsed response counts as low confidence, or None."""
+    if str(result.get('confidence', '')).lower() == 'low':
+        return "model reported low confidence"
+    
+    if task == 'skills_extraction':
+        ratings = [
+            str(item.get('confidence', '')).lower()
+            for category in SKILL_CATEGORIES for item in result.get(category) or []
+            if isinstance(item, dict) and item.get('confidence')
+        ]
+        if ratings and ratings.count('low') / len(ratings) >= LOW_CONFIDENCE_SHARE:
+            return f"{ratings.count('low')} of {len(ratings)} skills rated low confidence"
+    return None
+
+async def generate_json(prompt: str, task: str, budget: int, temperature: float,
+                        usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Get an LLM response for a task and parse it as a JSON object matching
+    the task's schema.
+    
+    The task's model tier is chosen by the handler (LLM_TASK_TIERS). When
+    the fast model's response fails validation or reports low confidence,
+    the request is retried on the large model; the caller's usage then
+    describes the large model's call, with the fast one under 'escalated_from'.
+    """
+    usage = {} if usage is None else usage
+    tier = None
+    escalated_from = None
+    while True:
+        usage.clear()
+        response = await llm_handler.generate_response(
+            prompt,
+            max_tokens=budget,
+            temperature=temperature,
+            usage=usage,
+            task=task,
+            tier=tier
+        )
+        log_token_usage(task, budget, usage)
+        can_escalate = LLM_ESCALATION and usage.get('tier') == 'fast'
+        
+        try:
+            result = parse_json_response(response, task)
+        except LLMServiceError as e:
+            if not can_escalate:
+                raise
+            reason, counter = str(e), 'escalated_invalid'
+        else:
+            reason, counter = low_confidence(task, result), 'escalated_low_confidence'
+            if reason is None or not can_escalate:
+                _count_tier(task, usage.get('tier', 'large'))
+                if escalated_from is not None:
+                    usage['escalated_from'] = escalated_from
+                return result
+        
+        logger.warning(f"{task}: escalating from {usage.get('model')} to the large model ({reason})")
+        _count_tier(task, counter)
+        escalated_from = {
+            'model': usage.get('model'),
+            'reason': reason,
+            'input_tokens': usage.get('input_tokens'),
+            'output_tokens': usage.get('output_tokens')
+        }
+        tier = 'large'
+
+def count_job_skills(job_description: str) -> int:
+    """Count known skills mentioned in a job description."""
+    return len(job_skills(job_description))
+
 class LLMJobMatchingService:
     """Service for LLM-based job matching."""
     
     @staticmethod
-    async def match_jobs(resume_text: str, job_descriptions: List[Dict[str, str]]) -> Dict[str, Any]:
+    def build_request(resume: Union[str, ResumeProfile], job_descriptions: List[Dict[str, str]],
+                      detail: str = 'full', catalog_key: Optional[str] = None) -> Tuple[str, int, List[Dict[str, str]]]:
+        """
+        Build the job matching prompt, keeping only as many jobs as fit the context window.
+        
+        Jobs are rendered as their compact profiles (job_profiles) unless
+        LLM_JOB_PROFILES is off.
+        
+        Returns:
+            Tuple of (prompt, output token budget, jobs included in the prompt)
+        """
+        detail = validate_detail(detail)
+        document = get_resume_profile(resume).document
+        if JOB_PROFILE_PROMPTS:
+            job_descriptions = with_profiles(job_descriptions)
+        job_descriptions = fit_job_descriptions(document, job_descriptions, detail, catalog_key)
+        prompt = PromptTemplates.job_matching_prompt(document, job_descriptions, detail, catalog_key)
+        return prompt, output_budget('job_matching', detail, len(job_descriptions)), job_descriptions
+    
+    @staticmethod
+    def parse_response(response: str) -> Dict[str, Any]:
+        """Parse and validate an LLM job matching response."""
+        return parse_json_response(response, 'job_matching')
+    
+    @staticmethod
+    async def match_jobs(resume: Union[str, ResumeProfile], job_descriptions: List[Dict[str, str]],
+                         detail: str = 'full', catalog_key: Optional[str] = None,
+                         usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Match resume against job descriptions using LLM.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume or its ResumeProfile
             job_descriptions: List of job description dictionaries
+            detail: 'full' or 'compact' response detail
+            catalog_key: Snapshot key of the catalog version the jobs were
+                read at (JobCatalog.snapshot_key), so their rendered prompt
+                block is reused across requests
+            usage: Optional dictionary filled with the provider's token usage
             
         Returns:
             Dictionary with job matches and analysis
         """
         try:
-            # Generate prompt
-            prompt = PromptTemplates.job_matching_prompt(resume_text, job_descriptions)
-            
-            # Get LLM response
-            response = await llm_handler.generate_response(
-                prompt,
-                max_tokens=3000,
-                temperature=0.2
+            prompt, budget, job_descriptions = LLMJobMatchingService.build_request(
+                resume, job_descriptions, detail, catalog_key
             )
             
-            # Parse JSON response
-            try:
-                result = json.loads(response)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {e}")
-                logger.error(f"Raw response: {response}")
-                raise LLMServiceError("Invalid response format from LLM")
-            
-            # Validate response structure
-            if 'matches' not in result:
-                raise LLMServiceError("LLM response missing 'matches' field")
-            
-            return result
+            # Get and validate the LLM response
+            return await generate_json(prompt, 'job_matching', budget, JOB_MATCHING_TEMPERATURE, usage)
             
+        except LLMPreflightError:
+            raise
         except Exception as e:
             logger.error(f"Job matching failed: {str(e)}")
             raise LLMServiceError(f"Job matching failed: {str(e)}")
@@ -59,42 +334,56 @@ class LLMSkillGapService:
     """Service for LLM-based skill gap analysis."""
     
     @staticmethod
-    async def analyze_skill_gap(resume_text: str, job_description: str) -> Dict[str, Any]:
+    async def analyze_skill_gap(resume: Union[str, ResumeProfile], job_description: str,
+                                detail: str = 'full') -> Dict[str, Any]:
         """
         Analyze skill gap between resume and job description using LLM.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume or its ResumeProfile
             job_description: Job description text
+            detail: 'full' or 'compact' response detail
             
         Returns:
-            Dictionary with skill gap analysis
+            Dictionary with skill gap analysis, and under 'reanalysis' which
+            resume sections were sent to the LLM and which were reused from
+            the analysis of a previous version of the resume
         """
         try:
-            # Generate prompt
-            prompt = PromptTemplates.skill_gap_prompt(resume_text, job_description)
+            detail = validate_detail(detail)
+            document = get_resume_profile(resume).document
+            job_skill_count = count_job_skills(job_description)
             
-            # Get LLM response
-            response = await llm_handler.generate_response(
-                prompt,
-                max_tokens=2500,
-                temperature=0.2
-            )
+            # Reuse the analysis of a previous version of this resume if only some sections changed
+            reanalysis = Reanalysis('skill_gap', document, job_description, detail)
+            if reanalysis.mode == 'cached':
+                return {**reanalysis.previous, 'reanalysis': reanalysis.describe()}
             
-            # Parse JSON response
-            try:
-                result = json.loads(response)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {e}")
-                logger.error(f"Raw response: {response}")
-                raise LLMServiceError("Invalid response format from LLM")
+            if reanalysis.mode == 'incremental':
+                share = len(reanalysis.changed) / len(reanalysis.fingerprints)
+                budget = output_budget('skill_gap', detail, round(job_skill_count * share))
+                prompt = PromptTemplates.skill_gap_update_prompt(
+                    reanalysis.edited, reanalysis.removed, reanalysis.previous, job_description, detail
+                )
+                update = await generate_json(prompt, 'skill_gap', budget, 0.2)
+                result = merge_skill_gap(reanalysis.previous, update)
+            else:
+                # Generate prompt
+                budget = output_budget('skill_gap', detail, job_skill_count)
+                resume = fit_resume_text(
+                    document,
+                    'skill_gap',
+                    lambda fitted: PromptTemplates.skill_gap_prompt(fitted, job_description, detail),
+                    budget
+                )
+                prompt = PromptTemplates.skill_gap_prompt(resume, job_description, detail)
+                result = await generate_json(prompt, 'skill_gap', budget, 0.2)
             
-            # Validate response structure
-            if 'missing_skills' not in result:
-                raise LLMServiceError("LLM response missing 'missing_skills' field")
-            
-            return result
+            reanalysis.store(result)
+            return {**result, 'reanalysis': reanalysis.describe()}
             
+        except LLMPreflightError:
+            raise
         except Exception as e:
             logger.error(f"Skill gap analysis failed: {str(e)}")
             raise LLMServiceError(f"Skill gap analysis failed: {str(e)}")
@@ -103,42 +392,56 @@ class LLMResumeImprovementService:
     """Service for LLM-based resume improvement suggestions."""
     
     @staticmethod
-    async def improve_resume(resume_text: str, job_description: str) -> Dict[str, Any]:
+    async def improve_resume(resume: Union[str, ResumeProfile], job_description: str,
+                             detail: str = 'full') -> Dict[str, Any]:
         """
         Provide resume improvement suggestions using LLM.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume or its ResumeProfile
             job_description: Job description text
+            detail: 'full' or 'compact' response detail
             
         Returns:
-            Dictionary with improvement suggestions
+            Dictionary with improvement suggestions, and under 'reanalysis'
+            which resume sections were sent to the LLM and which were reused
+            from the analysis of a previous version of the resume
         """
         try:
-            # Generate prompt
-            prompt = PromptTemplates.resume_improvement_prompt(resume_text, job_description)
+            detail = validate_detail(detail)
+            document = get_resume_profile(resume).document
             
-            # Get LLM response
-            response = await llm_handler.generate_response(
-                prompt,
-                max_tokens=3000,
-                temperature=0.3
-            )
+            # Reuse the analysis of a previous version of this resume if only some sections changed
+            reanalysis = Reanalysis('resume_improvement', document, job_description, detail)
+            if reanalysis.mode == 'cached':
+                return {**reanalysis.previous, 'reanalysis': reanalysis.describe()}
             
-            # Parse JSON response
-            try:
-                result = json.loads(response)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {e}")
-                logger.error(f"Raw response: {response}")
-                raise LLMServiceError("Invalid response format from LLM")
+            if reanalysis.mode == 'incremental':
+                budget = output_budget('resume_improvement', detail, len(reanalysis.changed))
+                prompt = PromptTemplates.resume_improvement_update_prompt(
+                    reanalysis.edited, reanalysis.removed,
+                    unchanged_improvement(reanalysis.previous, reanalysis), job_description, detail
+                )
+                update = await generate_json(prompt, 'resume_improvement', budget, 0.3)
+                result = merge_resume_improvement(reanalysis.previous, update, reanalysis)
+            else:
+                # Generate prompt, budgeting for each section the resume has
+                sections = sum(1 for text in document.sections.values() if text.strip())
+                budget = output_budget('resume_improvement', detail, sections)
+                resume = fit_resume_text(
+                    document,
+                    'resume_improvement',
+                    lambda fitted: PromptTemplates.resume_improvement_prompt(fitted, job_description, detail),
+                    budget
+                )
+                prompt = PromptTemplates.resume_improvement_prompt(resume, job_description, detail)
+                result = await generate_json(prompt, 'resume_improvement', budget, 0.3)
             
-            # Validate response structure
-            if 'section_analysis' not in result:
-                raise LLMServiceError("LLM response missing 'section_analysis' field")
-            
-            return result
+            reanalysis.store(result)
+            return {**result, 'reanalysis': reanalysis.describe()}
             
+        except LLMPreflightError:
+            raise
         except Exception as e:
             logger.error(f"Resume improvement analysis failed: {str(e)}")
             raise LLMServiceError(f"Resume improvement analysis failed: {str(e)}")
@@ -147,45 +450,68 @@ class LLMSkillsExtractionService:
     """Service for LLM-based skills extraction."""
     
     @staticmethod
-    async def extract_skills(resume_text: str) -> Dict[str, Any]:
+    async def extract_skills(resume: Union[str, ResumeProfile], detail: str = 'full') -> Dict[str, Any]:
         """
         Extract and categorize skills from resume using LLM.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume or its ResumeProfile
+            detail: 'full' or 'compact' response detail
             
         Returns:
             Dictionary with categorized skills
         """
         try:
-            # Generate prompt
-            prompt = PromptTemplates.extract_skills_prompt(resume_text)
+            detail = validate_detail(detail)
+            profile = get_resume_profile(resume)
             
-            # Get LLM response
-            response = await llm_handler.generate_response(
-                prompt,
-                max_tokens=2000,
-                temperature=0.1
+            # Generate prompt
+            budget = output_budget('skills_extraction', detail, len(profile.matched_skills))
+            resume = fit_resume_text(
+                profile.document,
+                'skills_extraction',
+                lambda fitted: PromptTemplates.extract_skills_prompt(fitted, detail),
+                budget
             )
+            prompt = PromptTemplates.extract_skills_prompt(resume, detail)
             
-            # Parse JSON response
-            try:
-                result = json.loads(response)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {e}")
-                logger.error(f"Raw response: {response}")
-                raise LLMServiceError("Invalid response format from LLM")
-            
-            # Validate response structure
-            if 'technical_skills' not in result:
-                raise LLMServiceError("LLM response missing 'technical_skills' field")
-            
-            return result
+            # Get and validate the LLM response
+            return await generate_json(prompt, 'skills_extraction', budget, 0.1)
             
+        except LLMPreflightError:
+            raise
         except Exception as e:
             logger.error(f"Skills extraction failed: {str(e)}")
             raise LLMServiceError(f"Skills extraction failed: {str(e)}")
 
+class LLMJobProfileService:
+    """Service for LLM refinement of compact job profiles."""
+
+    @staticmethod
+    async def refine_profile(job: Dict[str, Any], profile: Dict[str, Any],
+                             usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Correct and complete a locally built job profile using LLM.
+
+        Args:
+            job: Job dictionary with 'title' and 'description'
+            profile: Profile built by job_profiles.build_profile
+            usage: Optional dictionary filled with the provider's token usage
+
+        Returns:
+            Dictionary with the refined profile fields
+        """
+        try:
+            prompt = PromptTemplates.job_profile_prompt(job, profile)
+            budget = output_budget('job_profiling', 'full', len(profile.get('skills', [])))
+            return await generate_json(prompt, 'job_profiling', budget, 0.0, usage)
+
+        except LLMPreflightError:
+            raise
+        except Exception as e:
+            logger.error(f"Job profiling failed: {str(e)}")
+            raise LLMServiceError(f"Job profiling failed: {str(e)}")
+
 # Utility function to validate LLM availability
 def check_llm_availability() -> Dict[str, Any]:
     """
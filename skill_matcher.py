@@ -0,0 +1,248 @@
+"""
+Fuzzy skill matching for SkillSnap.
+
+Resolves the words in a resume or job description to canonical skills,
+tolerating typos ("Kubernates"), abbreviations ("k8s") and variants ("Node"
+for "node.js"). Lookups use a SymSpell-style index of precomputed deletions,
+so each phrase is resolved with a bounded number of dictionary probes no
+matter how large the skill vocabulary is.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Optional JSON file with extra {"skills": [...], "aliases": {alias: skill}}
+SKILL_VOCABULARY_PATH = os.getenv('SKILL_VOCABULARY_PATH')
+
+MAX_EDIT_DISTANCE = 2
+# Longer phrases are only matched exactly, which bounds the work per lookup
+MAX_FUZZY_LENGTH = 32
+# Only deletions within this prefix are indexed, as in SymSpell, which keeps
+# the index small for large vocabularies; candidates are verified in full
+PREFIX_LENGTH = 7
+LOOKUP_CACHE_SIZE = 65536
+
+# Version of the rules that turn text into skills: this matcher, and the
+# skill crediting in ml_utils (ResumeProfile, job_skills). Bump it whenever
+# they change, so results cached or published under the old rules are not
+# reused; see SkillMatcher.digest.
+SKILL_RULES_VERSION = 3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+# Common abbreviations and spellings, mapped to canonical skill names
+ALIASES = {
+    'k8s': 'kubernetes', 'kube': 'kubernetes',
+    'node': 'node.js', 'nodejs': 'node.js', 'node js': 'node.js',
+    'js': 'javascript', 'ecmascript': 'javascript', 'es6': 'javascript',
+    'ts': 'typescript',
+    'py': 'python', 'python3': 'python',
+    'golang': 'go',
+    'reactjs': 'react', 'react.js': 'react',
+    'vuejs': 'vue', 'vue.js': 'vue',
+    'angularjs': 'angular', 'angular.js': 'angular',
+    'expressjs': 'express', 'express.js': 'express',
+    'postgres': 'postgresql', 'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'elastic search': 'elasticsearch',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud', 'google cloud platform': 'google cloud',
+    'microsoft azure': 'azure',
+    'cicd': 'ci/cd', 'ci cd': 'ci/cd', 'continuous integration': 'ci/cd',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'sklearn': 'scikit-learn', 'scikit learn': 'scikit-learn',
+    'powerbi': 'power bi',
+    'ms excel': 'excel', 'microsoft excel': 'excel',
+    'cpp': 'c++',
+    'csharp': 'c#', 'c sharp': 'c#',
+    'restful': 'rest api', 'rest apis': 'rest api', 'restful api': 'rest api',
+    'micro services': 'microservices', 'microservice': 'microservices',
+    'apache spark': 'spark', 'pyspark': 'spark',
+    'apache kafka': 'kafka',
+    'apache airflow': 'airflow',
+    'shell': 'shell scripting',
+    'unittest': 'unit testing', 'unit tests': 'unit testing',
+    'tailwindcss': 'tailwind',
+    'html5': 'html', 'css3': 'css',
+}
+
+# Everyday words one edit away from a skill long enough to be fuzzy matched
+# ("tasting" -> "testing", "tailwinds" -> "tailwind"); only matched exactly
+COMMON_WORDS = frozenset({
+    'tasting', 'texting', 'tailwinds', 'expresses', 'bootstraps', 'jerkins'
+})
+
+def allowed_distance(length: int) -> int:
+    """Maximum edit distance tolerated for a term of this length."""
+    # Six letters and fewer leave too many real words within one edit of a skill
+    if length <= 6:
+        return 0
+    if length <= 9:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+def _deletes(term: str, distance: int) -> List[str]:
+    """All strings obtained by deleting up to `distance` characters."""
+    variants = {term}
+    for count in range(1, distance + 1):
+        if count >= len(term):
+            break
+        for positions in combinations(range(len(term)), count):
+            variants.add(''.join(c for i, c in enumerate(term) if i not in positions))
+    return list(variants)
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance between a and b, or limit + 1 once it
+    is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class SkillMatcher:
+    """Resolve text to canonical skills with exact, alias and fuzzy lookups."""
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        self.skills = sorted({skill.lower() for skill in skills})
+        canonical = set(self.skills)
+
+        # Exact forms: every canonical skill plus aliases of known skills
+        self.forms: Dict[str, str] = {skill: skill for skill in self.skills}
+        for alias, skill in (ALIASES if aliases is None else aliases).items():
+            if skill.lower() in canonical:
+                self.forms.setdefault(alias.lower(), skill.lower())
+
+        self.max_words = max((len(form.split()) for form in self.forms), default=1)
+
+        # Deletion index for fuzzy lookups of forms long enough to tolerate typos
+        self._index: Dict[str, List[str]] = {}
+        for form in self.forms:
+            distance = allowed_distance(len(form))
+            if distance and len(form) <= MAX_FUZZY_LENGTH:
+                for variant in _deletes(form[:PREFIX_LENGTH], distance):
+                    self._index.setdefault(variant, []).append(form)
+
+        self.lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+        # Identifies what this matcher resolves text to, for cache keys
+        identity = json.dumps([SKILL_RULES_VERSION, self.skills, sorted(self.forms.items())])
+        self.digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:12]
+
+    def _lookup(self, phrase: str) -> Optional[str]:
+        """Resolve a phrase to a canonical skill, or None."""
+        skill = self.forms.get(phrase)
+        if skill is not None:
+            return skill
+
+        distance = allowed_distance(len(phrase))
+        if not distance or len(phrase) > MAX_FUZZY_LENGTH or phrase in COMMON_WORDS:
+            return None
+
+        best, best_distance = None, distance + 1
+        seen = set()
+        for variant in _deletes(phrase[:PREFIX_LENGTH], distance):
+            for form in self._index.get(variant, ()):
+                if form in seen:
+                    continue
+                seen.add(form)
+                # Typos rarely change the first letter, and requiring it avoids
+                # matches like "reach" -> "react"
+                if form[0] != phrase[0]:
+                    continue
+                limit = min(distance, allowed_distance(len(form)))
+                found = edit_distance(phrase, form, limit)
+                if found <= limit and (found, form) < (best_distance, best or ''):
+                    best, best_distance = form, found
+        return self.forms[best] if best else None
+
+    def tokenize(self, text: str) -> List[str]:
+        """Split text into tokens, breaking 'python/django' apart unless it is a known form."""
+        tokens = []
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            token = token.rstrip('./-')
+            if not token:
+                continue
+            if token in self.forms or not re.search(r"[/-]", token):
+                tokens.append(token)
+            else:
+                tokens.extend(part for part in re.split(r"[/-]+", token) if part)
+        return tokens
+
+    def match(self, text: str) -> Dict[str, str]:
+        """
+        Find the skills mentioned in text, longest phrases first.
+
+        Returns:
+            Dictionary mapping canonical skill to the text that matched it
+        """
+        tokens = self.tokenize(text)
+        found: Dict[str, str] = {}
+        i = 0
+        while i < len(tokens):
+            for size in range(min(self.max_words, len(tokens) - i), 0, -1):
+                phrase = ' '.join(tokens[i:i + size])
+                skill = self.lookup(phrase)
+                if skill is not None:
+                    found.setdefault(skill, phrase)
+                    i += size
+                    break
+            else:
+                i += 1
+        return found
+
+def load_vocabulary(path: str) -> Dict[str, object]:
+    """Load extra skills and aliases from a JSON file."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {'skills': data, 'aliases': {}}
+    return {'skills': data.get('skills', []), 'aliases': data.get('aliases', {})}
+
+_matcher_lock = threading.Lock()
+_matcher: Optional[SkillMatcher] = None
+
+def get_skill_matcher() -> SkillMatcher:
+    """Get the shared matcher over SKILLS_DB and any configured vocabulary file."""
+    global _matcher
+
+    if _matcher is not None:
+        return _matcher
+
+    with _matcher_lock:
+        if _matcher is None:
+            from ml_utils import SKILLS_DB
+
+            skills, aliases = list(SKILLS_DB), dict(ALIASES)
+            if SKILL_VOCABULARY_PATH:
+                extra = load_vocabulary(SKILL_VOCABULARY_PATH)
+                skills += extra['skills']
+                aliases.update(extra['aliases'])
+            _matcher = SkillMatcher(skills, aliases)
+            logger.info(f"Built skill matcher with {len(_matcher.skills)} skills and {len(_matcher.forms)} forms")
+        return _matcher
@@ -0,0 +1,294 @@
+"""
+Catalog-wide skill gap analysis for SkillSnap.
+
+Each job's required skills are encoded once per catalog version as a row of
+a packed bitset over the shared skill vocabulary. Comparing a resume against
+the whole catalog is then a handful of vectorized NumPy operations: an AND-NOT
+for missing skills, popcounts for coverage and column sums for the skills
+missing most often. The bitsets are shared by all workers through
+catalog_arrays.
+"""
+
+import copy
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from catalog_arrays import StringTable, load_or_build
+from catalog_snapshot import CatalogSnapshots
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Rows processed at once when unpacking bitsets, to bound temporary memory
+CHUNK_ROWS = 65536
+
+# Version of the matrix encoding; bump it when build_arrays() changes. The
+# shared arrays are also keyed by the skill matcher's digest, which covers
+# the vocabulary and the rules that credit skills to jobs.
+SKILL_MATRIX_VERSION = 1
+
+# Number of set bits in each byte value
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+class SkillMatrix:
+    """
+    Packed job-by-skill bitset for a catalog at a specific version.
+
+    A base matrix covers the whole catalog at its build version.
+    apply_delta() derives a matrix for a later version that hides the base
+    rows of changed jobs and adds their current skills in a delta segment.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], version: int, vocabulary: List[str]):
+        """
+        Args:
+            arrays: Matrix arrays from build_arrays(), possibly memory-mapped
+            version: Catalog version the arrays were built from
+            vocabulary: Skills the bit columns stand for
+        """
+        self.version = version
+        self.vocabulary = list(vocabulary)
+        self.skill_index = {skill: i for i, skill in enumerate(self.vocabulary)}
+        self.bits = arrays['bits']
+        self.required_counts = arrays['required_counts']
+        self.job_ids = arrays['job_ids']
+        self.titles = StringTable(arrays['title_blob'], arrays['title_offsets'])
+        self.base = self
+
+        # Delta segment: base rows of changed jobs, and the jobs' current rows
+        self.hidden_rows = np.empty(0, dtype=np.int64)
+        self.delta: Optional['SkillMatrix'] = None
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the matrix arrays, including the delta segment."""
+        size = sum(array.nbytes for array in (
+            self.bits, self.required_counts, self.job_ids, self.titles.blob, self.titles.offsets, self.hidden_rows
+        ))
+        return size + (self.delta.nbytes if self.delta is not None else 0)
+
+    def apply_delta(self, delta) -> 'SkillMatrix':
+        """
+        Get a matrix for a later catalog version from this base matrix.
+
+        Args:
+            delta: CatalogDelta since this matrix's version
+
+        Returns:
+            A new matrix sharing this one's arrays
+        """
+        matrix = copy.copy(self)
+        matrix.version = delta.version
+        removed = np.array(sorted(delta.removed_ids), dtype=np.int64)
+        matrix.hidden_rows = np.flatnonzero(np.isin(self.job_ids, removed))
+        matrix.delta = SkillMatrix.build(delta.jobs, delta.version, self.vocabulary)
+        return matrix
+
+    @classmethod
+    def build(cls, jobs: Iterable[Dict[str, Any]], version: int, vocabulary: List[str]) -> 'SkillMatrix':
+        """Build a matrix held in process memory."""
+        return cls(cls.build_arrays(jobs, vocabulary), version, vocabulary)
+
+    @staticmethod
+    def build_arrays(jobs: Iterable[Dict[str, Any]], vocabulary: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Encode the skills each job requires.
+
+        Returns:
+            Arrays by name, as stored in the shared catalog arrays
+        """
+        from ml_utils import job_skills
+
+        start = time.perf_counter()
+        skill_index = {skill: i for i, skill in enumerate(vocabulary)}
+        job_ids: List[int] = []
+        titles: List[str] = []
+        rows = []
+        for job in jobs:
+            row = np.zeros(len(vocabulary), dtype=bool)
+            for skill in job_skills(job['description']):
+                index = skill_index.get(skill)
+                if index is not None:
+                    row[index] = True
+            rows.append(np.packbits(row))
+            job_ids.append(job['id'])
+            titles.append(job['title'])
+
+        width = (len(vocabulary) + 7) // 8
+        bits = np.vstack(rows) if rows else np.zeros((0, width), dtype=np.uint8)
+        title_table = StringTable.encode(titles)
+        logger.info(
+            f"Built skill matrix for {len(job_ids)} jobs x {len(vocabulary)} skills "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        return {
+            'bits': bits,
+            'required_counts': POPCOUNT[bits].sum(axis=1, dtype=np.int32),
+            'job_ids': np.array(job_ids, dtype=np.int64),
+            'title_blob': title_table['blob'],
+            'title_offsets': title_table['offsets']
+        }
+
+    def encode(self, skills: Iterable[str]) -> np.ndarray:
+        """Pack a set of skills into a bitset row over the vocabulary."""
+        row = np.zeros(len(self.vocabulary), dtype=bool)
+        for skill in skills:
+            index = self.skill_index.get(skill)
+            if index is not None:
+                row[index] = True
+        return np.packbits(row)
+
+    def decode(self, bits: np.ndarray) -> List[str]:
+        """Unpack a bitset row into skill names."""
+        flags = np.unpackbits(bits)[:len(self.vocabulary)]
+        return [self.vocabulary[i] for i in np.flatnonzero(flags)]
+
+    def _score(self, resume_bits: np.ndarray) -> Dict[str, Any]:
+        """Score this matrix's own rows (not its delta) against a resume."""
+        missing = self.bits & ~resume_bits
+        missing_counts = POPCOUNT[missing].sum(axis=1, dtype=np.int32)
+        required = self.required_counts
+        # Jobs that list no known skills have nothing to cover; gap_report leaves them out
+        coverage = np.where(required > 0, 1.0 - missing_counts / np.maximum(required, 1), 0.0)
+
+        # Column sums of the missing matrix, unpacked in bounded chunks
+        missing_per_skill = np.zeros(len(self.vocabulary), dtype=np.int64)
+        for start in range(0, len(self.job_ids), CHUNK_ROWS):
+            chunk = np.unpackbits(missing[start:start + CHUNK_ROWS], axis=1)[:, :len(self.vocabulary)]
+            missing_per_skill += chunk.sum(axis=0, dtype=np.int64)
+
+        rows = None
+        if len(self.hidden_rows):
+            # Hidden rows are few, so subtract them rather than masking everything
+            hidden = np.unpackbits(missing[self.hidden_rows], axis=1)[:, :len(self.vocabulary)]
+            missing_per_skill -= hidden.sum(axis=0, dtype=np.int64)
+            rows = np.setdiff1d(np.arange(len(self.job_ids)), self.hidden_rows, assume_unique=True)
+            missing_counts, required, coverage = missing_counts[rows], required[rows], coverage[rows]
+
+        return {
+            'matrix': self,
+            'missing': missing,
+            'missing_counts': missing_counts,
+            'required': required,
+            'coverage': coverage,
+            'missing_per_skill': missing_per_skill,
+            # Segment positions to matrix rows, or None when they are the same
+            'rows': rows
+        }
+
+    def gap_report(self, resume_skills: Iterable[str], limit: int = 20,
+                   top_missing: int = 10) -> Dict[str, Any]:
+        """
+        Compare resume skills against every job in the catalog.
+
+        Args:
+            resume_skills: Canonical skills found in the resume
+            limit: Number of best-covered jobs to return in detail
+            top_missing: Number of most frequently missing skills to return
+
+        Jobs requiring none of the vocabulary's skills cannot be scored; they
+        are counted in the summary as 'jobs_without_skills' and left out of
+        the ranking, coverage and missing skill shares.
+
+        Returns:
+            Dictionary with a catalog summary, per-job coverage and missing
+            skills for the best-covered jobs, and the most frequently missing
+            skills across the catalog
+        """
+        resume_bits = self.encode(resume_skills)
+        segments = [self._score(resume_bits)]
+        if self.delta is not None and len(self.delta):
+            segments.append(self.delta._score(resume_bits))
+
+        if len(segments) == 1:
+            segment = segments[0]
+            coverage, required = segment['coverage'], segment['required']
+            missing_counts = segment['missing_counts']
+        else:
+            coverage = np.concatenate([segment['coverage'] for segment in segments])
+            required = np.concatenate([segment['required'] for segment in segments])
+            missing_counts = np.concatenate([segment['missing_counts'] for segment in segments])
+        offsets = np.cumsum([0] + [len(segment['coverage']) for segment in segments])
+        missing_per_skill = sum(segment['missing_per_skill'] for segment in segments)
+        n_jobs = len(coverage)
+        scored = np.flatnonzero(required > 0)
+        n_scored = len(scored)
+
+        # Best coverage first, preferring jobs with more required skills on ties
+        top = min(limit, n_scored)
+        if top > 0:
+            order = scored[np.lexsort((-required[scored], -coverage[scored]))[:top]]
+        else:
+            order = np.empty(0, dtype=np.int64)
+
+        segment_indexes = np.searchsorted(offsets, order, side='right') - 1
+        jobs = []
+        for position, segment_index in zip(order.tolist(), segment_indexes.tolist()):
+            segment = segments[segment_index]
+            row = position - int(offsets[segment_index])
+            if segment['rows'] is not None:
+                row = segment['rows'][row]
+            matrix = segment['matrix']
+            jobs.append({
+                'job_id': int(matrix.job_ids[row]),
+                'title': matrix.titles[row],
+                'coverage': round(float(coverage[position]), 4),
+                'required_skills': int(required[position]),
+                'missing_skills': self.decode(segment['missing'][row])
+            })
+
+        most_missing = [
+            {
+                'skill': self.vocabulary[i],
+                'jobs_missing': int(missing_per_skill[i]),
+                'share': round(float(missing_per_skill[i]) / n_scored, 4)
+            }
+            for i in np.argsort(-missing_per_skill, kind='stable')[:top_missing]
+            if missing_per_skill[i] > 0
+        ]
+
+        return {
+            'summary': {
+                'jobs_analyzed': n_jobs,
+                'jobs_without_skills': n_jobs - n_scored,
+                'average_coverage': round(float(coverage[scored].mean()), 4) if n_scored else None,
+                'fully_covered_jobs': int(np.count_nonzero(missing_counts[scored] == 0)),
+                'resume_skills': sorted(set(resume_skills) & set(self.skill_index))
+            },
+            'jobs': jobs,
+            'most_missing_skills': most_missing
+        }
+
+def _build_base(catalog, version: int) -> SkillMatrix:
+    """Build or attach to the shared base matrix for a catalog version."""
+    from skill_matcher import get_skill_matcher
+
+    matcher = get_skill_matcher()
+    vocabulary = matcher.skills
+    arrays = load_or_build(
+        f"skill_matrix-{catalog.catalog_id()}",
+        f"v{version}-m{SKILL_MATRIX_VERSION}-{matcher.digest}",
+        lambda: SkillMatrix.build_arrays(catalog.iter_jobs(), vocabulary)
+    )
+    return SkillMatrix(arrays, version, vocabulary)
+
+_snapshots = CatalogSnapshots('skill matrix', _build_base, SkillMatrix.apply_delta)
+
+def get_skill_matrix(catalog=None) -> SkillMatrix:
+    """
+    Get the skill matrix snapshot for the current version of a catalog
+    (the default catalog if none is given).
+
+    Catalog writes are applied as deltas to a shared base matrix, which is
+    rebuilt once the delta grows large; see catalog_snapshot.
+    """
+    if catalog is None:
+        from job_catalog import job_catalog as catalog
+
+    return _snapshots.get(catalog)
@@ -0,0 +1,99 @@
+"""
+Startup warm-up and timing report for SkillSnap.
+
+warm_up() is called once in the gunicorn master when preload_app is enabled
+(see gunicorn.conf.py), so forked workers inherit a ready job catalog,
+semantic index, skill matcher, skill matrix and provider SDKs instead of
+building them on their first request. The semantic index and skill matrix are
+memory-mapped from CATALOG_ARRAYS_DIR, so their pages stay shared even as
+workers touch them.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+WARM_SEMANTIC_INDEX = os.getenv('WARM_SEMANTIC_INDEX', 'true').lower() == 'true'
+WARM_SKILL_MATRIX = os.getenv('WARM_SKILL_MATRIX', 'true').lower() == 'true'
+WARM_LLM_PROVIDERS = os.getenv('WARM_LLM_PROVIDERS', 'true').lower() == 'true'
+
+SAMPLE_RESUME = "Software engineer skilled in Python, SQL, Docker and machine learning."
+
+_report: Dict[str, Any] = {
+    'stages': {},
+    'warmed': False,
+    'worker_ready_seconds': None
+}
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record the duration of a startup stage, in seconds."""
+    _report['stages'][name] = round(seconds, 4)
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    """Time a startup stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Build shared state ahead of the first request.
+
+    Returns:
+        The startup report
+    """
+    from job_catalog import job_catalog
+    from ml_utils import get_resume_profile
+    from semantic_index import get_semantic_index
+    from services.llm_handler import llm_handler
+    from skill_matcher import get_skill_matcher
+    from skill_matrix import get_skill_matrix
+
+    with timed_stage('job_catalog'):
+        _report['catalog_jobs'] = job_catalog.count()
+
+    with timed_stage('skill_matcher'):
+        get_skill_matcher()
+        get_resume_profile(SAMPLE_RESUME)
+
+    if WARM_SEMANTIC_INDEX:
+        with timed_stage('semantic_index'):
+            get_semantic_index()
+
+    if WARM_SKILL_MATRIX:
+        with timed_stage('skill_matrix'):
+            get_skill_matrix()
+
+    if WARM_LLM_PROVIDERS:
+        with timed_stage('llm_providers'):
+            try:
+                _report['llm_providers'] = llm_handler.warm_up()
+            except Exception as e:
+                logger.warning(f"Failed to warm LLM providers: {str(e)}")
+
+    _report['warmed'] = True
+    logger.info(f"Warm-up complete: {format_report()}")
+    return get_startup_report()
+
+def record_worker_ready(seconds: float) -> None:
+    """Record how long a forked worker took to become ready to serve."""
+    _report['worker_ready_seconds'] = round(seconds, 4)
+
+def get_startup_report() -> Dict[str, Any]:
+    """Get a copy of the startup timing report."""
+    report = dict(_report)
+    report['stages'] = dict(_report['stages'])
+    report['pid'] = os.getpid()
+    return report
+
+def format_report() -> str:
+    """Format stage timings for logging."""
+    return ', '.join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in _report['stages'].items())
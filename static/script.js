@@ -3,7 +3,45 @@ let extractedResumeText = '';
 // Use current domain for API calls, works both locally and when deployed
 const API_BASE_URL = window.location.origin + '/api';
 
+// Responses cached by request, revalidated with If-None-Match
+const responseCache = new Map();
+const RESPONSE_CACHE_LIMIT = 50;
+
 // Utility Functions
+
+// POST JSON and reuse the cached response when the server answers 304
+async function cachedPostJSON(path, payload) {
+    const body = JSON.stringify(payload);
+    const cacheKey = `${path}:${body}`;
+    const cached = responseCache.get(cacheKey);
+
+    const headers = { 'Content-Type': 'application/json' };
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+
+    const response = await fetch(`${API_BASE_URL}/${path}`, {
+        method: 'POST',
+        headers: headers,
+        body: body
+    });
+
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        responseCache.delete(cacheKey);
+        responseCache.set(cacheKey, { etag: etag, data: data });
+        if (responseCache.size > RESPONSE_CACHE_LIMIT) {
+            responseCache.delete(responseCache.keys().next().value);
+        }
+    }
+    return data;
+}
+
 function showAlert(message, type = 'success') {
     const alertContainer = document.getElementById('alertContainer');
     const alertId = 'alert-' + Date.now();
@@ -176,18 +214,10 @@ async function recommendJobs() {
     showLoading('jobRecommendations');
 
     try {
-        const response = await fetch(`${API_BASE_URL}/recommend_jobs`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                resume_text: extractedResumeText
-            })
+        const data = await cachedPostJSON('recommend_jobs', {
+            resume_text: extractedResumeText
         });
 
-        const data = await response.json();
-
         if (data.success) {
             displayJobRecommendations(data.recommendations);
             showAlert(`Found ${data.total_recommendations} job recommendations!`);
@@ -300,7 +330,7 @@ function displayLLMJobRecommendations(llmAnalysis) {
             <div class="mb-3">
                 <h6><i class="fas fa-check-circle text-success me-2"></i>Strengths:</h6>
                 <ul class="mb-2">
-                    ${job.strengths.map(strength => `<li>${strength}</li>`).join('')}
+                    ${(job.strengths || []).map(strength => `<li>${strength}</li>`).join('')}
                 </ul>
             </div>
             
@@ -316,7 +346,7 @@ function displayLLMJobRecommendations(llmAnalysis) {
             <div class="mb-3">
                 <h6><i class="fas fa-lightbulb text-info me-2"></i>Why this match:</h6>
                 <ul class="mb-2">
-                    ${job.reasons.map(reason => `<li>${reason}</li>`).join('')}
+                    ${(job.reasons || []).map(reason => `<li>${reason}</li>`).join('')}
                 </ul>
             </div>
             
@@ -356,19 +386,11 @@ async function analyzeSkillGap() {
     showLoading('skillGapResults');
 
     try {
-        const response = await fetch(`${API_BASE_URL}/skill_gap`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                resume_text: extractedResumeText,
-                job_description: jobDescription
-            })
+        const data = await cachedPostJSON('skill_gap', {
+            resume_text: extractedResumeText,
+            job_description: jobDescription
         });
 
-        const data = await response.json();
-
         if (data.success) {
             displaySkillGapResults(data.analysis);
             showAlert('Skill gap analysis completed!');
@@ -478,7 +500,7 @@ function displayLLMSkillGapResults(llmAnalysis) {
                             <div class="mt-2">
                                 <strong>Improvement suggestions:</strong>
                                 <ul class="mb-0">
-                                    ${skill.improvement_suggestions.map(suggestion => `<li>${suggestion}</li>`).join('')}
+                                    ${(skill.improvement_suggestions || []).map(suggestion => `<li>${suggestion}</li>`).join('')}
                                 </ul>
                             </div>
                         </div>
@@ -508,7 +530,7 @@ function displayLLMSkillGapResults(llmAnalysis) {
                             <div class="mt-2">
                                 <strong>Suggestions:</strong>
                                 <ul class="mb-0">
-                                    ${gap.suggestions.map(suggestion => `<li>${suggestion}</li>`).join('')}
+                                    ${(gap.suggestions || []).map(suggestion => `<li>${suggestion}</li>`).join('')}
                                 </ul>
                             </div>
                         </div>
@@ -634,7 +656,7 @@ function displayResumeImproveResults(llmAnalysis) {
                             <div class="mb-3">
                                 <strong>Suggestions:</strong>
                                 <ul class="text-info small">
-                                    ${section.suggestions.map(suggestion => `<li>${suggestion}</li>`).join('')}
+                                    ${(section.suggestions || []).map(suggestion => `<li>${suggestion}</li>`).join('')}
                                 </ul>
                             </div>
                             
@@ -0,0 +1,204 @@
+"""
+Per-tenant job catalogs for SkillSnap.
+
+Each tenant (client company) has its own catalog database,
+TENANT_CATALOG_DIR/<tenant>.db, with the same schema, versioning and change
+log as the default catalog. Requests without a tenant use the default
+catalog (JOB_CATALOG_DB, seeded from sample_jobs.json).
+
+A worker opens a tenant's catalog on its first request for that tenant, and
+the catalog's indexes (semantic index, skill matrix) are built or attached
+by the first request that needs them. Open catalogs are kept in an LRU
+bounded by count (TENANT_CACHE_SIZE) and by the size of their loaded indexes
+(TENANT_INDEX_MEMORY_MB). Evicting a tenant drops its connections and index
+snapshots once in-flight requests finish with them. Reloading it reopens the
+database and maps the index arrays already published in CATALOG_ARRAYS_DIR,
+so a cold tenant costs a rebuild only if its catalog changed meanwhile.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from catalog_snapshot import index_bytes
+from job_catalog import JobCatalog, JobCatalogError, job_catalog
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TENANT_CATALOG_DIR = os.getenv('TENANT_CATALOG_DIR', 'tenant_catalogs')
+# Tenant catalogs kept open per worker
+TENANT_CACHE_SIZE = int(os.getenv('TENANT_CACHE_SIZE', '256'))
+# Size of the indexes loaded for open tenants, per worker, before the least
+# recently used tenants are evicted. Memory-mapped arrays count in full,
+# though their pages are shared between workers.
+TENANT_INDEX_MEMORY_MB = float(os.getenv('TENANT_INDEX_MEMORY_MB', '512'))
+
+DEFAULT_TENANT = 'default'
+TENANT_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+class UnknownTenantError(JobCatalogError):
+    """The tenant has no job catalog."""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        super().__init__(f"Unknown tenant '{tenant_id}'")
+
+def validate_tenant_id(tenant_id: Optional[str]) -> str:
+    """
+    Get the tenant ID to use, the default tenant if none is given.
+
+    Raises:
+        JobCatalogError: If the ID is not 1-64 letters, digits, '_' or '-'
+    """
+    if not tenant_id:
+        return DEFAULT_TENANT
+    if not TENANT_ID_PATTERN.match(tenant_id):
+        raise JobCatalogError("Tenant ID must be 1-64 letters, digits, '_' or '-'")
+    return tenant_id
+
+class TenantCatalogs:
+    """LRU of open tenant catalogs, with per-tenant usage statistics."""
+
+    def __init__(self, directory: str = TENANT_CATALOG_DIR, default: JobCatalog = job_catalog,
+                 max_tenants: int = TENANT_CACHE_SIZE, max_index_mb: float = TENANT_INDEX_MEMORY_MB):
+        self.directory = directory
+        self.default = default
+        self.max_tenants = max_tenants
+        self.max_index_bytes = int(max_index_mb * 1024 * 1024)
+        self._open: 'OrderedDict[str, JobCatalog]' = OrderedDict()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._counters = {'hits': 0, 'loads': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def path(self, tenant_id: str) -> str:
+        return os.path.join(self.directory, f"{tenant_id}.db")
+
+    def exists(self, tenant_id: Optional[str]) -> bool:
+        tenant_id = validate_tenant_id(tenant_id)
+        return tenant_id == DEFAULT_TENANT or os.path.exists(self.path(tenant_id))
+
+    def get(self, tenant_id: Optional[str], create: bool = False) -> JobCatalog:
+        """
+        Get a tenant's catalog, opening it if it isn't open in this worker.
+
+        Args:
+            tenant_id: Tenant ID, or None for the default catalog
+            create: Create an empty catalog for a new tenant
+
+        Raises:
+            JobCatalogError: If the tenant ID is invalid
+            UnknownTenantError: If the tenant has no catalog and create is False
+        """
+        tenant_id = validate_tenant_id(tenant_id)
+        if tenant_id == DEFAULT_TENANT:
+            self._touch(tenant_id, loaded=False)
+            return self.default
+
+        with self._lock:
+            catalog = self._open.get(tenant_id)
+            if catalog is not None:
+                self._open.move_to_end(tenant_id)
+                self._counters['hits'] += 1
+        if catalog is not None:
+            self._touch(tenant_id, loaded=False)
+            # Indexes are built after a catalog opens, so the total can grow on hits too
+            self._evict(keep=tenant_id)
+            return catalog
+
+        path = self.path(tenant_id)
+        if not create and not os.path.exists(path):
+            raise UnknownTenantError(tenant_id)
+        os.makedirs(self.directory, exist_ok=True)
+
+        with self._lock:
+            catalog = self._open.get(tenant_id)
+            if catalog is None:
+                catalog = JobCatalog(path, seed_path=None)
+                self._open[tenant_id] = catalog
+                self._counters['loads'] += 1
+                loaded = True
+            else:
+                self._open.move_to_end(tenant_id)
+                loaded = False
+        self._touch(tenant_id, loaded=loaded)
+        self._evict(keep=tenant_id)
+        return catalog
+
+    def _touch(self, tenant_id: str, loaded: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tenant_id, {'requests': 0, 'loads': 0, 'evictions': 0, 'last_used': None})
+            stats['requests'] += 1
+            stats['loads'] += int(loaded)
+            stats['last_used'] = time.time()
+
+    def _evict(self, keep: str) -> None:
+        """Close least recently used tenants until the open ones fit both limits."""
+        with self._lock:
+            sizes = {tenant_id: sum(index_bytes(catalog).values()) for tenant_id, catalog in self._open.items()}
+            total = sum(sizes.values())
+            for tenant_id in list(self._open):
+                if len(self._open) <= self.max_tenants and total <= self.max_index_bytes:
+                    break
+                if tenant_id == keep:
+                    continue
+                del self._open[tenant_id]
+                total -= sizes[tenant_id]
+                self._counters['evictions'] += 1
+                self._stats[tenant_id]['evictions'] += 1
+                logger.info(f"Evicted tenant catalog '{tenant_id}' ({sizes[tenant_id] / 1048576:.1f}MB of indexes)")
+
+    def evict(self, tenant_id: str) -> bool:
+        """Close a tenant's catalog in this worker. Returns False if it wasn't open."""
+        with self._lock:
+            if self._open.pop(tenant_id, None) is None:
+                return False
+            self._counters['evictions'] += 1
+            self._stats[tenant_id]['evictions'] += 1
+            return True
+
+    def tenant_stats(self, tenant_id: str) -> Dict[str, Any]:
+        """Usage of a tenant in this worker, and its catalog and index sizes if it is open."""
+        tenant_id = validate_tenant_id(tenant_id)
+        with self._lock:
+            stats = dict(self._stats.get(tenant_id, {'requests': 0, 'loads': 0, 'evictions': 0, 'last_used': None}))
+            catalog = self.default if tenant_id == DEFAULT_TENANT else self._open.get(tenant_id)
+        stats['open'] = catalog is not None
+        if catalog is not None:
+            indexes = index_bytes(catalog)
+            stats.update(
+                jobs=catalog.count(),
+                catalog_version=catalog.version(),
+                index_mb={name: round(size / 1048576, 2) for name, size in indexes.items()}
+            )
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """LRU occupancy and counters for this worker, and usage per tenant seen."""
+        with self._lock:
+            open_tenants = list(self._open.items())
+            tenants = {tenant_id: dict(stats) for tenant_id, stats in self._stats.items()}
+            counters = dict(self._counters)
+        index_total = 0
+        for tenant_id, catalog in open_tenants:
+            size = sum(index_bytes(catalog).values())
+            index_total += size
+            tenants[tenant_id]['index_mb'] = round(size / 1048576, 2)
+        for tenant_id, stats in tenants.items():
+            stats['open'] = tenant_id == DEFAULT_TENANT or 'index_mb' in stats
+        return {
+            'pid': os.getpid(),
+            'open_tenants': len(open_tenants),
+            'max_tenants': self.max_tenants,
+            'index_mb': round(index_total / 1048576, 2),
+            'max_index_mb': round(self.max_index_bytes / 1048576, 2),
+            **counters,
+            'tenants': tenants
+        }
+
+# Global registry of tenant catalogs
+tenant_catalogs = TenantCatalogs()
@@ -0,0 +1,97 @@
+"""
+Test settings. The modules under test read their storage paths when they are
+imported, so these point every cache, catalog and store at a temporary
+directory before any test module imports them, keeping test runs apart from
+each other and from a development checkout.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix='skillsnap-tests-')
+
+os.environ.update({
+    'CACHE_BACKEND': 'memory',
+    'CACHE_DB': os.path.join(TEST_DATA_DIR, 'cache.db'),
+    'LLM_QUOTA_DB': os.path.join(TEST_DATA_DIR, 'quotas.db'),
+    'JOB_CATALOG_DB': os.path.join(TEST_DATA_DIR, 'job_catalog.db'),
+    'JOB_PROFILE_DB': os.path.join(TEST_DATA_DIR, 'job_profiles.db'),
+    'CATALOG_ARRAYS_DIR': os.path.join(TEST_DATA_DIR, 'catalog_arrays'),
+    'TENANT_CATALOG_DIR': os.path.join(TEST_DATA_DIR, 'tenant_catalogs'),
+    'LLM_LOCAL_BATCH_DIR': os.path.join(TEST_DATA_DIR, 'local_batches'),
+    'CPU_POOL_WORKERS': '0'
+})
+
+# Imported once the settings above are in place
+from services.llm_handler import LLMProvider, llm_handler, record_usage  # noqa: E402
+
+@pytest.fixture(scope='session', autouse=True)
+def test_data_dir():
+    yield TEST_DATA_DIR
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
+
+# Canned replies keyed by a field the prompt's expected JSON format asks for
+STUB_REPLIES = {
+    '"matches"': {
+        'matches': [{'job_title': 'DevOps Engineer', 'score': 80, 'reasons': ['Kubernetes'],
+                     'strengths': ['Docker'], 'concerns': []}],
+        'analysis_summary': 'Strong infrastructure background'
+    },
+    '"missing_skills"': {
+        'missing_skills': [{'skill': 'go', 'importance': 'high', 'description': 'Required',
+                            'improvement_suggestions': ['Build a small service in Go']}],
+        'experience_gaps': [],
+        'overall_assessment': 'Close fit',
+        'priority_improvements': ['go']
+    },
+    '"section_analysis"': {
+        'overall_assessment': 'Solid', 'section_analysis': [], 'keyword_optimization': [],
+        'action_items': [], 'priority_score': 70
+    }
+}
+
+class StubProvider(LLMProvider):
+    """
+    LLM provider answering from its replies or STUB_REPLIES, optionally after
+    a delay or with an error.
+    """
+
+    api_key = 'test-key'
+
+    def __init__(self, model: str = 'stub-large', fast_model: str = None):
+        self.model = model
+        self.fast_model = fast_model
+        self.delay = 0.0
+        self.error = None
+        self.replies = {}
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    async def generate_response(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        record_usage(kwargs.get('usage'), len(prompt) // 4, 100)
+        for field, reply in {**STUB_REPLIES, **self.replies}.items():
+            if field in prompt:
+                # A reply may depend on the model the request was routed to
+                return json.dumps(reply(kwargs.get('model')) if callable(reply) else reply)
+        return json.dumps({'technical_skills': []})
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Serve every LLM call from a StubProvider instead of a real provider."""
+    stub = StubProvider()
+    monkeypatch.setattr(llm_handler, 'providers', {'openai': stub})
+    monkeypatch.setattr(llm_handler, 'preferred_provider', 'openai')
+    monkeypatch.setattr(llm_handler, 'fallback_order', ['openai'])
+    return stub
@@ -0,0 +1,33 @@
+"""Regression tests for the admin token guarding tenant creation and admin endpoints."""
+
+import os
+
+import pytest
+
+import routes
+from app import app
+from tenant_catalogs import tenant_catalogs
+
+JOB = {'title': 'Backend Engineer', 'description': 'Python services'}
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenant_catalogs, 'directory', str(tmp_path))
+    return app.test_client()
+
+def test_tenants_not_created_without_token(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(routes, 'JOB_CATALOG_ADMIN_TOKEN', '')
+    monkeypatch.setattr(routes, 'JOB_CATALOG_OPEN_WRITES', True)
+    response = client.post('/api/jobs', json=JOB, headers={routes.TENANT_HEADER: 'acme'})
+    assert response.status_code == 404
+    assert os.listdir(tmp_path) == []
+    assert client.get('/api/admin/tenants').status_code == 401
+
+def test_tenants_created_with_token(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(routes, 'JOB_CATALOG_ADMIN_TOKEN', 's3cret')
+    headers = {routes.TENANT_HEADER: 'acme'}
+    assert client.post('/api/jobs', json=JOB, headers=headers).status_code == 404
+    headers['Authorization'] = 'Bearer s3cret'
+    assert client.post('/api/jobs', json=JOB, headers=headers).status_code == 201
+    assert (tmp_path / 'acme.db').exists()
+    assert client.get('/api/admin/tenants', headers=headers).status_code == 200
@@ -0,0 +1,65 @@
+"""Tests for admission control and load shedding of expensive endpoints."""
+
+import threading
+import time
+
+import pytest
+
+from app import app
+from utils.admission import MAX_RETRY_AFTER, Overloaded, WorkloadClass, workload_classes
+
+def test_full_queue_is_shed():
+    workload = WorkloadClass('test', max_concurrent=1, max_queue=0, max_wait=1.0)
+    workload.acquire()
+    with pytest.raises(Overloaded) as shed:
+        workload.acquire()
+    assert shed.value.reason == 'queue_full'
+    assert workload.stats()['shed'] == {'queue_full': 1, 'queue_timeout': 0}
+
+def test_queued_request_times_out():
+    workload = WorkloadClass('test', max_concurrent=1, max_queue=1, max_wait=0.05)
+    workload.acquire()
+    with pytest.raises(Overloaded) as shed:
+        workload.acquire()
+    assert shed.value.reason == 'queue_timeout'
+    assert workload.stats()['queued'] == 0
+
+def test_queued_request_gets_released_slot():
+    workload = WorkloadClass('test', max_concurrent=1, max_queue=1, max_wait=5.0)
+    workload.acquire()
+    waited = []
+    waiter = threading.Thread(target=lambda: waited.append(workload.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    assert workload.stats()['queued'] == 1
+    workload.release(0.1)
+    waiter.join(5)
+    assert waited and waited[0] > 0
+    assert workload.stats()['active'] == 1
+
+def test_retry_after_follows_service_time():
+    workload = WorkloadClass('test', max_concurrent=2, max_queue=4, max_wait=1.0)
+    assert workload.retry_after() == 1
+    workload.acquire()
+    workload.release(10.0)
+    assert workload.retry_after() == 5
+    workload.acquire()
+    workload.release(1000.0)
+    assert workload.retry_after() == MAX_RETRY_AFTER
+
+def test_saturated_endpoint_returns_503(monkeypatch, stub_llm):
+    llm = workload_classes['llm']
+    monkeypatch.setattr(llm, 'max_concurrent', 1)
+    monkeypatch.setattr(llm, 'max_queue', 0)
+    client = app.test_client()
+    llm.acquire()
+    try:
+        response = client.post('/api/llm_job_match', json={'resume_text': 'Python developer'})
+        assert response.status_code == 503
+        assert response.get_json()['reason'] == 'queue_full'
+        assert int(response.headers['Retry-After']) >= 1
+        # Endpoints outside the class are not held up
+        assert client.get('/api/health').status_code == 200
+    finally:
+        llm.release(0.0)
+    assert client.post('/api/llm_job_match', json={'resume_text': 'Python developer'}).status_code == 200
@@ -0,0 +1,105 @@
+"""Tests for checkpointed offline batch scoring."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import batch_scoring
+from services import llm_handler as llm_handler_module
+from services.llm_handler import OpenAIProvider, llm_handler
+from services.llm_preflight import token_ledger
+
+RESUMES = {
+    'ada': 'Python developer building Flask APIs on PostgreSQL',
+    'grace': 'Frontend engineer with React, TypeScript and CSS',
+    'linus': 'Linux kernel and C systems programmer, Git maintainer'
+}
+
+@pytest.fixture
+def run(tmp_path):
+    source = tmp_path / 'resumes.jsonl'
+    source.write_text(''.join(json.dumps({'id': key, 'resume_text': text}) + '\n' for key, text in RESUMES.items()))
+    output = tmp_path / 'scores.jsonl'
+
+    def run(*extra):
+        return batch_scoring.main([
+            '--input', str(source), '--output', str(output), '--mode', 'batch', '--backend', 'local',
+            '--batch-size', '2', '--poll-interval', '0', '--local-batch-dir', str(tmp_path / 'batches'), *extra
+        ])
+
+    run.output = output
+    run.checkpoint = batch_scoring.Checkpoint(f"{output}.checkpoint.db")
+    return run
+
+def written_ids(path):
+    return [json.loads(line)['id'] for line in path.read_text().splitlines()]
+
+def test_scores_every_resume_once(run):
+    assert run() == 0
+    assert sorted(written_ids(run.output)) == sorted(RESUMES)
+    record = json.loads(run.output.read_text().splitlines()[0])
+    assert record['result']['matches']
+    # Rerunning a finished checkpoint writes nothing new
+    assert run() == 0
+    assert len(written_ids(run.output)) == len(RESUMES)
+
+def test_resumes_after_partial_write(run):
+    assert run() == 0
+    lines = run.output.read_text().splitlines(keepends=True)
+    # As if the run died while writing the second result, before any was checkpointed
+    run.output.write_text(lines[0] + lines[1][:len(lines[1]) // 2])
+    run.checkpoint.conn.execute("UPDATE items SET status = 'pending'")
+
+    assert run() == 0
+    ids = written_ids(run.output)
+    assert sorted(ids) == sorted(RESUMES)
+    assert ids[0] == json.loads(lines[0])['id']
+
+def test_collects_batches_submitted_before_a_crash(run, monkeypatch):
+    submitted = []
+    submit = batch_scoring.BatchScorer.submit_batch
+
+    def submit_then_crash(self, backend):
+        if submitted:
+            raise KeyboardInterrupt
+        submitted.append(submit(self, backend))
+        return True
+
+    monkeypatch.setattr(batch_scoring.BatchScorer, 'submit_batch', submit_then_crash)
+    with pytest.raises(KeyboardInterrupt):
+        run()
+    assert run.checkpoint.counts() == {'submitted': 2, 'pending': 1}
+
+    monkeypatch.setattr(batch_scoring.BatchScorer, 'submit_batch', submit)
+    assert run() == 0
+    assert sorted(written_ids(run.output)) == sorted(RESUMES)
+
+def test_batch_requests_use_task_model_tier(tmp_path, monkeypatch):
+    uploads = []
+    client = SimpleNamespace(
+        files=SimpleNamespace(create=lambda file, purpose: uploads.append(file[1].read()) or SimpleNamespace(id='f1')),
+        batches=SimpleNamespace(create=lambda **kwargs: SimpleNamespace(id='batch-1'))
+    )
+    provider = OpenAIProvider()
+    provider.api_key, provider.model, provider.fast_model, provider.client = 'key', 'gpt-4', 'gpt-4o-mini', client
+    monkeypatch.setattr(llm_handler, 'providers', {'openai': provider})
+    monkeypatch.setattr(llm_handler, 'preferred_provider', 'openai')
+    monkeypatch.setitem(llm_handler_module.TASK_TIERS, 'job_matching', 'fast')
+
+    source = tmp_path / 'resumes.jsonl'
+    source.write_text(json.dumps({'id': 'ada', 'resume_text': RESUMES['ada']}) + '\n')
+    args = batch_scoring.parse_args(['--input', str(source), '--output', str(tmp_path / 'out.jsonl'),
+                                     '--mode', 'batch', '--backend', 'openai'])
+    checkpoint = batch_scoring.Checkpoint(str(tmp_path / 'checkpoint.db'))
+    checkpoint.add_items(batch_scoring.ResumeSource(str(source)).items())
+    writer = batch_scoring.ResultWriter(args.output)
+    scorer = batch_scoring.BatchScorer(batch_scoring.ResumeSource(str(source)), checkpoint, writer, args,
+                                       batch_scoring.tenant_catalogs.get(None))
+
+    assert scorer.submit_batch(batch_scoring.get_batch_backend('openai'))
+    [line] = uploads[0].decode('utf-8').splitlines()
+    assert json.loads(line)['body']['model'] == 'gpt-4o-mini'
+    [entry] = token_ledger.client_usage(batch_scoring.BATCH_CLIENT)['recent_requests']
+    assert entry['model'] == 'gpt-4o-mini'
+    writer.close()
@@ -0,0 +1,107 @@
+"""Tests for versioned catalog index snapshots and their delta segments."""
+
+import gc
+
+import pytest
+
+import catalog_snapshot
+from catalog_snapshot import CatalogSnapshots, load_delta
+from job_catalog import JobCatalog
+
+class TitleIndex:
+    """Minimal index snapshot: the titles of the catalog's jobs."""
+
+    def __init__(self, titles, version, base=None):
+        self.titles = titles
+        self.version = version
+        self.base = base or self
+        self.nbytes = len(titles)
+
+    def __len__(self):
+        return len(self.titles)
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = JobCatalog(str(tmp_path / 'jobs.db'), seed_path=None)
+    catalog.import_jobs([{'title': f'Job {i}', 'description': 'Python'} for i in range(10)])
+    return catalog
+
+@pytest.fixture
+def index():
+    builds = []
+
+    def build_base(catalog, version):
+        builds.append(version)
+        return TitleIndex({job['id']: job['title'] for job in catalog.iter_jobs()}, version)
+
+    def apply_delta(base, delta):
+        titles = {job_id: title for job_id, title in base.titles.items() if job_id not in delta.removed_ids}
+        titles.update({job['id']: job['title'] for job in delta.jobs})
+        return TitleIndex(titles, delta.version, base)
+
+    snapshots = CatalogSnapshots('titles', build_base, apply_delta)
+    snapshots.builds = builds
+    return snapshots
+
+def test_load_delta(catalog):
+    start = catalog.version()
+    added = catalog.add_job({'title': 'New', 'description': 'Go'})
+    catalog.update_job(1, {'title': 'Renamed'})
+    catalog.delete_job(2)
+
+    delta = load_delta(catalog, start)
+    assert delta.version == catalog.version()
+    assert sorted(job['title'] for job in delta.jobs) == ['New', 'Renamed']
+    assert delta.removed_ids == {1, 2, added['id']}
+    assert len(delta) == 3
+
+def test_writes_are_applied_as_deltas(catalog, index):
+    first = index.get(catalog)
+    assert index.get(catalog) is first
+
+    catalog.update_job(1, {'title': 'Renamed'})
+    catalog.delete_job(2)
+    current = index.get(catalog)
+    assert current.version == catalog.version()
+    assert current.base is first
+    assert current.titles[1] == 'Renamed' and 2 not in current.titles
+    # The previous snapshot is left as it was for requests still using it
+    assert first.titles[1] == 'Job 0'
+    assert index.builds == [first.version]
+
+def test_large_delta_merges_into_new_base(catalog, index, monkeypatch):
+    monkeypatch.setattr(catalog_snapshot, 'DELTA_MERGE_MIN_JOBS', 2)
+    first = index.get(catalog)
+    catalog.update_job(1, {'title': 'A'})
+    catalog.update_job(2, {'title': 'B'})
+    assert index.get(catalog).base is first
+
+    catalog.update_job(3, {'title': 'C'})
+    merged = index.get(catalog)
+    assert merged.base is merged
+    assert index.builds == [first.version, merged.version]
+    # Later writes are deltas on the new base
+    catalog.update_job(4, {'title': 'D'})
+    assert index.get(catalog).base is merged
+
+def test_replaced_catalog_rebuilds(catalog, index):
+    index.get(catalog)
+    catalog.import_jobs([{'title': 'Only', 'description': 'Rust'}], replace=True)
+    current = index.get(catalog)
+    assert current.base is current
+    assert list(current.titles.values()) == ['Only']
+
+def test_readers_get_previous_snapshot_during_build(catalog, index):
+    first = index.get(catalog)
+    catalog.add_job({'title': 'New', 'description': 'Go'})
+    with index._stores[catalog]._lock:
+        assert index.get(catalog) is first
+    assert index.get(catalog).version == catalog.version()
+
+def test_snapshots_released_with_catalog(tmp_path, index):
+    catalog = JobCatalog(str(tmp_path / 'other.db'), seed_path=None)
+    index.get(catalog)
+    assert catalog_snapshot.index_bytes(catalog) == {'titles': 0}
+    del catalog
+    gc.collect()
+    assert len(index._stores) == 0
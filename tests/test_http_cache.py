@@ -0,0 +1,70 @@
+"""Tests for ETag revalidation of analysis endpoints."""
+
+import pytest
+
+import ml_utils
+import semantic_index
+import skill_matcher
+from app import app
+from job_catalog import job_catalog
+from ml_utils import SKILLS_DB
+from skill_matcher import ALIASES, SkillMatcher
+from utils.http_cache import compute_etag
+
+RESUME = 'Python developer with Docker, Kubernetes and PostgreSQL experience'
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+def test_unchanged_request_revalidates(client):
+    body = {'resume_text': RESUME, 'job_description': 'We need Python, Go and Kafka'}
+    first = client.post('/api/skill_gap', json=body)
+    assert first.status_code == 200
+    again = client.post('/api/skill_gap', json=body, headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+@pytest.mark.parametrize('retrieval', ['keyword', 'semantic'])
+def test_recommendation_etag_matches_version_served(client, retrieval):
+    response = client.post('/api/recommend_jobs', json={'resume_text': RESUME, 'retrieval': retrieval})
+    version = response.get_json()['catalog_version']
+    expected = compute_etag('recommend_jobs', RESUME, retrieval, job_catalog.snapshot_key(version))
+    assert response.headers['ETag'] == f'"{expected}"'
+
+def test_trailing_semantic_index_is_not_tagged_with_newer_version(client):
+    semantic_index.get_semantic_index(job_catalog)
+    job_catalog.add_job({'title': 'Data Engineer', 'description': 'Python and Kafka pipelines'})
+    store = semantic_index._snapshots._stores[job_catalog]
+    # As while another request builds the next snapshot: this one is served the previous one
+    with store._lock:
+        response = client.post('/api/recommend_jobs', json={'resume_text': RESUME, 'retrieval': 'semantic'})
+    version = response.get_json()['catalog_version']
+    assert version < job_catalog.version()
+    expected = compute_etag('recommend_jobs', RESUME, 'semantic', job_catalog.snapshot_key(version))
+    assert response.headers['ETag'] == f'"{expected}"'
+
+def test_recommendation_etag_changes_with_catalog(client):
+    first = client.post('/api/recommend_jobs', json={'resume_text': RESUME, 'retrieval': 'keyword'})
+    job_catalog.add_job({'title': 'Platform Engineer', 'description': 'Kubernetes and Python tooling'})
+    again = client.post('/api/recommend_jobs', json={'resume_text': RESUME, 'retrieval': 'keyword'},
+                        headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 200
+    assert again.get_json()['catalog_version'] > first.get_json()['catalog_version']
+
+def test_skill_gap_etag_changes_with_vocabulary(client, monkeypatch):
+    body = {'resume_text': RESUME, 'job_description': 'We need Python and Ansible'}
+    first = client.post('/api/skill_gap', json=body)
+    assert 'ansible' not in first.get_json()['analysis']
+
+    monkeypatch.setattr(skill_matcher, '_matcher', SkillMatcher(list(SKILLS_DB) + ['ansible'], ALIASES))
+    again = client.post('/api/skill_gap', json=body, headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 200
+    assert again.headers['ETag'] != first.headers['ETag']
+
+def test_resume_profiles_not_reused_across_vocabularies(monkeypatch):
+    before = ml_utils.get_resume_profile(RESUME + ' and Ansible')
+    assert 'ansible' not in before.matched_skills
+    assert ml_utils.get_resume_profile(RESUME + ' and Ansible') is before
+
+    monkeypatch.setattr(skill_matcher, '_matcher', SkillMatcher(list(SKILLS_DB) + ['ansible'], ALIASES))
+    assert 'ansible' in ml_utils.get_resume_profile(RESUME + ' and Ansible').matched_skills
@@ -0,0 +1,83 @@
+"""Tests for re-analyzing only the resume sections edited since the last analysis."""
+
+import asyncio
+
+import pytest
+
+from services import llm_incremental
+from services.llm_incremental import merge_skill_gap
+from services.llm_services import LLMSkillGapService
+
+JOB = 'Backend engineer: Python, Go, Kubernetes and PostgreSQL'
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY
+Backend engineer.
+
+EXPERIENCE
+Built Python services at Acme.
+
+SKILLS
+Python, Docker
+
+PROJECTS
+Open source CLI in Rust.
+
+EDUCATION
+BSc Computer Science
+"""
+
+@pytest.fixture(autouse=True)
+def clear_analyses():
+    llm_incremental._analysis_cache.clear()
+
+def analyze(resume):
+    return asyncio.run(LLMSkillGapService.analyze_skill_gap(resume, JOB))
+
+def test_merge_skill_gap():
+    previous = {
+        'missing_skills': [{'skill': 'Go'}, {'skill': 'Kubernetes'}],
+        'overall_assessment': 'Old',
+        'priority_improvements': ['Go']
+    }
+    update = {'resolved_skills': ['go'], 'missing_skills': [{'skill': 'PostgreSQL'}, {'skill': 'kubernetes'}],
+              'overall_assessment': 'New'}
+    merged = merge_skill_gap(previous, update)
+    assert [item['skill'] for item in merged['missing_skills']] == ['Kubernetes', 'PostgreSQL']
+    assert merged['overall_assessment'] == 'New'
+    assert merged['priority_improvements'] == ['Go']
+
+def test_only_edited_sections_are_sent(stub_llm):
+    first = analyze(RESUME)
+    assert first['reanalysis']['mode'] == 'full'
+    assert 'Open source CLI in Rust' in stub_llm.calls[0][0]
+
+    stub_llm.replies['"missing_skills"'] = {
+        'resolved_skills': ['go'],
+        'missing_skills': [{'skill': 'postgresql', 'importance': 'medium', 'description': 'Required',
+                            'improvement_suggestions': []}],
+        'experience_gaps': [],
+        'overall_assessment': 'Closer fit',
+        'priority_improvements': ['postgresql']
+    }
+    edited = analyze(RESUME.replace('Python, Docker', 'Python, Docker, Go'))
+    assert edited['reanalysis']['mode'] == 'incremental'
+    assert edited['reanalysis']['reanalyzed_sections'] == ['skills']
+    prompt = stub_llm.calls[1][0]
+    assert 'Python, Docker, Go' in prompt
+    assert 'Open source CLI in Rust' not in prompt
+    assert [item['skill'] for item in edited['missing_skills']] == ['postgresql']
+    assert edited['overall_assessment'] == 'Closer fit'
+
+def test_edits_to_unread_sections_need_no_call(stub_llm):
+    analyze(RESUME)
+    cached = analyze(RESUME.replace('Jane', 'Janet').replace('Backend engineer.', 'Senior backend engineer.'))
+    assert cached['reanalysis']['mode'] == 'cached'
+    assert len(stub_llm.calls) == 1
+
+def test_large_edits_trigger_full_analysis(stub_llm):
+    analyze(RESUME)
+    rewritten = RESUME.replace('Acme', 'Globex').replace('Rust', 'Zig').replace('Docker', 'Podman')
+    assert analyze(rewritten)['reanalysis']['mode'] == 'full'
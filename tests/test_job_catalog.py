@@ -0,0 +1,89 @@
+"""Tests for the SQLite job catalog, its FTS index and change log."""
+
+import pytest
+
+import routes
+from app import app
+from job_catalog import JobCatalog, JobCatalogError
+
+@pytest.fixture
+def catalog(tmp_path):
+    return JobCatalog(str(tmp_path / 'jobs.db'), seed_path=None)
+
+def test_seeded_once_from_json(tmp_path):
+    catalog = JobCatalog(str(tmp_path / 'jobs.db'), seed_path='sample_jobs.json')
+    seeded = catalog.count()
+    assert seeded > 0
+    assert JobCatalog(str(tmp_path / 'jobs.db'), seed_path='sample_jobs.json').count() == seeded
+
+def test_crud_keeps_search_index_in_step(catalog):
+    job = catalog.add_job({'title': 'Data Engineer', 'description': 'Spark and Airflow pipelines'})
+    assert [j['id'] for j in catalog.search(['airflow'])] == [job['id']]
+
+    catalog.update_job(job['id'], {'description': 'Kafka streaming'})
+    assert catalog.search(['airflow']) == []
+    assert catalog.search(['kafka'])[0]['title'] == 'Data Engineer'
+
+    assert catalog.delete_job(job['id'])
+    assert catalog.search(['kafka']) == []
+    assert catalog.get_job(job['id']) is None
+    assert not catalog.delete_job(job['id'])
+    assert catalog.update_job(job['id'], {'title': 'Gone'}) is None
+
+def test_prefix_search_and_ranking(catalog):
+    catalog.add_job({'title': 'Backend Engineer', 'description': 'Design REST APIs in Go'})
+    catalog.add_job({'title': 'API Platform Lead', 'description': 'Own public APIs and API gateways'})
+    catalog.add_job({'title': 'Designer', 'description': 'Figma'})
+    results = catalog.search(['api'])
+    assert [job['title'] for job in results] == ['API Platform Lead', 'Backend Engineer']
+
+def test_invalid_jobs_rejected(catalog):
+    with pytest.raises(JobCatalogError):
+        catalog.add_job({'title': 'No description'})
+    with pytest.raises(JobCatalogError):
+        catalog.add_job({'title': ' ', 'description': 'Blank title'})
+    with pytest.raises(JobCatalogError, match='Job 1'):
+        catalog.import_jobs([{'title': 'Ok', 'description': 'Fine'}, {'title': 'Bad'}])
+    assert catalog.count() == 0
+
+def test_every_write_bumps_version_and_logs_changes(catalog):
+    start = catalog.version()
+    first = catalog.add_job({'title': 'A', 'description': 'Python'})
+    second = catalog.add_job({'title': 'B', 'description': 'Go'})
+    catalog.update_job(first['id'], {'title': 'A2'})
+    catalog.delete_job(second['id'])
+    assert catalog.version() == start + 4
+
+    changes = catalog.changes_since(start)
+    assert changes == {'version': start + 4, 'upserted': {first['id']}, 'deleted': {second['id']}}
+    assert catalog.changes_since(start + 4)['upserted'] == set()
+
+def test_replacing_import_resets_change_log(catalog):
+    catalog.add_job({'title': 'A', 'description': 'Python'})
+    before = catalog.version()
+    assert catalog.import_jobs([{'title': 'B', 'description': 'Go'}], replace=True) == 1
+    # Indexes built before a full replacement have to be rebuilt
+    assert catalog.changes_since(before) is None
+    assert [job['title'] for job in catalog.list_jobs()] == ['B']
+
+def test_snapshot_keys_differ_between_catalogs(tmp_path):
+    first = JobCatalog(str(tmp_path / 'a.db'), seed_path=None)
+    second = JobCatalog(str(tmp_path / 'b.db'), seed_path=None)
+    assert first.version() == second.version()
+    assert first.snapshot_key(first.version()) != second.snapshot_key(second.version())
+
+def test_jobs_api_crud(monkeypatch):
+    monkeypatch.setattr(routes, 'JOB_CATALOG_ADMIN_TOKEN', 's3cret')
+    client = app.test_client()
+    headers = {'Authorization': 'Bearer s3cret'}
+
+    created = client.post('/api/jobs', json={'title': 'SRE', 'description': 'Terraform'}, headers=headers)
+    assert created.status_code == 201
+    job_id = created.get_json()['job']['id']
+    assert client.get(f'/api/jobs/{job_id}').get_json()['job']['title'] == 'SRE'
+
+    assert client.put(f'/api/jobs/{job_id}', json={'title': 'Site Reliability Engineer'},
+                      headers=headers).status_code == 200
+    assert client.post('/api/jobs', json={'title': 'No description'}, headers=headers).status_code == 400
+    assert client.delete(f'/api/jobs/{job_id}', headers=headers).status_code == 200
+    assert client.get(f'/api/jobs/{job_id}').status_code == 404
@@ -0,0 +1,29 @@
+"""Regression tests for rendering stored job profiles into cached job blocks."""
+
+import job_profiles
+from job_profiles import JobProfileStore, content_hash, with_profiles
+from utils.prompt_templates import PromptTemplates
+
+JOBS = [{'id': 1, 'title': 'Data Engineer', 'description': 'Build pipelines in Python and Spark.'}]
+
+def test_refined_profile_renders_new_block(tmp_path):
+    store = JobProfileStore(str(tmp_path / 'profiles.db'))
+    job_profiles._profile_cache.clear()
+    before = PromptTemplates.jobs_block(with_profiles(JOBS, store), 'catalog:1')
+
+    refined = {'skills': ['python', 'spark', 'airflow'], 'seniority': 'senior',
+               'domain': 'data', 'responsibilities': ['Build data pipelines']}
+    store.put_many([(content_hash(JOBS[0]), refined, 'llm:test')])
+    # As once the in-memory profile expires
+    job_profiles._profile_cache.clear()
+    after = PromptTemplates.jobs_block(with_profiles(JOBS, store), 'catalog:1')
+
+    assert after != before
+    assert 'airflow' in after
+
+def test_raw_and_profiled_blocks_are_cached_apart(tmp_path):
+    store = JobProfileStore(str(tmp_path / 'profiles.db'))
+    raw = PromptTemplates.jobs_block(JOBS, 'catalog:2')
+    profiled = PromptTemplates.jobs_block(with_profiles(JOBS, store), 'catalog:2')
+    assert 'Description:' in raw
+    assert 'Description:' not in profiled
@@ -0,0 +1,108 @@
+"""Tests for deadline-bounded LLM calls, their result cache and load shedding."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import app
+from services import llm_results
+from services.llm_results import parse_deadline, result_key, run_with_deadline
+from utils.admission import Overloaded
+
+def wait_until(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, 'timed out'
+        time.sleep(0.01)
+
+def test_parse_deadline(monkeypatch):
+    monkeypatch.setattr(llm_results, 'LLM_DEADLINE_SECONDS', 20.0)
+    monkeypatch.setattr(llm_results, 'MAX_DEADLINE_SECONDS', 60.0)
+    assert parse_deadline(None) == 20.0
+    assert parse_deadline('1500') == 1.5
+    assert parse_deadline('-5') == 0.0
+    assert parse_deadline('600000') == 60.0
+    with pytest.raises(ValueError):
+        parse_deadline('soon')
+
+def test_missed_deadline_finishes_in_background():
+    key = result_key('test', 'slow')
+    release = threading.Event()
+
+    async def call():
+        await asyncio.to_thread(release.wait)
+        return {'answer': 42}
+
+    assert run_with_deadline(key, call, 0.05) == (None, False)
+    release.set()
+    wait_until(lambda: llm_results.llm_result_cache.get(key) is not None)
+    # A retry is answered from the cache without calling again
+    assert run_with_deadline(key, lambda: pytest.fail('called again'), 0.05) == ({'answer': 42}, True)
+
+def test_identical_requests_share_one_call():
+    key = result_key('test', 'shared')
+    release = threading.Event()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.to_thread(release.wait)
+        return 'done'
+
+    assert run_with_deadline(key, call, 0.05) == (None, False)
+    assert run_with_deadline(key, call, 0.05) == (None, False)
+    release.set()
+    assert run_with_deadline(key, call, 5) == ('done', True)
+    assert len(calls) == 1
+
+def test_failed_call_is_not_cached():
+    key = result_key('test', 'failing')
+
+    async def call():
+        raise RuntimeError('provider down')
+
+    with pytest.raises(RuntimeError):
+        run_with_deadline(key, call, 5)
+    wait_until(lambda: key not in llm_results._inflight)
+    assert llm_results.llm_result_cache.get(key) is None
+
+def test_full_backlog_is_shed(monkeypatch):
+    monkeypatch.setattr(llm_results, 'BACKGROUND_WORKERS', 1)
+    monkeypatch.setattr(llm_results, 'BACKGROUND_QUEUE', 0)
+    release = threading.Event()
+
+    async def call():
+        await asyncio.to_thread(release.wait)
+
+    try:
+        run_with_deadline(result_key('test', 'busy'), call, 0.01)
+        with pytest.raises(Overloaded) as shed:
+            run_with_deadline(result_key('test', 'other'), call, 0.01)
+        assert shed.value.reason == 'queue_full'
+        assert shed.value.retry_after >= 1
+    finally:
+        release.set()
+    wait_until(lambda: not llm_results._inflight)
+
+def test_job_match_degrades_past_deadline(stub_llm):
+    client = app.test_client()
+    stub_llm.delay = 0.5
+    body = {'resume_text': 'DevOps engineer with Docker, Kubernetes and Terraform'}
+
+    degraded = client.post('/api/llm_job_match', json=body, headers={'X-Deadline-Ms': '10'}).get_json()
+    assert degraded['degraded'] is True
+    assert degraded['degraded_reason'] == 'deadline_exceeded'
+    assert degraded['llm_analysis']['matches']
+
+    wait_until(lambda: not llm_results._inflight)
+    full = client.post('/api/llm_job_match', json=body, headers={'X-Deadline-Ms': '10'}).get_json()
+    assert full['degraded'] is False
+    assert full['llm_analysis']['analysis_summary'] == 'Strong infrastructure background'
+    assert len(stub_llm.calls) == 1
+
+def test_invalid_deadline_header_rejected(stub_llm):
+    response = app.test_client().post('/api/llm_job_match', json={'resume_text': 'Python'},
+                                      headers={'X-Deadline-Ms': 'soon'})
+    assert response.status_code == 400
@@ -0,0 +1,88 @@
+"""Tests for routing tasks to model tiers and escalating fast-model responses."""
+
+import asyncio
+
+import pytest
+
+import services.llm_handler as llm_handler_module
+import services.llm_services as llm_services
+from services.llm_handler import llm_handler, parse_task_tiers
+from services.llm_services import generate_json, tiering_stats
+
+PROMPT = 'Extract skills. Return JSON with "technical_skills".'
+
+def skills(confidence):
+    return {'technical_skills': [{'name': skill, 'confidence': confidence} for skill in ('python', 'go', 'sql')]}
+
+@pytest.fixture
+def tiered(stub_llm, monkeypatch):
+    stub_llm.fast_model = 'stub-fast'
+    monkeypatch.setitem(llm_handler_module.TASK_TIERS, 'skills_extraction', 'fast')
+    monkeypatch.setattr(llm_services, '_tier_stats', {})
+    return stub_llm
+
+def test_parse_task_tiers():
+    assert parse_task_tiers(' skill_gap=FAST, job_matching=large,') == {'skill_gap': 'fast', 'job_matching': 'large'}
+    with pytest.raises(ValueError, match='medium'):
+        parse_task_tiers('skill_gap=medium')
+
+def test_confident_fast_response_is_kept(tiered):
+    tiered.replies['"technical_skills"'] = skills('high')
+    usage = {}
+    result = asyncio.run(generate_json(PROMPT, 'skills_extraction', 500, 0.1, usage))
+    assert result == skills('high')
+    assert [kwargs['model'] for _, kwargs in tiered.calls] == ['stub-fast']
+    assert usage['tier'] == 'fast' and 'escalated_from' not in usage
+    assert tiering_stats()['skills_extraction']['escalation_rate'] == 0.0
+
+def test_low_confidence_escalates_to_large_model(tiered):
+    tiered.replies['"technical_skills"'] = lambda model: skills('low' if model == 'stub-fast' else 'high')
+    usage = {}
+    result = asyncio.run(generate_json(PROMPT, 'skills_extraction', 500, 0.1, usage))
+    assert result == skills('high')
+    assert [kwargs['model'] for _, kwargs in tiered.calls] == ['stub-fast', 'stub-large']
+    assert usage['model'] == 'stub-large'
+    assert usage['escalated_from']['model'] == 'stub-fast'
+    assert '3 of 3' in usage['escalated_from']['reason']
+    stats = tiering_stats()['skills_extraction']
+    assert (stats['escalated_low_confidence'], stats['large'], stats['escalation_rate']) == (1, 1, 1.0)
+
+def test_invalid_fast_response_escalates(tiered):
+    tiered.replies['"technical_skills"'] = lambda model: {} if model == 'stub-fast' else skills('high')
+    usage = {}
+    assert asyncio.run(generate_json(PROMPT, 'skills_extraction', 500, 0.1, usage)) == skills('high')
+    assert usage['escalated_from']['reason'] == "LLM response missing 'technical_skills' field"
+    assert tiering_stats()['skills_extraction']['escalated_invalid'] == 1
+
+def test_large_model_responses_are_not_escalated(tiered, monkeypatch):
+    monkeypatch.setitem(llm_handler_module.TASK_TIERS, 'skills_extraction', 'large')
+    tiered.replies['"technical_skills"'] = skills('low')
+    assert asyncio.run(generate_json(PROMPT, 'skills_extraction', 500, 0.1)) == skills('low')
+    with pytest.raises(llm_services.LLMServiceError):
+        tiered.replies['"technical_skills"'] = {}
+        asyncio.run(generate_json(PROMPT, 'skills_extraction', 500, 0.1))
+    assert len(tiered.calls) == 2
+
+def test_escalation_can_be_disabled(tiered, monkeypatch):
+    monkeypatch.setattr(llm_services, 'LLM_ESCALATION', False)
+    tiered.replies['"technical_skills"'] = skills('low')
+    assert asyncio.run(generate_json(PROMPT, 'skills_extraction', 500, 0.1)) == skills('low')
+    assert [kwargs['model'] for _, kwargs in tiered.calls] == ['stub-fast']
+
+def test_long_prompts_routed_to_large_model(tiered, monkeypatch):
+    assert llm_handler.route(PROMPT, 'skills_extraction', 500)[0] == 'stub-fast'
+    monkeypatch.setattr(llm_handler_module, 'FAST_MAX_INPUT_TOKENS', 5)
+    assert llm_handler.route(PROMPT, 'skills_extraction', 500)[0] == 'stub-large'
+    assert llm_handler.route(PROMPT, 'job_matching', 500)[0] == 'stub-large'
+
+def test_tokens_estimated_for_every_model_a_task_may_use(tiered, monkeypatch):
+    # As with a fast model whose tokenizer splits text more finely than the large one's
+    counts = {'stub-fast': 30, 'stub-large': 20}
+    monkeypatch.setattr(llm_handler_module, 'estimate_tokens', lambda text, provider, model: counts[model])
+    cut_for = []
+    monkeypatch.setattr(llm_handler_module, 'truncate_to_tokens',
+                        lambda text, max_tokens, provider, model: cut_for.append(model) or text)
+    assert llm_handler.estimate_tokens(PROMPT, 'skills_extraction') == 30
+    assert llm_handler.estimate_tokens(PROMPT, 'job_matching') == 20
+    llm_handler.truncate_to_tokens(PROMPT, 10, 'skills_extraction')
+    assert cut_for == ['stub-fast']
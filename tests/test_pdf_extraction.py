@@ -0,0 +1,62 @@
+"""Tests for tiered PDF text extraction."""
+
+import io
+
+import pytest
+
+import ml_utils
+from benchmarks.extraction_benchmark import SECTIONS, build_pdf
+from ml_utils import _extract_with_backend, _fast_text_problem, _gutter_position, extract_text_from_pdf
+
+SINGLE = [line for title, lines in SECTIONS.items() for line in [title.upper()] + lines]
+LEFT = ['EXPERIENCE'] + [line[:45] for line in SECTIONS['Experience']]
+RIGHT = ['SKILLS'] + [line[:45] for line in SECTIONS['Skills']]
+
+def test_single_column_stays_on_fast_path():
+    text, backend = _extract_with_backend(build_pdf([SINGLE]), 'auto')
+    assert backend == 'fast'
+    assert 'Senior Engineer, Acme Corp' in text
+
+def test_two_columns_escalate_and_read_in_column_order():
+    text, backend = _extract_with_backend(build_pdf([LEFT, RIGHT]), 'auto')
+    assert backend == 'layout'
+    # The whole left column comes before the right one, not interleaved by line
+    assert text.index('Automated ETL jobs') < text.index('SKILLS')
+
+def test_sparse_text_escalates():
+    _, backend = _extract_with_backend(build_pdf([['Jane Doe', 'jane@example.com']]), 'auto')
+    assert backend == 'layout'
+
+def test_fast_mode_never_escalates():
+    _, backend = _extract_with_backend(build_pdf([LEFT, RIGHT]), 'fast')
+    assert backend == 'fast'
+
+def test_quality_checks():
+    body = 'Built REST APIs in Python and Flask serving many requests per day.\n' * 10
+    assert _fast_text_problem(body, 1, False) == ''
+    assert _fast_text_problem(body, 1, True) == 'multi-column layout'
+    assert _fast_text_problem(body, 5, False) == 'low characters per page'
+    assert _fast_text_problem(' '.join('garbled') * 40, 1, False) == 'garbled ordering'
+    assert _fast_text_problem(body.replace(' ', '') * 2, 1, False) == 'missing word spacing'
+
+def test_gutter_needs_text_on_both_sides():
+    # Body lines crossing the middle of the page: no gutter
+    assert _gutter_position([(50, 560), (50, 400), (450, 560)], 612) == 0.0
+    # Two columns with a clear gap between them
+    gutter = _gutter_position([(50, 280)] * 10 + [(330, 560)] * 10, 612)
+    assert 280 < gutter < 330
+
+def test_results_cached_by_content_and_mode(monkeypatch):
+    data = build_pdf([SINGLE, ['Extra column for cache test']])
+    calls = []
+    extract = ml_utils._extract_with_backend
+    monkeypatch.setattr(ml_utils, '_extract_with_backend', lambda *args: calls.append(args) or extract(*args))
+    first = extract_text_from_pdf(io.BytesIO(data), 'layout')
+    assert extract_text_from_pdf(io.BytesIO(data), 'layout') == first
+    assert len(calls) == 1
+    extract_text_from_pdf(io.BytesIO(data), 'fast')
+    assert len(calls) == 2
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        extract_text_from_pdf(io.BytesIO(build_pdf([SINGLE])), 'ocr')
@@ -0,0 +1,22 @@
+"""Tests for the cache-friendly layout of job matching prompts."""
+
+import routes
+from app import app
+from utils.prompt_templates import PromptTemplates, prompt_segments
+
+def test_job_matches_share_everything_before_the_resume(stub_llm):
+    assert routes.LLM_MATCH_CANDIDATES == 'catalog'
+    client = app.test_client()
+    for resume in ('Data scientist: Python, pandas and SQL', 'iOS developer with Swift and Kotlin'):
+        assert client.post('/api/llm_job_match', json={'resume_text': resume}).status_code == 200
+
+    first, second = (prompt_segments(prompt) for prompt, _ in stub_llm.calls)
+    assert len(first) == 3
+    assert first[:2] == second[:2]
+    assert first[2] != second[2]
+
+def test_jobs_block_reused_per_catalog_version():
+    jobs = [{'id': 1, 'title': 'SRE', 'description': 'Terraform'}]
+    block = PromptTemplates.jobs_block(jobs, 'catalog:1')
+    assert PromptTemplates.jobs_block([dict(job) for job in jobs], 'catalog:1') is block
+    assert PromptTemplates.jobs_block(jobs, 'catalog:2') is not block
@@ -0,0 +1,51 @@
+"""Tests for semantic job retrieval with hashed embeddings and LSH."""
+
+import numpy as np
+import pytest
+
+from job_catalog import JobCatalog
+from ml_utils import find_job_candidates, recommend_jobs
+from semantic_index import HashingEmbedder, SemanticJobIndex
+
+JOBS = [
+    {'id': 1, 'title': 'Machine Learning Engineer',
+     'description': 'Train deep learning models with PyTorch; feature engineering and model serving'},
+    {'id': 2, 'title': 'Frontend Developer',
+     'description': 'Build React user interfaces with TypeScript, CSS and accessibility in mind'},
+    {'id': 3, 'title': 'Database Administrator',
+     'description': 'Tune PostgreSQL query performance, backups, replication and indexing'},
+    {'id': 4, 'title': 'Mobile Developer',
+     'description': 'Ship iOS and Android apps in Swift and Kotlin with offline sync'}
+]
+
+def test_embeddings_are_deterministic_and_normalized():
+    texts = [f"{job['title']}\n{job['description']}" for job in JOBS]
+    first = HashingEmbedder().fit(texts).embed('neural network training')
+    second = HashingEmbedder().fit(texts).embed('neural network training')
+    # Workers attach to arrays built by another process, so vectors must agree across instances
+    assert np.array_equal(first, second)
+    assert np.linalg.norm(first) == pytest.approx(1.0, abs=1e-5)
+
+def test_search_ranks_closest_job_first():
+    index = SemanticJobIndex.build(JOBS, version=1)
+    assert index.search('training neural networks and learning models', top_k=1)[0]['job_id'] == 1
+    assert index.search('react interfaces in typescript', top_k=1)[0]['job_id'] == 2
+    results = index.search('postgresql replication', top_k=4)
+    assert results[0]['title'] == 'Database Administrator'
+    assert all(-1.0 <= result['similarity'] <= 1.0 for result in results)
+    assert [r['similarity'] for r in results] == sorted((r['similarity'] for r in results), reverse=True)
+
+def test_semantic_retrieval_from_catalog(tmp_path):
+    catalog = JobCatalog(str(tmp_path / 'jobs.db'), seed_path=None)
+    catalog.import_jobs([{'title': job['title'], 'description': job['description']} for job in JOBS])
+    resume = 'Built Swift and Kotlin apps for iOS and Android phones'
+
+    candidates = find_job_candidates(resume, limit=2, retrieval='semantic', catalog=catalog)
+    assert candidates[0]['title'] == 'Mobile Developer'
+    recommendations = recommend_jobs(resume, top_k=1, retrieval='semantic', catalog=catalog)
+    assert recommendations[0]['title'] == 'Mobile Developer'
+    assert 0 < recommendations[0]['score'] <= 100
+
+def test_unknown_retrieval_rejected():
+    with pytest.raises(ValueError):
+        find_job_candidates('Python', retrieval='vector')
@@ -0,0 +1,66 @@
+"""Tests for MessagePack negotiation and streamed job listings."""
+
+import json
+
+import msgpack
+import pytest
+
+import routes
+from app import app
+from utils import serialization
+from utils.serialization import MSGPACK_MIMETYPE
+
+MSGPACK = {'Accept': MSGPACK_MIMETYPE}
+SKILL_GAP = {'resume_text': 'Python and Docker developer', 'job_description': 'Python, Go and Kafka'}
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+def test_msgpack_negotiated_by_accept(client):
+    as_json = client.post('/api/skill_gap', json=SKILL_GAP)
+    as_msgpack = client.post('/api/skill_gap', json=SKILL_GAP, headers=MSGPACK)
+    assert as_json.mimetype == 'application/json'
+    assert as_msgpack.mimetype == MSGPACK_MIMETYPE
+    assert msgpack.unpackb(as_msgpack.data) == as_json.get_json()
+    assert 'Accept' in as_msgpack.headers['Vary']
+
+def test_representations_have_distinct_etags(client):
+    as_json = client.post('/api/skill_gap', json=SKILL_GAP)
+    as_msgpack = client.post('/api/skill_gap', json=SKILL_GAP, headers=MSGPACK)
+    assert as_msgpack.headers['ETag'] == as_json.headers['ETag'][:-1] + '-msgpack"'
+    # A cached JSON body must not be revalidated for a MessagePack request
+    again = client.post('/api/skill_gap', json=SKILL_GAP,
+                        headers={**MSGPACK, 'If-None-Match': as_json.headers['ETag']})
+    assert again.status_code == 200
+    assert again.mimetype == MSGPACK_MIMETYPE
+
+    cached = client.post('/api/skill_gap', json=SKILL_GAP,
+                         headers={**MSGPACK, 'If-None-Match': as_msgpack.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == as_msgpack.headers['ETag']
+
+def test_msgpack_request_body(client):
+    response = client.post('/api/skill_gap', data=msgpack.packb(SKILL_GAP), content_type=MSGPACK_MIMETYPE)
+    assert response.status_code == 200
+    assert response.get_json() == client.post('/api/skill_gap', json=SKILL_GAP).get_json()
+
+def test_fast_encoder_matches_stdlib():
+    value = {'b': [1, 2.5, None, True], 'a': {'nested': 'ünïcode'}, 'set': {3}}
+    assert json.loads(serialization.dumps(value, sort_keys=True)) == {
+        'a': {'nested': 'ünïcode'}, 'b': [1, 2.5, None, True], 'set': [3]
+    }
+
+@pytest.mark.parametrize('headers', [{}, MSGPACK])
+def test_large_job_pages_are_streamed(client, monkeypatch, headers):
+    expected = client.get('/api/jobs?limit=4').get_json()
+
+    monkeypatch.setattr(routes, 'JOBS_STREAM_MIN', 2)
+    monkeypatch.setattr(serialization, 'STREAM_CHUNK_SIZE', 64)
+    response = client.get('/api/jobs?limit=4', headers=headers, buffered=False)
+    assert response.is_streamed
+    chunks = list(response.response)
+    assert len(chunks) > 1
+    body = b''.join(chunks)
+    decoded = msgpack.unpackb(body) if headers else json.loads(body)
+    assert decoded == expected
@@ -0,0 +1,32 @@
+"""Regression tests for crediting resume skills against job requirements."""
+
+import pytest
+
+from ml_utils import ResumeProfile, analyze_skill_gap, job_skills
+from skill_matcher import get_skill_matcher
+
+def test_alias_does_not_credit_substring_skills():
+    # 'JS' resolves to 'javascript', which must not also credit 'java' or 'r'
+    profile = ResumeProfile('JS, HTML')
+    assert 'javascript' in profile.matched_skills
+    assert 'java' not in profile.matched_skills
+    assert 'r' not in profile.matched_skills
+
+def test_skill_gap_reports_java_for_js_resume():
+    missing = analyze_skill_gap('Frontend dev: JS, HTML', 'We need Java and Kubernetes and JavaScript')
+    assert sorted(missing) == ['java', 'kubernetes']
+
+def test_resume_and_job_sides_agree():
+    text = 'Python, Kubernetes (k8s), Node and PostgreSQL'
+    assert job_skills(text) <= ResumeProfile(text).matched_skills
+
+@pytest.mark.parametrize('word', ['sprint', 'string', 'docket', 'tasting', 'tailwinds', 'expresses'])
+def test_everyday_words_are_not_fuzzy_matched(word):
+    assert get_skill_matcher().lookup(word) is None
+
+def test_typos_in_longer_skills_still_resolve():
+    matches = get_skill_matcher().match('Kubernates, Terrafrom and Selenum; led the sprint planning')
+    assert set(matches) == {'kubernetes', 'terraform', 'selenium'}
+
+def test_sprint_is_not_reported_as_spring():
+    assert sorted(analyze_skill_gap('Ran two-week sprints and string parsing', 'Java and Spring Boot')) == ['java', 'spring']
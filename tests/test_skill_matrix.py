@@ -0,0 +1,64 @@
+"""Tests for catalog-wide skill gap analysis over packed skill bitsets."""
+
+from catalog_snapshot import CatalogDelta
+from job_catalog import JobCatalog
+from skill_matrix import SkillMatrix, get_skill_matrix
+
+VOCABULARY = ['docker', 'go', 'java', 'javascript', 'kubernetes', 'python', 'r', 'react']
+
+JOBS = [
+    {'id': 1, 'title': 'Backend Engineer', 'description': 'Python services on Docker and Kubernetes'},
+    {'id': 2, 'title': 'Frontend Engineer', 'description': 'React and JavaScript for a great product'},
+    {'id': 3, 'title': 'Office Manager', 'description': 'Organize the office and greet our visitors'},
+    {'id': 4, 'title': 'Platform Engineer', 'description': 'Go and Kubernetes'}
+]
+
+def test_job_skills_are_whole_words():
+    matrix = SkillMatrix.build(JOBS, version=1, vocabulary=VOCABULARY)
+    # No 'java' from JavaScript, 'r' from any word with an r, or 'go' from 'good'
+    assert matrix.decode(matrix.bits[1]) == ['javascript', 'react']
+    assert matrix.decode(matrix.bits[2]) == []
+    assert matrix.required_counts.tolist() == [3, 2, 0, 2]
+
+def test_gap_report_ranks_and_summarizes():
+    matrix = SkillMatrix.build(JOBS, version=1, vocabulary=VOCABULARY)
+    report = matrix.gap_report({'python', 'docker', 'kubernetes'}, limit=10)
+
+    assert [job['job_id'] for job in report['jobs']] == [1, 4, 2]
+    assert report['jobs'][0] == {'job_id': 1, 'title': 'Backend Engineer', 'coverage': 1.0,
+                                 'required_skills': 3, 'missing_skills': []}
+    assert report['jobs'][1]['missing_skills'] == ['go']
+    assert report['summary'] == {
+        'jobs_analyzed': 4,
+        'jobs_without_skills': 1,
+        'average_coverage': 0.5,
+        'fully_covered_jobs': 1,
+        'resume_skills': ['docker', 'kubernetes', 'python']
+    }
+    assert report['most_missing_skills'][0]['share'] == round(1 / 3, 4)
+
+def test_jobs_without_skills_are_not_ranked():
+    matrix = SkillMatrix.build(JOBS, version=1, vocabulary=VOCABULARY)
+    report = matrix.gap_report(set(), limit=10)
+    assert 3 not in [job['job_id'] for job in report['jobs']]
+    assert report['summary']['fully_covered_jobs'] == 0
+    assert report['summary']['average_coverage'] == 0.0
+
+def test_delta_matches_full_rebuild():
+    base = SkillMatrix.build(JOBS, version=1, vocabulary=VOCABULARY)
+    changed = {'id': 4, 'title': 'Platform Engineer', 'description': 'Go, Python and Docker'}
+    added = {'id': 5, 'title': 'Data Analyst', 'description': 'R and Python'}
+    delta = CatalogDelta(1, 4, [changed, added], frozenset({2, 4, 5}))
+    current = [JOBS[0], JOBS[2], changed, added]
+
+    resume = {'python', 'go'}
+    assert base.apply_delta(delta).gap_report(resume) == SkillMatrix.build(current, 4, VOCABULARY).gap_report(resume)
+
+def test_catalog_matrix_follows_writes(tmp_path):
+    catalog = JobCatalog(str(tmp_path / 'jobs.db'), seed_path=None)
+    catalog.import_jobs([{'title': job['title'], 'description': job['description']} for job in JOBS])
+    before = get_skill_matrix(catalog).gap_report({'python'})['summary']['jobs_analyzed']
+    catalog.add_job({'title': 'Data Analyst', 'description': 'R and Python'})
+    matrix = get_skill_matrix(catalog)
+    assert matrix.version == catalog.version()
+    assert matrix.gap_report({'python'})['summary']['jobs_analyzed'] == before + 1
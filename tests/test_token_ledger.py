@@ -0,0 +1,88 @@
+"""Tests for LLM request preflight: context window checks and token quotas."""
+
+import asyncio
+
+import pytest
+
+import routes
+from app import app
+from services.llm_handler import llm_handler
+from services.llm_preflight import (
+    PromptTooLargeError,
+    QuotaExceededError,
+    TokenLedger,
+    client_context,
+    parse_quotas,
+    plan_request,
+    token_ledger
+)
+
+@pytest.fixture
+def ledger(tmp_path):
+    return TokenLedger(str(tmp_path / 'quotas.db'), quotas=[(60, 1000)])
+
+def charged(ledger, client):
+    return ledger.client_usage(client)['quotas'][0]['used']
+
+def test_parse_quotas():
+    assert parse_quotas('60:10000, 86400:500000,') == [(60, 10000), (86400, 500000)]
+    assert parse_quotas('') == []
+
+def test_reservation_charges_budget_until_settled(ledger):
+    entry = ledger.reserve('alice', 'openai', 'gpt-4', 'skill_gap', 200, 500)
+    assert charged(ledger, 'alice') == 700
+
+    ledger.settle(entry, {'input_tokens': 180, 'output_tokens': 40}, succeeded=True)
+    assert charged(ledger, 'alice') == 220
+    assert ledger.client_usage('alice')['recent_requests'][0]['status'] == 'ok'
+
+def test_failed_requests_are_not_charged(ledger):
+    entry = ledger.reserve('alice', 'openai', 'gpt-4', None, 200, 500)
+    ledger.settle(entry, None, succeeded=False)
+    assert charged(ledger, 'alice') == 0
+
+def test_settling_without_usage_keeps_estimate(ledger):
+    entry = ledger.reserve('alice', 'openai', 'gpt-4', None, 200, 500)
+    ledger.settle(entry, {}, succeeded=True)
+    assert charged(ledger, 'alice') == 700
+
+def test_quota_refuses_requests_per_client(ledger):
+    ledger.reserve('alice', 'openai', 'gpt-4', None, 300, 500)
+    with pytest.raises(QuotaExceededError) as refused:
+        ledger.reserve('alice', 'openai', 'gpt-4', None, 100, 200)
+    assert 1 <= refused.value.retry_after <= 60
+    # Other clients have their own budget
+    ledger.reserve('bob', 'openai', 'gpt-4', None, 300, 500)
+
+def test_request_larger_than_quota_waits_whole_window(ledger):
+    with pytest.raises(QuotaExceededError) as refused:
+        ledger.reserve('alice', 'openai', 'gpt-4', None, 900, 500)
+    assert refused.value.retry_after == 60
+
+def test_plan_shrinks_output_to_fit_context():
+    prompt = 'word ' * 5000
+    plan = plan_request(prompt, 'openai', 'gpt-4', 2000)
+    assert plan['context_window'] == 8192
+    assert plan['input_tokens'] + plan['max_tokens'] == 8192
+    with pytest.raises(PromptTooLargeError):
+        plan_request(prompt * 2, 'openai', 'gpt-4', 2000)
+
+def test_handler_reserves_and_settles(stub_llm):
+    with client_context('ledger-handler'):
+        asyncio.run(llm_handler.generate_response('"missing_skills" for Python', task='skill_gap'))
+    [entry] = token_ledger.client_usage('ledger-handler')['recent_requests']
+    assert entry['task'] == 'skill_gap'
+    assert entry['status'] == 'ok'
+    assert entry['output_tokens'] == 100
+
+def test_over_quota_request_gets_429(stub_llm, monkeypatch):
+    monkeypatch.setattr(routes, 'LLM_CLIENT_HEADER', 'X-Client-Id')
+    monkeypatch.setattr(token_ledger, 'quotas', [(3600, 10)])
+    response = app.test_client().post(
+        '/api/llm_skill_gap',
+        json={'resume_text': 'Python developer', 'job_description': 'Python and Go'},
+        headers={'X-Client-Id': 'ledger-429'}
+    )
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3600'
+    assert stub_llm.calls == []
@@ -0,0 +1,192 @@
+"""
+Admission control and load shedding for SkillSnap.
+
+Expensive endpoints are grouped into workload classes, each with its own
+concurrency limit and a bounded queue of requests waiting for a slot:
+
+- 'cpu': PDF parsing, which runs on a separate process pool (cpu_pool)
+- 'llm': LLM calls, which mostly wait on the provider
+
+A request that finds its class's queue full, or waits longer than the
+class allows, is refused at once with a 503 and a Retry-After estimate
+instead of tying up a worker thread. Endpoints outside these classes, such
+as /api/health and catalog reads, are never queued behind them.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from flask import jsonify
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bounds for the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+# Smoothing factor for the average service time used to estimate Retry-After
+SERVICE_TIME_SMOOTHING = 0.2
+
+class Overloaded(Exception):
+    """Raised when a request is shed because a workload class is saturated."""
+
+    def __init__(self, workload: str, reason: str, retry_after: int):
+        self.workload = workload
+        # 'queue_full' or 'queue_timeout'
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Server is busy with {workload} requests ({reason.replace('_', ' ')}), retry in {retry_after}s")
+
+class WorkloadClass:
+    """Concurrency limit and bounded wait queue for one class of requests."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        """
+        Args:
+            name: Class name, e.g. 'cpu'
+            max_concurrent: Requests of this class running at once
+            max_queue: Requests allowed to wait for a slot; more are shed
+            max_wait: Seconds a request may wait for a slot before it is shed
+        """
+        self.name = name
+        self.max_concurrent = max(max_concurrent, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {'queue_full': 0, 'queue_timeout': 0}
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+        # Smoothed seconds a request holds its slot
+        self.service_time: Optional[float] = None
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until a new request would get a slot."""
+        service_time = self.service_time or 1.0
+        seconds = service_time * (self.queued + 1) / self.max_concurrent
+        return int(min(max(round(seconds), MIN_RETRY_AFTER), MAX_RETRY_AFTER))
+
+    def acquire(self) -> float:
+        """
+        Take a slot, waiting in the queue if all slots are busy.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeds max_wait
+        """
+        with self._condition:
+            start = time.monotonic()
+            if self.active >= self.max_concurrent:
+                if self.queued >= self.max_queue:
+                    self.shed['queue_full'] += 1
+                    raise Overloaded(self.name, 'queue_full', self.retry_after())
+
+                self.queued += 1
+                try:
+                    deadline = start + self.max_wait
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed['queue_timeout'] += 1
+                            raise Overloaded(self.name, 'queue_timeout', self.retry_after())
+                        self._condition.wait(remaining)
+                finally:
+                    self.queued -= 1
+
+            waited = time.monotonic() - start
+            self.active += 1
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait_seen = max(self.max_wait_seen, waited)
+            return waited
+
+    def release(self, held: float) -> None:
+        """Give back a slot held for the given number of seconds."""
+        with self._condition:
+            self.active -= 1
+            if self.service_time is None:
+                self.service_time = held
+            else:
+                self.service_time += SERVICE_TIME_SMOOTHING * (held - self.service_time)
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'active': self.active,
+                'max_concurrent': self.max_concurrent,
+                'queued': self.queued,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'shed': dict(self.shed),
+                'average_wait_ms': round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+                'max_wait_ms': round(self.max_wait_seen * 1000, 1),
+                'average_service_ms': round(self.service_time * 1000, 1) if self.service_time is not None else None
+            }
+
+def _class_from_env(name: str, max_concurrent: int, max_queue: int, max_wait: float) -> WorkloadClass:
+    prefix = f"WORKLOAD_{name.upper()}_"
+    return WorkloadClass(
+        name,
+        int(os.getenv(f"{prefix}CONCURRENCY", str(max_concurrent))),
+        int(os.getenv(f"{prefix}QUEUE", str(max_queue))),
+        float(os.getenv(f"{prefix}MAX_WAIT", str(max_wait)))
+    )
+
+# Limits are per worker process. Keep the slots and queues of all classes
+# below the worker's thread count so cheap endpoints always find a thread.
+workload_classes: Dict[str, WorkloadClass] = {
+    'cpu': _class_from_env('cpu', 2, 2, 5.0),
+    'llm': _class_from_env('llm', 6, 4, 2.0),
+}
+
+def overloaded_response(error: Overloaded):
+    """Return a 503 response telling the client when to retry."""
+    response = jsonify({
+        'success': False,
+        'error': str(error),
+        'workload': error.workload,
+        'reason': error.reason,
+        'retry_after': error.retry_after
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+def admit(workload: str) -> Callable:
+    """
+    Decorator running a view under a workload class's admission control.
+
+    Requests that cannot get a slot are answered with overloaded_response().
+    """
+    workload_class = workload_classes[workload]
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                workload_class.acquire()
+            except Overloaded as e:
+                logger.info(f"Shed {view.__name__}: {str(e)}")
+                return overloaded_response(e)
+
+            start = time.monotonic()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                workload_class.release(time.monotonic() - start)
+        return wrapper
+    return decorator
+
+def workload_stats() -> Dict[str, Dict[str, Any]]:
+    """Get queue depth, wait times and shed counts for each workload class."""
+    return {name: workload_class.stats() for name, workload_class in workload_classes.items()}
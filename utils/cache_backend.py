@@ -0,0 +1,452 @@
+"""
+Pluggable cache backends shared across gunicorn workers.
+
+Result caches (PDF text, resume profiles, LLM results) are namespaces on a
+single backend chosen with CACHE_BACKEND:
+
+    sqlite - a WAL-mode SQLite file shared by all workers on the host (default)
+    redis  - any server speaking the Redis protocol, at CACHE_REDIS_URL
+    memory - a per-process LRU, as before
+
+Each namespace has its own entry limit and optional TTL; the least recently
+used entries are evicted once a namespace is over its limit.
+"""
+
+import logging
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'sqlite').lower()
+CACHE_DB = os.getenv('CACHE_DB', 'skillsnap_cache.db')
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+CACHE_BACKENDS = ('sqlite', 'redis', 'memory')
+
+# Reads only refresh an entry's access time when it is older than this, so
+# that hot keys don't turn every SQLite read into a write
+ACCESS_RESOLUTION_SECONDS = 30
+
+class CacheBackendError(Exception):
+    """Custom exception for cache backend errors."""
+    pass
+
+class CacheBackend(ABC):
+    """Byte-value store with per-namespace limits and LRU eviction."""
+
+    def __init__(self):
+        self.limits: Dict[str, int] = {}
+
+    def configure_namespace(self, namespace: str, max_entries: int) -> None:
+        """Set the maximum number of entries kept in a namespace."""
+        self.limits[namespace] = max_entries
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """Get a value, or None if it is missing or expired."""
+        pass
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the namespace's least recently used entries over its limit."""
+        pass
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a value if it is present."""
+        pass
+
+    @abstractmethod
+    def clear(self, namespace: str) -> None:
+        """Remove every value in a namespace."""
+        pass
+
+    @abstractmethod
+    def count(self, namespace: str) -> int:
+        """Count the entries in a namespace."""
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU backend."""
+
+    def __init__(self):
+        super().__init__()
+        self._namespaces: Dict[str, 'OrderedDict[str, Tuple[Optional[float], bytes]]'] = {}
+        self._lock = threading.Lock()
+
+    def _entries(self, namespace: str) -> 'OrderedDict[str, Tuple[Optional[float], bytes]]':
+        return self._namespaces.setdefault(namespace, OrderedDict())
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            entries = self._entries(namespace)
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and time.time() > expires_at:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            entries = self._entries(namespace)
+            entries[key] = (expires_at, value)
+            entries.move_to_end(key)
+            limit = self.limits.get(namespace)
+            while limit is not None and len(entries) > limit:
+                entries.popitem(last=False)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._entries(namespace).pop(key, None)
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._entries(namespace))
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries(namespace, accessed_at);
+"""
+
+class SQLiteCacheBackend(CacheBackend):
+    """Backend on a WAL-mode SQLite file, shared by every process on the host."""
+
+    def __init__(self, db_path: str = CACHE_DB):
+        super().__init__()
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get a connection for the current thread and process."""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            # Connections must not cross a fork, so reconnect in each worker
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SQLITE_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and now > expires_at:
+            self.delete(namespace, key)
+            return None
+        if now - accessed_at > ACCESS_RESOLUTION_SECONDS:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key)
+            )
+        return value
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        conn = self._connection()
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        limit = self.limits.get(namespace)
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries(namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(value), expires_at, now)
+            )
+            if limit is not None:
+                excess = self._count(conn, namespace) - limit
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                        "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed_at LIMIT ?)",
+                        (namespace, namespace, excess)
+                    )
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def clear(self, namespace: str) -> None:
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, namespace: str) -> int:
+        return conn.execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def count(self, namespace: str) -> int:
+        return self._count(self._connection(), namespace)
+
+class RespConnection:
+    """Minimal Redis protocol (RESP2) client connection."""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 5.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+
+    def execute(self, *args: Any) -> Any:
+        """Send a command and return its decoded reply."""
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self._sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise CacheBackendError("Connection closed by cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise CacheBackendError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply from cache server: {line!r}")
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend on a Redis-protocol server.
+
+    Values live under '<prefix>:<namespace>:<key>' and each namespace keeps a
+    sorted set of access times for LRU eviction.
+    """
+
+    def __init__(self, url: str = CACHE_REDIS_URL, prefix: str = 'skillsnap'):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connection(self) -> RespConnection:
+        """Get a connection for the current thread and process."""
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            conn = RespConnection(self.host, self.port, self.db, self.password)
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def _execute(self, *args: Any) -> Any:
+        try:
+            return self._connection().execute(*args)
+        except (OSError, CacheBackendError):
+            # Drop the connection so the next call reconnects
+            conn = getattr(self._local, 'conn', None)
+            if conn is not None:
+                conn.close()
+            self._local.conn = None
+            raise
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _lru_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:__lru__"
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        value = self._execute('GET', self._key(namespace, key))
+        if value is None:
+            # Expired entries leave their LRU member behind
+            self._execute('ZREM', self._lru_key(namespace), key)
+            return None
+        self._execute('ZADD', self._lru_key(namespace), repr(time.time()), key)
+        return value
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._execute('SET', self._key(namespace, key), value, 'PX', int(ttl * 1000))
+        else:
+            self._execute('SET', self._key(namespace, key), value)
+        lru_key = self._lru_key(namespace)
+        self._execute('ZADD', lru_key, repr(time.time()), key)
+
+        limit = self.limits.get(namespace)
+        if limit is not None:
+            excess = self._execute('ZCARD', lru_key) - limit
+            if excess > 0:
+                evicted = self._execute('ZRANGE', lru_key, 0, excess - 1)
+                self._execute('DEL', *[self._key(namespace, k.decode('utf-8')) for k in evicted])
+                self._execute('ZREM', lru_key, *evicted)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._execute('DEL', self._key(namespace, key))
+        self._execute('ZREM', self._lru_key(namespace), key)
+
+    def clear(self, namespace: str) -> None:
+        lru_key = self._lru_key(namespace)
+        keys = self._execute('ZRANGE', lru_key, 0, -1)
+        if keys:
+            self._execute('DEL', *[self._key(namespace, k.decode('utf-8')) for k in keys])
+        self._execute('DEL', lru_key)
+
+    def count(self, namespace: str) -> int:
+        return self._execute('ZCARD', self._lru_key(namespace))
+
+class CacheNamespace:
+    """
+    A named cache of Python objects on the shared backend.
+
+    With local_entries, the most recently used objects are also kept as live
+    objects in this process, so hot keys skip the backend round trip and
+    unpickling, and keep any state they memoize; the backend is only read
+    on a local miss.
+
+    Backend failures are logged and treated as misses so that a cache outage
+    never fails a request.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, max_entries: int,
+                 ttl: Optional[float] = None, local_entries: int = 0):
+        self.backend = backend
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.local_entries = local_entries
+        self._local: 'OrderedDict[str, Tuple[Optional[float], Any]]' = OrderedDict()
+        self._local_lock = threading.Lock()
+        backend.configure_namespace(namespace, max_entries)
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and time.time() > expires_at:
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        with self._local_lock:
+            self._local[key] = (expires_at, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.local_entries:
+            value = self._get_local(key)
+            if value is not None:
+                return value
+        try:
+            value = self.backend.get(self.namespace, key)
+            value = pickle.loads(value) if value is not None else None
+        except Exception as e:
+            logger.warning(f"Cache read failed for {self.namespace}: {str(e)}")
+            return None
+        if value is not None and self.local_entries:
+            # The backend does not report the remaining TTL, so allow a full one
+            self._set_local(key, value, time.time() + self.ttl if self.ttl else None)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.local_entries:
+            self._set_local(key, value, time.time() + self.ttl if self.ttl else None)
+        try:
+            self.backend.set(self.namespace, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {self.namespace}: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        with self._local_lock:
+            self._local.pop(key, None)
+        try:
+            self.backend.delete(self.namespace, key)
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {self.namespace}: {str(e)}")
+
+    def clear(self) -> None:
+        with self._local_lock:
+            self._local.clear()
+        self.backend.clear(self.namespace)
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
+
+def create_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+    """Create a cache backend by name ('sqlite', 'redis' or 'memory')."""
+    if name == 'sqlite':
+        return SQLiteCacheBackend()
+    if name == 'redis':
+        return RedisCacheBackend()
+    if name == 'memory':
+        return MemoryCacheBackend()
+    raise CacheBackendError(f"Unknown CACHE_BACKEND '{name}'. Use one of: {', '.join(CACHE_BACKENDS)}")
+
+# Global cache backend instance
+cache_backend = create_backend()
+
+def get_cache(namespace: str, max_entries: int, ttl: Optional[float] = None,
+              local_entries: int = 0) -> CacheNamespace:
+    """Get a namespace on the global cache backend, optionally fronted by an in-process LRU."""
+    return CacheNamespace(cache_backend, namespace, max_entries, ttl, local_entries)
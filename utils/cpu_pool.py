@@ -0,0 +1,68 @@
+"""
+Process pool for CPU-bound work such as PDF parsing.
+
+Parsing a PDF holds the GIL for its whole duration, so running it on a
+request thread stalls every other request handled by the same worker
+process. Work submitted here runs in separate processes instead; the request
+thread just waits on the result, and the worker keeps serving cheap
+endpoints meanwhile.
+
+The pool is created lazily in each process that uses it (never in the
+gunicorn master before workers fork) and uses the 'spawn' start method, as
+forking a multi-threaded worker is unsafe.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Processes per worker; 0 runs CPU-bound work on the calling thread
+CPU_POOL_WORKERS = int(os.getenv('CPU_POOL_WORKERS', str(min(2, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=CPU_POOL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def run_cpu_bound(function: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a CPU-bound function in the process pool and wait for its result.
+
+    The function and its arguments must be picklable (a module-level
+    function taking plain data). If a pool process dies, the pool is
+    replaced and the call runs on the calling thread.
+    """
+    if CPU_POOL_WORKERS <= 0:
+        return function(*args)
+
+    pool = _get_pool()
+    try:
+        return pool.submit(function, *args).result()
+    except BrokenProcessPool:
+        logger.warning(f"CPU pool broke while running {function.__name__}, running it in process")
+        _discard_pool(pool)
+        return function(*args)
@@ -0,0 +1,181 @@
+"""
+HTTP-level caching and compression for SkillSnap.
+
+Responses to deterministic endpoints carry strong ETags derived from their
+inputs, so repeated requests can be answered with 304 Not Modified before any
+work is done. Larger responses are compressed (streamed ones with gzip as
+they are sent), and versioned static assets are served with long-lived
+Cache-Control headers.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import Flask, Response, request
+
+from utils.serialization import MSGPACK_MIMETYPE, wants_msgpack
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/html', 'text/css', 'text/plain',
+    'application/javascript', 'text/javascript', MSGPACK_MIMETYPE
+}
+ENCODING_SUFFIXES = ('br', 'gzip')
+# ETag suffixes of other representations negotiated for the same inputs
+REPRESENTATION_SUFFIXES = {MSGPACK_MIMETYPE: 'msgpack'}
+
+# One year, for static assets whose URL carries a content version
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+_static_versions: Dict[str, Tuple[float, str]] = {}
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Compute a strong ETag value from the inputs that determine a response.
+
+    Args:
+        parts: JSON-serializable values, e.g. endpoint name, input text,
+            catalog version and provider/model
+
+    Returns:
+        ETag value (without quotes)
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+def not_modified(etag: str) -> Optional[Response]:
+    """
+    Build a 304 response if the client already holds this representation.
+
+    Matches the ETag of the representation negotiated for this request
+    (JSON or MessagePack, see with_etag()) and its per-encoding variants set
+    for compressed responses, so a client holding the JSON body is not told
+    its MessagePack body is current.
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+
+    current = f"{etag}-{REPRESENTATION_SUFFIXES[MSGPACK_MIMETYPE]}" if wants_msgpack() else etag
+    candidates = [current] + [f"{current}-{suffix}" for suffix in ENCODING_SUFFIXES]
+    if any(if_none_match.contains(candidate) for candidate in candidates):
+        response = Response(status=304)
+        response.set_etag(current)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return None
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attach an ETag and require revalidation on every reuse."""
+    suffix = REPRESENTATION_SUFFIXES.get(response.mimetype)
+    response.set_etag(f"{etag}-{suffix}" if suffix else etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _choose_encoding() -> Optional[str]:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def _gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    try:
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def compress_response(response: Response) -> Response:
+    """Compress a response body with brotli or gzip when worthwhile."""
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    if response.is_streamed:
+        # Streamed bodies are large by design; compress them chunk by chunk
+        response.vary.add('Accept-Encoding')
+        if request.accept_encodings['gzip']:
+            response.response = _gzip_stream(response.response)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Length', None)
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=5)
+    else:
+        compressed = gzip.compress(body, compresslevel=6)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    # A strong ETag identifies exact bytes, so each encoding gets its own
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+
+    return response
+
+def static_version(static_folder: str, filename: str) -> str:
+    """Get a short content hash of a static file, cached by modification time."""
+    path = os.path.join(static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ''
+
+    cached = _static_versions.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        version = hashlib.md5(f.read()).hexdigest()[:12]
+    _static_versions[path] = (mtime, version)
+    return version
+
+def init_app(app: Flask) -> None:
+    """Register compression, static asset versioning and cache headers."""
+
+    @app.url_defaults
+    def add_static_version(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            version = static_version(app.static_folder, values['filename'])
+            if version:
+                values['v'] = version
+
+    @app.after_request
+    def apply_http_caching(response):
+        if request.endpoint == 'static' and request.args.get('v') and response.status_code == 200:
+            # The URL changes whenever the file does, so it can be cached indefinitely
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+        return compress_response(response)
@@ -0,0 +1,304 @@
+"""
+Opt-in memory instrumentation (MEMORY_PROFILING=true).
+
+- tracemalloc peak and retained allocations per request, by endpoint, and per
+  processing stage (functions decorated with @stage in ml_utils)
+- the top allocation sites, and their growth since a baseline snapshot
+- periodic RSS and garbage collector samples, with the RSS growth per request
+  used to size gunicorn's max_requests
+
+Everything is per process: each gunicorn worker traces and samples itself,
+starting with its first request. tracemalloc peaks are process-wide, so when
+a worker handles overlapping requests on several threads, each one's peak
+includes the others' allocations and is an upper bound. PDF parsing
+allocates in the CPU pool processes; set CPU_POOL_WORKERS=0 to attribute it
+to requests. Tracing slows allocation-heavy code and adds memory per traced
+block, so leave it off in normal operation.
+"""
+
+import functools
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MEMORY_PROFILING = os.getenv('MEMORY_PROFILING', 'false').lower() == 'true'
+# Stack frames stored per traced allocation (needed for group_by='traceback')
+MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', '10'))
+# Seconds between RSS and GC samples, and how many samples are kept
+MEMORY_SAMPLE_INTERVAL = float(os.getenv('MEMORY_SAMPLE_INTERVAL', '60'))
+MEMORY_SAMPLE_HISTORY = int(os.getenv('MEMORY_SAMPLE_HISTORY', '120'))
+# Worker memory budget used to suggest max_requests (empty for no suggestion)
+WORKER_RSS_LIMIT_MB = float(os.getenv('WORKER_RSS_LIMIT_MB') or 0)
+
+GROUP_BY_OPTIONS = ('lineno', 'filename', 'traceback')
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+)
+
+_lock = threading.Lock()
+_started_pid: Optional[int] = None
+_active: List['_Measurement'] = []
+_stats: Dict[str, Dict[str, Dict[str, float]]] = {'endpoints': {}, 'stages': {}}
+_requests = 0
+_samples: deque = deque(maxlen=MEMORY_SAMPLE_HISTORY)
+_baseline: Optional[tracemalloc.Snapshot] = None
+_gc_pause = {'collections': 0, 'seconds': 0.0, 'started': None}
+
+def _kb(size: float) -> float:
+    return round(size / 1024.0, 1)
+
+class _Measurement:
+    """Traced memory at the start of a request or stage, and the highest peak seen since."""
+    __slots__ = ('start', 'peak')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.peak = start
+
+def _begin() -> _Measurement:
+    with _lock:
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak() is process-wide: fold the peak into measurements still running
+        for measurement in _active:
+            measurement.peak = max(measurement.peak, peak)
+        tracemalloc.reset_peak()
+        measurement = _Measurement(current)
+        _active.append(measurement)
+        return measurement
+
+def _end(measurement: _Measurement) -> Tuple[int, int]:
+    """Finish a measurement; returns (peak, retained) bytes above its start."""
+    with _lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _active.remove(measurement)
+        return max(measurement.peak, peak) - measurement.start, current - measurement.start
+
+def _record(kind: str, name: str, peak: int, retained: int) -> None:
+    with _lock:
+        entry = _stats[kind].setdefault(name, {'count': 0, 'peak_max': 0, 'peak_total': 0, 'retained_total': 0})
+        entry['count'] += 1
+        entry['peak_max'] = max(entry['peak_max'], peak)
+        entry['peak_total'] += peak
+        entry['retained_total'] += retained
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def max_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+def _mb(size: Optional[int]) -> Optional[float]:
+    return round(size / 1048576.0, 1) if size is not None else None
+
+def _on_gc(phase: str, info: Dict[str, Any]) -> None:
+    if phase == 'start':
+        _gc_pause['started'] = time.perf_counter()
+    elif _gc_pause['started'] is not None:
+        _gc_pause['seconds'] += time.perf_counter() - _gc_pause['started']
+        _gc_pause['collections'] += 1
+        _gc_pause['started'] = None
+
+def current_sample() -> Dict[str, Any]:
+    """Read the process's RSS, traced memory and GC counters without recording them."""
+    stats = gc.get_stats()
+    return {
+        'time': time.time(),
+        'requests': _requests,
+        'rss_mb': _mb(rss_bytes()),
+        'max_rss_mb': _mb(max_rss_bytes()),
+        'traced_mb': _mb(tracemalloc.get_traced_memory()[0]) if tracemalloc.is_tracing() else None,
+        'gc': {
+            'pending': list(gc.get_count()),
+            'collections': [generation['collections'] for generation in stats],
+            'collected': sum(generation['collected'] for generation in stats),
+            'uncollectable': sum(generation['uncollectable'] for generation in stats),
+            'garbage': len(gc.garbage),
+            'pause_seconds': round(_gc_pause['seconds'], 4)
+        }
+    }
+
+def take_sample() -> Dict[str, Any]:
+    """Record the process's RSS, traced memory and GC counters."""
+    sample = current_sample()
+    _samples.append(sample)
+    return sample
+
+def _sample_loop() -> None:
+    pid = os.getpid()
+    while _started_pid == pid:
+        sample = take_sample()
+        logger.info(
+            f"Memory pid={pid}: rss={sample['rss_mb']}MB traced={sample['traced_mb']}MB "
+            f"requests={sample['requests']} gc_collections={sample['gc']['collections']} "
+            f"gc_pause={sample['gc']['pause_seconds']}s uncollectable={sample['gc']['uncollectable']}"
+        )
+        time.sleep(MEMORY_SAMPLE_INTERVAL)
+
+def start() -> None:
+    """Start tracing and sampling in this process, once."""
+    global _started_pid, _requests
+    if _started_pid == os.getpid():
+        return
+    with _lock:
+        if _started_pid == os.getpid():
+            return
+        # Forked workers inherit the parent's state but not its sampler thread
+        _active.clear()
+        for kind in _stats:
+            _stats[kind].clear()
+        _samples.clear()
+        _requests = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        if _on_gc not in gc.callbacks:
+            gc.callbacks.append(_on_gc)
+        _started_pid = os.getpid()
+    threading.Thread(target=_sample_loop, name='memory-sampler', daemon=True).start()
+
+def stage(name: str) -> Callable:
+    """Decorator attributing a function's allocations to a named stage; a no-op unless profiling."""
+    def decorator(function: Callable) -> Callable:
+        if not MEMORY_PROFILING:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracemalloc.is_tracing():
+                return function(*args, **kwargs)
+            measurement = _begin()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record('stages', name, *_end(measurement))
+        return wrapper
+    return decorator
+
+def init_app(app) -> None:
+    """Measure every request by endpoint when MEMORY_PROFILING is enabled."""
+    if not MEMORY_PROFILING:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def begin_memory_measurement():
+        start()
+        g.memory_measurement = _begin()
+
+    @app.teardown_request
+    def end_memory_measurement(error=None):
+        global _requests
+        measurement = g.pop('memory_measurement', None)
+        if measurement is None:
+            return
+        _record('endpoints', request.endpoint or 'unmatched', *_end(measurement))
+        with _lock:
+            _requests += 1
+
+def _summarize(entries: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        name: {
+            'count': entry['count'],
+            'peak_max_kb': _kb(entry['peak_max']),
+            'peak_avg_kb': _kb(entry['peak_total'] / entry['count']),
+            'retained_avg_kb': _kb(entry['retained_total'] / entry['count'])
+        }
+        for name, entry in sorted(entries.items(), key=lambda item: -item[1]['peak_max'])
+    }
+
+def max_requests_hint() -> Dict[str, Any]:
+    """RSS growth per request since the first sample and the max_requests that fits WORKER_RSS_LIMIT_MB."""
+    samples = [sample for sample in _samples if sample['rss_mb'] is not None]
+    if len(samples) < 2 or samples[-1]['requests'] == samples[0]['requests']:
+        return {'rss_growth_kb_per_request': None, 'suggested_max_requests': None}
+
+    first, last = samples[0], samples[-1]
+    growth = (last['rss_mb'] - first['rss_mb']) * 1024.0 / (last['requests'] - first['requests'])
+    suggested = None
+    if WORKER_RSS_LIMIT_MB and growth > 0:
+        suggested = max(int((WORKER_RSS_LIMIT_MB - first['rss_mb']) * 1024.0 / growth), 0)
+    return {'rss_growth_kb_per_request': round(growth, 2), 'suggested_max_requests': suggested}
+
+def top_allocations(limit: int = 20, group_by: str = 'lineno', compare: bool = False) -> List[Dict[str, Any]]:
+    """
+    Get the largest allocation sites.
+
+    Args:
+        limit: Number of sites to return
+        group_by: 'lineno', 'filename' or 'traceback'
+        compare: Rank by growth since the baseline snapshot (taken now if
+            there is none)
+    """
+    global _baseline
+    if group_by not in GROUP_BY_OPTIONS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY_OPTIONS)}")
+    if not tracemalloc.is_tracing():
+        return []
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    if compare:
+        if _baseline is None:
+            _baseline = snapshot
+        statistics = snapshot.compare_to(_baseline, group_by)
+    else:
+        statistics = snapshot.statistics(group_by)
+
+    sites = []
+    for stat in statistics[:limit]:
+        site = {
+            'site': stat.traceback.format() if group_by == 'traceback' else str(stat.traceback[0]),
+            'size_kb': _kb(stat.size),
+            'count': stat.count
+        }
+        if compare:
+            site.update(size_diff_kb=_kb(stat.size_diff), count_diff=stat.count_diff)
+        sites.append(site)
+    return sites
+
+def reset_baseline() -> None:
+    """Take a new baseline snapshot for top_allocations(compare=True)."""
+    global _baseline
+    _baseline = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS) if tracemalloc.is_tracing() else None
+
+def memory_report() -> Dict[str, Any]:
+    """Per-endpoint and per-stage allocations, process samples and the max_requests hint for this process."""
+    with _lock:
+        endpoints = _summarize(_stats['endpoints'])
+        stages = _summarize(_stats['stages'])
+    return {
+        'pid': os.getpid(),
+        'requests': _requests,
+        'traced_kb': _kb(tracemalloc.get_traced_memory()[0]) if tracemalloc.is_tracing() else None,
+        'endpoints': endpoints,
+        'stages': stages,
+        'process': current_sample(),
+        'samples': list(_samples)[-10:],
+        'max_requests': max_requests_hint()
+    }
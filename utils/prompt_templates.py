@@ -1,39 +1,329 @@
 """
 Prompt templates for SkillSnap LLM features.
 These templates are designed to work with various LLM providers.
+
+Prompts are laid out for provider-side prefix caching: the parts shared by
+many requests come first (instructions and response schema, then the jobs or
+job description) and the resume comes last, so consecutive requests share
+the longest possible identical prefix.
 """
 
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from resume_sections import ResumeDocument
+
+# Rendered job blocks kept per process, keyed by catalog version, job ids and
+# the fingerprints of the job profiles rendered (None for raw descriptions)
+JOB_BLOCK_CACHE_SIZE = int(os.getenv('PROMPT_JOB_BLOCK_CACHE_SIZE', '128'))
+
+_job_block_cache: 'OrderedDict[Tuple[str, Tuple[Tuple[int, Optional[str]], ...]], str]' = OrderedDict()
+_job_block_lock = threading.Lock()
+
+class Prompt(str):
+    """
+    Prompt text made of segments ordered from most to least shared.
+
+    Every segment but the last ends a prefix that other requests are likely
+    to repeat, which providers with explicit prompt caching mark as a cache
+    breakpoint. A Prompt is a str, so it can be used anywhere plain prompt
+    text is expected.
+    """
+
+    segments: Tuple[str, ...]
+
+    def __new__(cls, *segments: str) -> 'Prompt':
+        prompt = str.__new__(cls, ''.join(segments))
+        prompt.segments = segments
+        return prompt
+
+def _render_profile(job: Dict) -> str:
+    # Compact profile (job_profiles), a fraction of the description's tokens
+    profile = job['profile']
+    lines = [f"Job Title: {job['title']}"]
+    level = [f"{name}: {profile[key]}" for name, key in (('Seniority', 'seniority'), ('Domain', 'domain'))
+             if profile.get(key) and profile[key] != 'unspecified']
+    if level:
+        lines.append('; '.join(level))
+    if profile.get('skills'):
+        lines.append(f"Required Skills: {', '.join(profile['skills'])}")
+    if profile.get('responsibilities'):
+        lines.append(f"Key Responsibilities: {'; '.join(profile['responsibilities'])}")
+    return "\n".join(lines)
+
+def _render_jobs(job_descriptions: List[Dict]) -> str:
+    return "\n\n".join([
+        f"Job Title: {job['title']}\nDescription: {job['description']}" if job.get('profile') is None
+        else _render_profile(job)
+        for job in job_descriptions
+    ])
+
+def prompt_segments(prompt: str) -> Tuple[str, ...]:
+    """Get a prompt's cacheable segments; plain text is a single segment."""
+    return getattr(prompt, 'segments', (prompt,))
+
 class PromptTemplates:
     """Collection of prompt templates for different LLM tasks."""
     
+    # Resume sections each task needs when given a ResumeDocument; None sends
+    # the whole resume. Leaving out unused sections cuts prompt tokens.
+    TASK_SECTIONS = {
+        'job_matching': ('summary', 'experience', 'skills'),
+        'skill_gap': ('skills', 'experience', 'projects', 'education'),
+        'resume_improvement': None,
+        # Education holds certifications, which extraction also reports
+        'skills_extraction': ('skills', 'projects', 'education')
+    }
+    
     @staticmethod
-    def job_matching_prompt(resume_text: str, job_descriptions: list) -> str:
+    def resume_text(resume: Union[str, ResumeDocument], task: str) -> str:
+        """Get the resume text for a task: the sections it needs, or plain text as given."""
+        if isinstance(resume, ResumeDocument):
+            return resume.render(PromptTemplates.TASK_SECTIONS[task])
+        return resume
+    
+    # Response schemas by detail level. Compact variants keep the same keys
+    # but ask for terse values, which cuts output tokens and latency.
+    JOB_MATCHING_SCHEMAS = {
+        'full': """{
+    "matches": [
+        {
+            "job_title": "Job Title",
+            "score": 85,
+            "reasons": [
+                "Strong technical skills match: Python, React, AWS",
+                "Relevant experience in software development",
+                "Good alignment with company culture and values"
+            ],
+            "strengths": ["List of candidate's strengths for this role"],
+            "concerns": ["List of potential concerns or gaps"]
+        }
+    ],
+    "analysis_summary": "Brief overall analysis of the candidate's profile"
+}""",
+        'compact': """{
+    "matches": [
+        {
+            "job_title": "Job Title",
+            "score": 85,
+            "reasons": ["At most 2 reasons, 10 words each"],
+            "strengths": ["At most 2 strengths, 6 words each"],
+            "concerns": ["At most 1 concern, 6 words"]
+        }
+    ],
+    "analysis_summary": "One sentence"
+}"""
+    }
+    
+    SKILL_GAP_SCHEMAS = {
+        'full': """{
+    "missing_skills": [
+        {
+            "skill": "Skill Name",
+            "importance": "high|medium|low",
+            "description": "Why this skill is important for the role",
+            "improvement_suggestions": [
+                "Specific action item 1",
+                "Specific action item 2"
+            ]
+        }
+    ],
+    "experience_gaps": [
+        {
+            "area": "Area of experience",
+            "description": "What experience is missing",
+            "suggestions": ["How to gain this experience"]
+        }
+    ],
+    "overall_assessment": "Summary of the candidate's readiness for this role",
+    "priority_improvements": ["Top 3 most important improvements to focus on"],
+    "confidence": "high|medium|low (how well the resume and job description support this analysis)"
+}""",
+        'compact': """{
+    "missing_skills": [
+        {
+            "skill": "Skill Name",
+            "importance": "high|medium|low",
+            "description": "Under 12 words",
+            "improvement_suggestions": ["One action, under 10 words"]
+        }
+    ],
+    "experience_gaps": [
+        {
+            "area": "Area of experience",
+            "description": "Under 12 words",
+            "suggestions": ["One action, under 10 words"]
+        }
+    ],
+    "overall_assessment": "One sentence",
+    "priority_improvements": ["Top 3 improvements, under 8 words each"],
+    "confidence": "high|medium|low"
+}"""
+    }
+    
+    RESUME_IMPROVEMENT_SCHEMAS = {
+        'full': """{
+    "overall_assessment": "Brief assessment of resume quality and alignment",
+    "section_analysis": [
+        {
+            "section": "summary|experience|skills|education",
+            "current_content": "What's currently in this section",
+            "issues": ["List of issues or areas for improvement"],
+            "suggestions": ["Specific improvement suggestions"],
+            "rewritten_content": "Improved version of this section (if applicable)"
+        }
+    ],
+    "keyword_optimization": [
+        {
+            "keyword": "Important keyword from job description",
+            "current_usage": "How it's currently used in resume",
+            "suggested_usage": "How to better incorporate this keyword"
+        }
+    ],
+    "action_items": [
+        "Specific action items to improve the resume"
+    ],
+    "priority_score": 85
+}""",
+        'compact': """{
+    "overall_assessment": "One sentence",
+    "section_analysis": [
+        {
+            "section": "summary|experience|skills|education",
+            "current_content": "Under 10 words",
+            "issues": ["At most 2 issues, under 10 words each"],
+            "suggestions": ["At most 2 suggestions, under 12 words each"]
+        }
+    ],
+    "keyword_optimization": [
+        {
+            "keyword": "At most 3 keywords",
+            "current_usage": "Under 6 words",
+            "suggested_usage": "Under 10 words"
+        }
+    ],
+    "action_items": ["At most 3 items, under 10 words each"],
+    "priority_score": 85
+}"""
+    }
+    
+    # Schemas for updating a skill gap analysis after resume edits: only the
+    # changes to the missing skills, plus the fields covering the whole resume
+    SKILL_GAP_UPDATE_SCHEMAS = {
+        detail: schema.replace('{\n', '{\n    "resolved_skills": ["Previously missing skill the edits now demonstrate"],\n', 1)
+        for detail, schema in SKILL_GAP_SCHEMAS.items()
+    }
+    
+    SKILLS_EXTRACTION_SCHEMAS = {
+        'full': """{
+    "technical_skills": [
+        {
+            "skill": "Skill Name",
+            "confidence": "high|medium|low",
+            "context": "How the skill was mentioned or demonstrated"
+        }
+    ],
+    "soft_skills": [
+        {
+            "skill": "Skill Name",
+            "confidence": "high|medium|low",
+            "context": "How the skill was mentioned or demonstrated"
+        }
+    ],
+    "tools_technologies": [
+        {
+            "tool": "Tool/Technology Name",
+            "confidence": "high|medium|low",
+            "context": "How the tool was mentioned or used"
+        }
+    ],
+    "languages": [
+        {
+            "language": "Programming Language",
+            "confidence": "high|medium|low",
+            "context": "How the language was mentioned or used"
+        }
+    ],
+    "certifications": [
+        {
+            "certification": "Certification Name",
+            "issuer": "Issuing Organization",
+            "year": "Year obtained (if mentioned)"
+        }
+    ]
+}""",
+        'compact': """{
+    "technical_skills": [{"skill": "Skill Name", "confidence": "high|medium|low"}],
+    "soft_skills": [{"skill": "Skill Name", "confidence": "high|medium|low"}],
+    "tools_technologies": [{"tool": "Tool Name", "confidence": "high|medium|low"}],
+    "languages": [{"language": "Programming Language", "confidence": "high|medium|low"}],
+    "certifications": [{"certification": "Certification Name", "issuer": "Issuer", "year": "Year"}]
+}"""
+    }
+    
+    JOB_PROFILE_SCHEMA = """{
+    "skills": ["required skill, lowercase, most important first (at most 15)"],
+    "seniority": "junior|mid|senior|lead|unspecified",
+    "domain": "one or two words, e.g. data, frontend, infrastructure",
+    "responsibilities": ["at most 4 key responsibilities, under 8 words each"]
+}"""
+    
+    @staticmethod
+    def jobs_block(job_descriptions: List[Dict], catalog_key: Optional[str] = None) -> str:
+        """
+        Render jobs for a matching prompt.
+        
+        With a catalog key (JobCatalog.snapshot_key) the rendered block is
+        cached for that catalog version and job list, so repeated requests
+        reuse byte-identical text. Jobs rendered as profiles are keyed by
+        their 'profile_key' as well, so a refined profile, or switching
+        LLM_JOB_PROFILES, renders a new block.
+        """
+        if catalog_key is None or any('id' not in job or ('profile' in job and 'profile_key' not in job)
+                                      for job in job_descriptions):
+            return _render_jobs(job_descriptions)
+        
+        key = (catalog_key, tuple((job['id'], job.get('profile_key')) for job in job_descriptions))
+        with _job_block_lock:
+            block = _job_block_cache.get(key)
+            if block is not None:
+                _job_block_cache.move_to_end(key)
+                return block
+        
+        block = _render_jobs(job_descriptions)
+        with _job_block_lock:
+            _job_block_cache[key] = block
+            while len(_job_block_cache) > JOB_BLOCK_CACHE_SIZE:
+                _job_block_cache.popitem(last=False)
+        return block
+    
+    @staticmethod
+    def job_matching_prompt(resume: Union[str, ResumeDocument], job_descriptions: list, detail: str = 'full',
+                            catalog_key: Optional[str] = None) -> Prompt:
         """
         Generate prompt for semantic job matching.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume, or its sections
             job_descriptions: List of job description dictionaries with 'title' and 'description'
+            detail: 'full' or 'compact' response schema
+            catalog_key: Snapshot key of the catalog version the jobs were
+                read at, to reuse their rendered block
         
         Returns:
-            Formatted prompt string
+            Formatted prompt
         """
-        jobs_text = "\n\n".join([
-            f"Job Title: {job['title']}\nDescription: {job['description']}"
-            for job in job_descriptions
-        ])
+        resume_text = PromptTemplates.resume_text(resume, 'job_matching')
+        jobs_text = PromptTemplates.jobs_block(job_descriptions, catalog_key)
         
-        return f"""
+        return Prompt(f"""
 You are an expert resume and job matching analyst. Your task is to analyze a resume and match it against available job positions based on skills, experience, and overall fit.
 
-RESUME TEXT:
-{resume_text}
-
-AVAILABLE JOBS:
-{jobs_text}
-
 INSTRUCTIONS:
-1. Analyze the resume for skills, experience, education, and career objectives
+1. Analyze the resume (given last) for skills, experience, education, and career objectives
 2. For each job, evaluate the match based on:
    - Skills alignment (technical and soft skills)
    - Experience relevance
@@ -43,195 +333,236 @@ INSTRUCTIONS:
 4. Provide specific reasons for the match score
 5. Return results in the following JSON format:
 
-{{
-    "matches": [
-        {{
-            "job_title": "Job Title",
-            "score": 85,
-            "reasons": [
-                "Strong technical skills match: Python, React, AWS",
-                "Relevant experience in software development",
-                "Good alignment with company culture and values"
-            ],
-            "strengths": ["List of candidate's strengths for this role"],
-            "concerns": ["List of potential concerns or gaps"]
-        }}
-    ],
-    "analysis_summary": "Brief overall analysis of the candidate's profile"
-}}
+{PromptTemplates.JOB_MATCHING_SCHEMAS[detail]}
 
 IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
-"""
+""", f"""
+AVAILABLE JOBS:
+{jobs_text}
+""", f"""
+RESUME TEXT:
+{resume_text}
+""")
 
     @staticmethod
-    def skill_gap_prompt(resume_text: str, job_description: str) -> str:
+    def skill_gap_prompt(resume: Union[str, ResumeDocument], job_description: str, detail: str = 'full') -> Prompt:
         """
         Generate prompt for skill gap analysis.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume, or its sections
             job_description: Job description text
+            detail: 'full' or 'compact' response schema
         
         Returns:
-            Formatted prompt string
+            Formatted prompt
         """
-        return f"""
+        resume_text = PromptTemplates.resume_text(resume, 'skill_gap')
+        return Prompt(f"""
 You are an expert career advisor and skills analyst. Your task is to analyze the gap between a candidate's resume and a specific job description to identify missing skills and provide actionable improvement suggestions.
 
-RESUME TEXT:
-{resume_text}
+INSTRUCTIONS:
+1. Identify skills and experiences mentioned in the job description
+2. Compare against what's present in the resume (given last)
+3. Identify missing or underdeveloped skills
+4. Provide specific, actionable suggestions for improvement
+5. Return results in the following JSON format:
 
+{PromptTemplates.SKILL_GAP_SCHEMAS[detail]}
+
+IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
+""", f"""
 JOB DESCRIPTION:
 {job_description}
+""", f"""
+RESUME TEXT:
+{resume_text}
+""")
+
+    @staticmethod
+    def edited_sections_text(edited: Dict[str, str], removed: List[str]) -> str:
+        """Render edited resume sections, and the names of removed ones, for an update prompt."""
+        parts = [f"{name.upper()}:\n{text}" for name, text in edited.items()]
+        if removed:
+            parts.append(f"REMOVED SECTIONS: {', '.join(removed)}")
+        return '\n\n'.join(parts)
+    
+    @staticmethod
+    def skill_gap_update_prompt(edited: Dict[str, str], removed: List[str], previous: Dict,
+                                job_description: str, detail: str = 'full') -> Prompt:
+        """
+        Generate prompt for updating a skill gap analysis after resume edits.
+        
+        Args:
+            edited: Text of the resume sections changed since the previous analysis
+            removed: Names of sections removed since the previous analysis
+            previous: Previous skill gap analysis against the same job
+            job_description: Job description text
+            detail: 'full' or 'compact' response schema
+        
+        Returns:
+            Formatted prompt
+        """
+        return Prompt(f"""
+You are an expert career advisor and skills analyst. A candidate has edited some sections of their resume since their skill gap against this job was analyzed. Your task is to update that analysis for the edits only.
 
 INSTRUCTIONS:
-1. Identify skills and experiences mentioned in the job description
-2. Compare against what's present in the resume
-3. Identify missing or underdeveloped skills
-4. Provide specific, actionable suggestions for improvement
+1. Compare the EDITED SECTIONS (given last) against the job description
+2. In "resolved_skills", list previously missing skills that the edited sections now demonstrate
+3. In "missing_skills", list only skills that are newly missing, e.g. because an edit or removal dropped them; do not repeat previously missing skills
+4. Return complete, updated "experience_gaps", "overall_assessment" and "priority_improvements" for the whole resume
 5. Return results in the following JSON format:
 
-{{
-    "missing_skills": [
-        {{
-            "skill": "Skill Name",
-            "importance": "high|medium|low",
-            "description": "Why this skill is important for the role",
-            "improvement_suggestions": [
-                "Specific action item 1",
-                "Specific action item 2"
-            ]
-        }}
-    ],
-    "experience_gaps": [
-        {{
-            "area": "Area of experience",
-            "description": "What experience is missing",
-            "suggestions": ["How to gain this experience"]
-        }}
-    ],
-    "overall_assessment": "Summary of the candidate's readiness for this role",
-    "priority_improvements": ["Top 3 most important improvements to focus on"]
-}}
+{PromptTemplates.SKILL_GAP_UPDATE_SCHEMAS[detail]}
 
 IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
-"""
+""", f"""
+JOB DESCRIPTION:
+{job_description}
+""", f"""
+PREVIOUS ANALYSIS:
+{json.dumps(previous, indent=1)}
 
+EDITED SECTIONS:
+{PromptTemplates.edited_sections_text(edited, removed)}
+""")
+    
     @staticmethod
-    def resume_improvement_prompt(resume_text: str, job_description: str) -> str:
+    def resume_improvement_prompt(resume: Union[str, ResumeDocument], job_description: str, detail: str = 'full') -> Prompt:
         """
         Generate prompt for resume improvement suggestions.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume, or its sections
             job_description: Job description text
+            detail: 'full' or 'compact' response schema
         
         Returns:
-            Formatted prompt string
+            Formatted prompt
         """
-        return f"""
+        resume_text = PromptTemplates.resume_text(resume, 'resume_improvement')
+        return Prompt(f"""
 You are an expert resume writer and career coach. Your task is to analyze a resume against a specific job description and provide suggestions for improvement, including potential rewrites of key sections.
 
+INSTRUCTIONS:
+1. Analyze how well the resume (given last) aligns with the job requirements
+2. Identify sections that could be improved or rewritten
+3. Provide specific suggestions for each section
+4. If requested, provide rewritten versions of key sections
+5. Return results in the following JSON format:
+
+{PromptTemplates.RESUME_IMPROVEMENT_SCHEMAS[detail]}
+
+IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
+""", f"""
+TARGET JOB DESCRIPTION:
+{job_description}
+""", f"""
 RESUME TEXT:
 {resume_text}
+""")
+
+    @staticmethod
+    def resume_improvement_update_prompt(edited: Dict[str, str], removed: List[str], previous: Dict,
+                                         job_description: str, detail: str = 'full') -> Prompt:
+        """
+        Generate prompt for updating resume improvement suggestions after edits.
+        
+        Args:
+            edited: Text of the resume sections changed since the previous analysis
+            removed: Names of sections removed since the previous analysis
+            previous: Previous analysis, with section_analysis for the unchanged sections only
+            job_description: Job description text
+            detail: 'full' or 'compact' response schema
+        
+        Returns:
+            Formatted prompt
+        """
+        return Prompt(f"""
+You are an expert resume writer and career coach. A candidate has edited some sections of their resume since it was analyzed against this job. Your task is to analyze the edited sections and update the overall suggestions.
+
+INSTRUCTIONS:
+1. Analyze how well the EDITED SECTIONS (given last) align with the job requirements
+2. Return "section_analysis" entries for the edited sections only; the other sections keep their previous analysis
+3. Using the PREVIOUS ANALYSIS of the unchanged sections as context, return updated "overall_assessment", "keyword_optimization", "action_items" and "priority_score" for the whole resume
+4. Return results in the following JSON format:
+
+{PromptTemplates.RESUME_IMPROVEMENT_SCHEMAS[detail]}
 
+IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
+""", f"""
 TARGET JOB DESCRIPTION:
 {job_description}
+""", f"""
+PREVIOUS ANALYSIS:
+{json.dumps(previous, indent=1)}
+
+EDITED SECTIONS:
+{PromptTemplates.edited_sections_text(edited, removed)}
+""")
+
+    @staticmethod
+    def job_profile_prompt(job: Dict, profile: Dict) -> Prompt:
+        """
+        Generate prompt for refining a compact job profile.
+        
+        Args:
+            job: Job dictionary with 'title' and 'description'
+            profile: Draft profile built locally (job_profiles.build_profile)
+        
+        Returns:
+            Formatted prompt
+        """
+        return Prompt(f"""
+You are an expert recruiter. Your task is to condense a job posting into a compact profile used to match candidates against it.
 
 INSTRUCTIONS:
-1. Analyze how well the resume aligns with the job requirements
-2. Identify sections that could be improved or rewritten
-3. Provide specific suggestions for each section
-4. If requested, provide rewritten versions of key sections
-5. Return results in the following JSON format:
+1. Read the job posting and the draft profile (both given last); the draft was extracted automatically and may miss or misread requirements
+2. List the skills the job requires, using common lowercase names, most important first; leave out soft skills
+3. Rate the seniority from the title and the experience asked for
+4. Name the job's domain
+5. Summarize the key responsibilities, leaving out company boilerplate
+6. Return results in the following JSON format:
 
-{{
-    "overall_assessment": "Brief assessment of resume quality and alignment",
-    "section_analysis": [
-        {{
-            "section": "summary|experience|skills|education",
-            "current_content": "What's currently in this section",
-            "issues": ["List of issues or areas for improvement"],
-            "suggestions": ["Specific improvement suggestions"],
-            "rewritten_content": "Improved version of this section (if applicable)"
-        }}
-    ],
-    "keyword_optimization": [
-        {{
-            "keyword": "Important keyword from job description",
-            "current_usage": "How it's currently used in resume",
-            "suggested_usage": "How to better incorporate this keyword"
-        }}
-    ],
-    "action_items": [
-        "Specific action items to improve the resume"
-    ],
-    "priority_score": 85
-}}
+{PromptTemplates.JOB_PROFILE_SCHEMA}
 
 IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
-"""
+""", f"""
+JOB TITLE: {job['title']}
+
+JOB DESCRIPTION:
+{job['description']}
+
+DRAFT PROFILE:
+{json.dumps(profile, indent=2)}
+""")
 
     @staticmethod
-    def extract_skills_prompt(resume_text: str) -> str:
+    def extract_skills_prompt(resume: Union[str, ResumeDocument], detail: str = 'full') -> Prompt:
         """
         Generate prompt for skills extraction from resume.
         
         Args:
-            resume_text: Extracted text from resume
+            resume: Extracted text from resume, or its sections
+            detail: 'full' or 'compact' response schema
         
         Returns:
-            Formatted prompt string
+            Formatted prompt
         """
-        return f"""
+        resume_text = PromptTemplates.resume_text(resume, 'skills_extraction')
+        return Prompt(f"""
 You are an expert skills analyst. Your task is to extract and categorize all skills mentioned in a resume.
 
-RESUME TEXT:
-{resume_text}
-
 INSTRUCTIONS:
-1. Identify all technical skills, soft skills, tools, and technologies
+1. Identify all technical skills, soft skills, tools, and technologies in the resume (given last)
 2. Categorize them appropriately
 3. Provide confidence levels for each skill
 4. Return results in the following JSON format:
 
-{{
-    "technical_skills": [
-        {{
-            "skill": "Skill Name",
-            "confidence": "high|medium|low",
-            "context": "How the skill was mentioned or demonstrated"
-        }}
-    ],
-    "soft_skills": [
-        {{
-            "skill": "Skill Name",
-            "confidence": "high|medium|low",
-            "context": "How the skill was mentioned or demonstrated"
-        }}
-    ],
-    "tools_technologies": [
-        {{
-            "tool": "Tool/Technology Name",
-            "confidence": "high|medium|low",
-            "context": "How the tool was mentioned or used"
-        }}
-    ],
-    "languages": [
-        {{
-            "language": "Programming Language",
-            "confidence": "high|medium|low",
-            "context": "How the language was mentioned or used"
-        }}
-    ],
-    "certifications": [
-        {{
-            "certification": "Certification Name",
-            "issuer": "Issuing Organization",
-            "year": "Year obtained (if mentioned)"
-        }}
-    ]
-}}
+{PromptTemplates.SKILLS_EXTRACTION_SCHEMAS[detail]}
 
 IMPORTANT: Return ONLY valid JSON. Do not include any additional text or explanations outside the JSON structure.
-""" 
\ No newline at end of file
+""", f"""
+RESUME TEXT:
+{resume_text}
+""")
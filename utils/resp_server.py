@@ -0,0 +1,145 @@
+"""
+In-memory Redis-protocol stand-in for local development and testing.
+
+Implements only the commands used by RedisCacheBackend, so the redis cache
+backend can be exercised without a Redis installation:
+
+    python -m utils.resp_server --port 6390
+    CACHE_BACKEND=redis CACHE_REDIS_URL=redis://localhost:6390/0 python app.py
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class RespStore:
+    """Thread-safe keyspace of strings (with expiry) and sorted sets."""
+
+    def __init__(self):
+        self.strings: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.zsets: Dict[bytes, Dict[bytes, float]] = {}
+        self.lock = threading.Lock()
+
+    def _get_string(self, key: bytes) -> Optional[bytes]:
+        entry = self.strings.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.time() > expires_at:
+            del self.strings[key]
+            return None
+        return value
+
+    def execute(self, command: str, args: List[bytes]) -> Any:
+        with self.lock:
+            if command == 'PING':
+                return 'PONG'
+            if command in ('SELECT', 'AUTH'):
+                return 'OK'
+            if command == 'GET':
+                return self._get_string(args[0])
+            if command == 'SET':
+                expires_at = None
+                options = [a.upper() for a in args[2:]]
+                if b'PX' in options:
+                    expires_at = time.time() + int(args[2 + options.index(b'PX') + 1]) / 1000.0
+                elif b'EX' in options:
+                    expires_at = time.time() + int(args[2 + options.index(b'EX') + 1])
+                self.strings[args[0]] = (args[1], expires_at)
+                return 'OK'
+            if command == 'DEL':
+                removed = 0
+                for key in args:
+                    removed += (self.strings.pop(key, None) is not None) + (self.zsets.pop(key, None) is not None)
+                return removed
+            if command == 'ZADD':
+                zset = self.zsets.setdefault(args[0], {})
+                added = 0
+                for score, member in zip(args[1::2], args[2::2]):
+                    added += member not in zset
+                    zset[member] = float(score)
+                return added
+            if command == 'ZCARD':
+                return len(self.zsets.get(args[0], {}))
+            if command == 'ZRANGE':
+                members = sorted(self.zsets.get(args[0], {}).items(), key=lambda item: (item[1], item[0]))
+                start, stop = int(args[1]), int(args[2])
+                stop = len(members) + stop if stop < 0 else stop
+                return [member for member, _ in members[start:stop + 1]]
+            if command == 'ZREM':
+                zset = self.zsets.get(args[0], {})
+                return sum(zset.pop(member, None) is not None for member in args[1:])
+            if command == 'FLUSHDB':
+                self.strings.clear()
+                self.zsets.clear()
+                return 'OK'
+        raise ValueError(f"unknown command '{command}'")
+
+def encode_reply(value: Any) -> bytes:
+    """Encode a Python value as a RESP2 reply."""
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, str):
+        return b'+%s\r\n' % value.encode('utf-8')
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, bytes):
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(encode_reply(item) for item in value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, e.g. from telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = encode_reply(self.server.store.execute(args[0].decode('utf-8').upper(), args[1:]))
+            except Exception as e:
+                reply = b'-ERR %s\r\n' % str(e).encode('utf-8')
+            self.wfile.write(reply)
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6390):
+        super().__init__((host, port), RespHandler)
+        self.store = RespStore()
+
+    def start(self) -> 'RespServer':
+        """Serve on a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def main():
+    parser = argparse.ArgumentParser(description='In-memory Redis-protocol stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+
+    server = RespServer(args.host, args.port)
+    print(f"Serving Redis protocol on {args.host}:{server.server_address[1]}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Fast serialization and content negotiation for SkillSnap responses.
+
+jsonify() responses and request.get_json() go through FastJSONProvider,
+which uses orjson when it is installed and the standard library otherwise,
+with the same output. Clients that send 'Accept: application/msgpack' get
+the same response objects encoded as MessagePack (when msgpack is
+installed), and may send MessagePack request bodies. Large result lists can
+be streamed with stream_response() instead of building the whole body first.
+"""
+
+import dataclasses
+import decimal
+import json
+import logging
+import os
+import uuid
+from datetime import date
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from flask import Flask, Request, Response, current_app, has_request_context, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; responses are then always JSON
+    msgpack = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+# Streamed responses are sent in chunks of about this many bytes
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', str(64 * 1024)))
+
+def _default(value: Any) -> Any:
+    """Encode the types Flask's default provider supports, and numpy values."""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return value.tolist()
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Encode an object as compact UTF-8 JSON."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON text or UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def packb(obj: Any) -> bytes:
+    """Encode an object as MessagePack."""
+    return msgpack.packb(obj, default=_default, use_bin_type=True, datetime=False)
+
+def unpackb(data: bytes) -> Any:
+    """Decode a MessagePack document."""
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+def wants_msgpack() -> bool:
+    """Check whether the current request prefers a MessagePack response."""
+    if msgpack is None or not has_request_context():
+        return False
+    best = request.accept_mimetypes.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+    return best in MSGPACK_MIMETYPES
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding with orjson and negotiating MessagePack.
+
+    Falls back to the default provider for options orjson has no equivalent
+    for, such as indentation for pretty-printed debug responses.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or set(kwargs) - {'sort_keys'}:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        if wants_msgpack():
+            response = self._app.response_class(packb(obj), mimetype=MSGPACK_MIMETYPE)
+        elif self.compact is False or (self.compact is None and self._app.debug):
+            response = super().response(obj)
+        else:
+            response = self._app.response_class(dumps(obj, sort_keys=self.sort_keys) + b'\n',
+                                                mimetype=self.mimetype)
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+class FastRequest(Request):
+    """Request accepting MessagePack bodies wherever JSON bodies are read."""
+
+    _cached_msgpack: Any = None
+
+    def get_json(self, force: bool = False, silent: bool = False, cache: bool = True) -> Optional[Any]:
+        if msgpack is None or self.mimetype not in MSGPACK_MIMETYPES:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        if cache and self._cached_msgpack is not None:
+            return self._cached_msgpack
+
+        try:
+            data = unpackb(self.get_data(cache=cache))
+        except Exception as e:
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
+        if cache:
+            self._cached_msgpack = data
+        return data
+
+def _json_chunks(envelope: Dict[str, Any], list_key: str, items: Iterator[Any],
+                 sort_keys: bool) -> Iterator[bytes]:
+    head = dumps(envelope, sort_keys=sort_keys)[:-1]
+    buffer = bytearray(head + (b',' if envelope else b'') + dumps(list_key) + b':[')
+    first = True
+    for item in items:
+        if not first:
+            buffer += b','
+        buffer += dumps(item, sort_keys=sort_keys)
+        first = False
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b']}\n'
+    yield bytes(buffer)
+
+def _msgpack_chunks(envelope: Dict[str, Any], list_key: str, items: Iterator[Any],
+                    count: int) -> Iterator[bytes]:
+    packer = msgpack.Packer(default=_default, use_bin_type=True, datetime=False)
+    buffer = bytearray(packer.pack_map_header(len(envelope) + 1))
+    for key, value in envelope.items():
+        buffer += packer.pack(key) + packer.pack(value)
+    buffer += packer.pack(list_key) + packer.pack_array_header(count)
+    for item in items:
+        buffer += packer.pack(item)
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer)
+
+def stream_response(parts: Iterator[Any], list_key: str) -> Response:
+    """
+    Stream a response object whose list_key holds a long list.
+
+    The body is the same as jsonify({**envelope, list_key: [items]}), or its
+    MessagePack encoding, but items are encoded as they are produced.
+
+    Args:
+        parts: Generator yielding (envelope, item count) first, then the
+            items. It runs while the body is sent, so it can hold a catalog
+            read snapshot for both; the count must match the items yielded.
+        list_key: Key of the list in the response object
+    """
+    def generate() -> Iterator[bytes]:
+        try:
+            envelope, count = next(parts)
+            if msgpack_response:
+                yield from _msgpack_chunks(envelope, list_key, parts, count)
+            else:
+                yield from _json_chunks(envelope, list_key, parts, sort_keys)
+        except Exception:
+            # Headers are already sent; the client sees a truncated body
+            logger.exception(f"Failed while streaming '{list_key}'")
+            raise
+        finally:
+            parts.close()
+
+    msgpack_response = wants_msgpack()
+    sort_keys = current_app.json.sort_keys
+    response = current_app.response_class(
+        stream_with_context(generate()),
+        mimetype=MSGPACK_MIMETYPE if msgpack_response else JSON_MIMETYPE
+    )
+    if msgpack is not None:
+        response.vary.add('Accept')
+    return response
+
+def init_app(app: Flask) -> None:
+    """Use the fast JSON provider and MessagePack-aware requests."""
+    app.json = FastJSONProvider(app)
+    app.request_class = FastRequest